@@ -6,19 +6,27 @@ from fastapi.responses import Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.errors import ServerErrorMiddleware
 import firebase_admin
-from firebase_admin import credentials, auth, storage, db
+from firebase_admin import credentials, auth, storage, db as firebase_db
 from starlette.responses import HTMLResponse, FileResponse, RedirectResponse
 from routers import matches, signup, login, contact, fantasy, players, settings, teams, admin, statistics, search, follows, analytics
 from auth_utils import get_current_user
+import asyncio
 import json
 import os
+import threading
+import time
 import uvicorn
 import pandas as pd
 from datetime import datetime, timedelta
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
-from middleware import RequestLoggingMiddleware
+from data_store import read_dataset, DATA_DIR, DATASET_EXTENSIONS
+from warmup import run_warmup
+from data_sync import match_syncer
+from server import process_memory
+from models.fantasy import FANTASY_REPLICAS
+from middleware import RequestLoggingMiddleware, PageCacheMiddleware, FirebaseReadScopeMiddleware, page_cache
 from security import SecurityHeadersMiddleware, RateLimitMiddleware#, CSRFProtectionMiddleware
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
@@ -40,13 +48,25 @@ if SENTRY_DSN:
         release=os.getenv("RELEASE_VERSION", "1.0.0"),
     )
 
-firebase_config_str = os.getenv("FIREBASE_CONFIG")
-firebase_config = json.loads(firebase_config_str)
-cred = credentials.Certificate(firebase_config)
-firebase_admin.initialize_app(cred)
+# Set by init_firebase() from the lifespan hook, not at import time
+db = None
+bucket = None
 
-db = db.reference('/')
-bucket = storage.bucket()
+def init_firebase():
+    """Initialize the Firebase app once per process."""
+    global db, bucket
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        firebase_config_str = os.getenv("FIREBASE_CONFIG")
+        if not firebase_config_str:
+            print("FIREBASE_CONFIG is not set - Firebase features are unavailable")
+            return
+        cred = credentials.Certificate(json.loads(firebase_config_str))
+        firebase_admin.initialize_app(cred)
+
+    db = firebase_db.reference('/')
+    bucket = storage.bucket()
 
 secret_key = os.getenv("SECRET_KEY")
 
@@ -62,15 +82,20 @@ class DataCache:
         self.standings = None
         self.player_stats = None
         self.last_updated = None
+        self.last_refresh_ms = None
+        self._lock = threading.Lock()
+        self._refreshing = False
 
     def refresh(self):
         """Refresh the cache by loading CSV files."""
+        start = time.perf_counter()
         try:
-            self.schedule = pd.read_csv('data/S26_Schedule.csv')
-            self.results = pd.read_csv('data/Match_Results.csv')
-            self.standings = pd.read_csv('data/season_standings.csv')
-            self.player_stats = pd.read_csv('data/season_player_stats.csv')
+            self.schedule = read_dataset('data/S26_Schedule.csv')
+            self.results = read_dataset('data/Match_Results.csv')
+            self.standings = read_dataset('data/season_standings.csv')
+            self.player_stats = read_dataset('data/season_player_stats.csv')
             self.last_updated = datetime.now()
+            self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 1)
             print(f"Cache refreshed at {self.last_updated}")
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -86,10 +111,30 @@ class DataCache:
             return True
         return (datetime.now() - self.last_updated) > timedelta(minutes=self.cache_duration_minutes)
 
+    def _refresh_in_background(self):
+        """Start one background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="refresh-homepage", daemon=True).start()
+
     def get_data(self) -> dict:
-        """Get cached data, refreshing if necessary."""
-        if self.is_expired():
-            self.refresh()
+        """Get cached data; a cold cache loads once, an expired one is served stale while it reloads."""
+        if self.last_updated is None:
+            with self._lock:
+                if self.last_updated is None:
+                    self.refresh()
+        elif self.is_expired():
+            self._refresh_in_background()
 
         return {
             'schedule': self.schedule,
@@ -99,13 +144,60 @@ class DataCache:
             'last_updated': self.last_updated
         }
 
+def warmup_phases(cache: DataCache) -> list:
+    """Warmup tasks: raw datasets first, then caches derived from them."""
+    datasets = {
+        f"dataset:{name}": (lambda path=os.path.join(DATA_DIR, name): read_dataset(path))
+        for name in sorted(os.listdir(DATA_DIR)) if name.endswith(DATASET_EXTENSIONS)
+    }
+    derived = {
+        'homepage_cache': cache.refresh,
+        'statistics_aggregates': statistics.get_statistics_aggregates,
+        'archives': statistics.get_all_seasons_summary,
+        'hall_of_fame': statistics.get_hall_of_fame_summary,
+        'player_listing': lambda: players.get_season_listing(players.get_current_season()),
+        'team_standings': lambda: teams.data_cache.get('season_standings', teams.load_season_standings),
+    }
+    return [datasets, derived]
+
+def warm_caches(app: FastAPI):
+    """Run the warmup and flip the readiness flag when it finishes."""
+    report = run_warmup(warmup_phases(app.state.cache))
+    app.state.warmup = report
+    app.state.ready = True
+    print(f"Warmup finished in {report['duration_ms']} ms (ok={report['ok']})")
+
+def preload_app(app: FastAPI):
+    """Warm every cache in this process before workers are forked from it (see server.py)."""
+    app.state.cache = DataCache(CACHE_DURATION_MINUTES)
+    warm_caches(app)
+    app.state.preloaded = True
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
-    # Startup: Initialize cache
-    app.state.cache = DataCache(CACHE_DURATION_MINUTES)
-    print("Application started - DataCache initialized")
+    # Startup: connect to Firebase, subscribe to fantasy settings, then warm caches in the background
+    init_firebase()
+    if db is not None:
+        for replica in FANTASY_REPLICAS:
+            replica.start()
+        match_syncer.start()
+    if getattr(app.state, 'preloaded', False):
+        # Forked from a master that already warmed everything
+        warmup_task = None
+        print(f"Worker {os.getpid()} started - caches preloaded")
+    else:
+        app.state.cache = DataCache(CACHE_DURATION_MINUTES)
+        app.state.ready = False
+        app.state.warmup = None
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_caches, app))
+        print("Application started - DataCache initialized, warmup running")
     yield
+    if warmup_task is not None and not warmup_task.done():
+        await warmup_task
+    for replica in FANTASY_REPLICAS:
+        replica.stop()
+    match_syncer.stop()
     # Shutdown: Cleanup (if needed in the future)
     print("Application shutting down")
 
@@ -147,6 +239,9 @@ async def add_cache_headers(request: Request, call_next):
 
     return response
 
+# Added first so it sits innermost and stores uncompressed HTML
+app.add_middleware(FirebaseReadScopeMiddleware)
+app.add_middleware(PageCacheMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(RateLimitMiddleware)
@@ -495,6 +590,13 @@ async def health_check():
             "status": "healthy" if is_healthy else "degraded",
             "timestamp": datetime.now().isoformat(),
             "cache_status": "active" if data['last_updated'] else "cold",
+            "cache_refresh_ms": app.state.cache.last_refresh_ms,
+            "ready": getattr(app.state, 'ready', False),
+            "warmup": getattr(app.state, 'warmup', None),
+            "page_cache": page_cache.stats(),
+            "match_sync": match_syncer.last_report,
+            "data_caches": [module.data_cache.stats() for module in (players, teams, statistics)],
+            "process": {"pid": os.getpid(), **process_memory()},
             "environment": os.getenv("ENVIRONMENT", "development")
         }
     except Exception as e:
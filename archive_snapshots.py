@@ -0,0 +1,126 @@
+"""
+Materialized snapshots of the season archives and the Hall of Fame.
+
+Both pages are expensive to build and almost never change: finished seasons
+are frozen, and the Hall of Fame only moves when career data or awards do.
+Snapshots are kept in memory per data version (a DataCache) and persisted
+to disk so a cold worker can reuse them. Each season carries a fingerprint of its own
+rows, so when new results arrive only the season they belong to is rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import pandas as pd
+from data_store import DATA_DIR
+from caching import DataCache
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(DATA_DIR, '.cache'))
+ARCHIVES_FILE = 'archives.json'
+HALL_OF_FAME_FILE = 'hall_of_fame.json'
+
+# Keyed by data version through DataCache; only a new version revalidates them
+snapshot_cache = DataCache('archive_snapshots', ttl=float('inf'))
+
+
+def frame_fingerprint(*frames) -> str:
+    """Content hash of one or more DataFrames (column names and values)."""
+    digest = hashlib.md5()
+    for df in frames:
+        digest.update('|'.join(map(str, df.columns)).encode())
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _to_native(value):
+    """json.dump fallback for numpy scalars."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _normalize(data):
+    """Round-trip through JSON so fresh and persisted snapshots look identical."""
+    return json.loads(json.dumps(data, default=_to_native))
+
+
+def _read_snapshot(filename) -> dict:
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error reading snapshot {filename}: {e}")
+        return {}
+
+
+def _write_snapshot(filename, data):
+    """Write atomically so a concurrent reader never sees a partial file."""
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = os.path.join(SNAPSHOT_DIR, filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=_to_native)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing snapshot {filename}: {e}")
+
+
+def archived_seasons(standings_df, matches_df) -> list:
+    """Seasons that have reached the playoffs, oldest first."""
+    playoff_seasons = set(matches_df.loc[matches_df['Group'] == 'Playoff', 'Season'].unique())
+    seasons = set(standings_df['Season'].unique()) & playoff_seasons
+    return sorted(int(s) for s in seasons)
+
+
+def get_archive_snapshot(standings_df, awards_df, matches_df, build_season) -> list:
+    """
+    Archive entries for every archived season.
+
+    build_season(season) computes one season's archive; it is only called for
+    seasons whose rows changed since the persisted snapshot was written.
+    """
+    def load():
+        persisted = _read_snapshot(ARCHIVES_FILE)
+        snapshot = {}
+        changed = False
+
+        for season in archived_seasons(standings_df, matches_df):
+            fingerprint = frame_fingerprint(
+                standings_df[standings_df['Season'] == season],
+                awards_df[awards_df['Season'] == season],
+                matches_df[matches_df['Season'] == season],
+            )
+            entry = persisted.get(str(season))
+            if not entry or entry.get('fingerprint') != fingerprint:
+                entry = {'fingerprint': fingerprint, 'data': _normalize(build_season(season))}
+                changed = True
+            snapshot[str(season)] = entry
+
+        if changed or snapshot.keys() != persisted.keys():
+            _write_snapshot(ARCHIVES_FILE, snapshot)
+        return [entry['data'] for entry in snapshot.values() if entry['data']]
+
+    return snapshot_cache.get('archives', load)
+
+
+def get_hall_of_fame_snapshot(source_frames, build) -> list:
+    """Hall of Fame members, rebuilt only when any of source_frames changes."""
+    def load():
+        fingerprint = frame_fingerprint(*source_frames)
+        persisted = _read_snapshot(HALL_OF_FAME_FILE)
+        if persisted.get('fingerprint') == fingerprint:
+            return persisted['members']
+        members = _normalize(build())
+        _write_snapshot(HALL_OF_FAME_FILE, {'fingerprint': fingerprint, 'members': members})
+        return members
+
+    return snapshot_cache.get('hall_of_fame', load)
+
+
+def invalidate():
+    """Drop the in-memory snapshots (persisted files are revalidated by fingerprint)."""
+    snapshot_cache.invalidate()
@@ -0,0 +1,298 @@
+"""
+In-process cache primitives shared across the application.
+
+Every cache is bounded by an estimate of the bytes it holds and evicts the
+least recently used entries past its budget. Caches register themselves by
+name so their sizes and hit rates can be reported together (cache_stats()).
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from data_store import get_data_version
+
+# Default budget for each DataCache (64 MB)
+DATA_CACHE_MAX_BYTES = int(os.getenv("DATA_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_registry = weakref.WeakValueDictionary()
+
+
+def register(cache):
+    """Make a cache visible to cache_stats() under its name."""
+    _registry[cache.name] = cache
+
+
+def cache_stats() -> dict:
+    """Stats of every live cache, plus the total bytes they hold."""
+    caches = [cache.stats() for _, cache in sorted(_registry.items())]
+    return {
+        'total_bytes': sum(stats['bytes'] for stats in caches),
+        'caches': caches,
+    }
+
+
+def estimate_size(value) -> int:
+    """Rough size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(estimate_size(item) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its entries in bytes.
+
+    Entries larger than the whole budget are not stored. Hits, misses and
+    evictions are counted so the hit ratio can be reported.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        register(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size: int = None):
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            elif key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class DataCache:
+    """
+    Named datasets loaded on demand by loader functions.
+
+    Each entry remembers the data version it was loaded from and its age:
+
+    - Missing, or loaded from an older data version: the caller loads it.
+      Loads are serialized per key, so concurrent callers wait for the one
+      load in progress instead of each re-reading the file.
+    - Older than ttl seconds but still current: the stale value is returned
+      immediately and a single background thread reloads it
+      (stale-while-revalidate), so no request pays for the reload.
+
+    Entries are sized when loaded; past max_bytes the least recently used
+    ones are evicted (an entry larger than the whole budget is returned but
+    not kept). Per-key refresh counts, durations and failures are kept for
+    stats().
+    """
+
+    def __init__(self, name: str, ttl: float = 300, max_bytes: int = DATA_CACHE_MAX_BYTES):
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (data, loaded_at, data_version, size), least recently used first
+        self._entries = OrderedDict()
+        self._locks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.metrics = {}
+        register(self)
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _store(self, key, data, version: str):
+        size = estimate_size(data)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[3]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (data, time.time(), version, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted[3]
+                self.evictions += 1
+
+    def _load(self, key, loader_func, version: str):
+        metrics = self.metrics.setdefault(key, {'refreshes': 0, 'errors': 0, 'last_ms': None, 'total_ms': 0.0})
+        start = time.perf_counter()
+        try:
+            data = loader_func()
+        except Exception:
+            metrics['errors'] += 1
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        metrics['refreshes'] += 1
+        metrics['last_ms'] = round(elapsed, 1)
+        metrics['total_ms'] = round(metrics['total_ms'] + elapsed, 1)
+        self._store(key, data, version)
+        return data
+
+    def _lookup(self, key, version: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key, loader_func):
+        """Get data from cache or load it using loader_func"""
+        version = get_data_version()
+        entry = self._lookup(key, version)
+        if entry is not None:
+            self.hits += 1
+            if time.time() - entry[1] >= self.ttl:
+                self._refresh_in_background(key, loader_func)
+            return entry[0]
+
+        self.misses += 1
+        with self._key_lock(key):
+            # Another caller may have finished loading while this one waited
+            entry = self._lookup(key, version)
+            if entry is not None:
+                return entry[0]
+            return self._load(key, loader_func, version)
+
+    def _refresh_in_background(self, key, loader_func):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._key_lock(key):
+                    self._load(key, loader_func, get_data_version())
+            except Exception as e:
+                print(f"Error refreshing {self.name} cache entry {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"refresh-{self.name}-{key}", daemon=True).start()
+
+    def invalidate(self, key=None):
+        """Invalidate cache for a specific key or all keys"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            elif key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[3]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'ttl': self.ttl,
+            'refreshing': sorted(str(key) for key in self._refreshing),
+            'keys': {str(key): dict(metrics) for key, metrics in self.metrics.items()},
+        }
+
+
+_MISSING = object()
+
+
+def memoize(name: str, max_bytes: int):
+    """
+    Cache a function's results in an LRUCache, keyed by its arguments and
+    the data version (a drop-in for functools.lru_cache on data readers).
+    """
+    def decorator(func):
+        cache = LRUCache(name, max_bytes)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())), get_data_version())
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,526 @@
+"""
+Shared helpers for the CSV datasets in data/.
+
+The data version is a short token that changes whenever any dataset file
+changes on disk (or when a writer explicitly bumps it). Caches that hold
+anything derived from the CSVs key on it so they never serve results
+computed from an older copy of the data.
+
+read_dataset() is the common loader. Each CSV is converted once into a
+columnar snapshot (one memory-mappable .npy file per column plus a JSON
+manifest) under SNAPSHOT_DIR; later loads read the snapshot while it is
+newer than the CSV and rebuild it otherwise. The CSVs stay the source of
+truth, so deleting the snapshot directory is always safe.
+
+load_table() builds on it for the stats tables listed in TABLE_SCHEMAS:
+names, teams and other short labels become categoricals, Season and the
+count columns become small integers, 'Y-R' is parsed into integer Yellow and
+Red columns, and career ('Total') rows are split off into the separate table
+returned by load_career_table().
+
+append_rows() adds rows to the end of a CSV without rewriting it;
+replace_csv() rewrites a whole (small) CSV atomically. Both hold the
+dataset's exclusive lock (dataset_lock) and fsync before returning, and
+snapshot builds parse the CSV under the shared lock, so no reader in any
+process sees a half-written file.
+"""
+
+import codecs
+import csv
+import hashlib
+import json
+import os
+import threading
+import io
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: file locks are no-ops
+    fcntl = None
+
+DATA_DIR = 'data'
+DATASET_EXTENSIONS = ('.csv',)
+SNAPSHOT_DIR = os.getenv("DATA_SNAPSHOT_DIR", os.path.join(DATA_DIR, '.cache', 'columns'))
+SNAPSHOT_FORMAT = 1
+
+_version_lock = threading.Lock()
+_generation = 0
+
+
+def _dataset_files():
+    """List dataset files in DATA_DIR, sorted for a stable fingerprint."""
+    try:
+        return sorted(
+            name for name in os.listdir(DATA_DIR)
+            if name.endswith(DATASET_EXTENSIONS)
+        )
+    except FileNotFoundError:
+        return []
+
+
+def get_data_version() -> str:
+    """Return a token identifying the current contents of the data directory."""
+    parts = [str(_generation)]
+    for name in _dataset_files():
+        try:
+            stat = os.stat(os.path.join(DATA_DIR, name))
+        except OSError:
+            continue
+        parts.append(f"{name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()[:12]
+
+
+def bump_data_version():
+    """Force a new data version, e.g. after an in-process write that may share an mtime."""
+    global _generation
+    with _version_lock:
+        _generation += 1
+
+
+# ===== FILE LOCKS =====
+
+class FileLock:
+    """Lock on a file shared by every worker process (a no-op without fcntl)."""
+
+    def __init__(self, path: str, shared: bool = False):
+        self.path = path
+        self.shared = shared
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def dataset_lock(path: str, shared: bool = False) -> FileLock:
+    """The lock guarding a CSV: exclusive for writers, shared for readers."""
+    directory, name = os.path.split(path)
+    return FileLock(os.path.join(directory, '.cache', 'locks', f"{name}.lock"), shared)
+
+
+# ===== COLUMNAR SNAPSHOTS =====
+
+_snapshot_lock = threading.Lock()
+# Decoded columns and manifests already loaded by this process
+_loaded_columns = {}
+_loaded_manifests = {}
+
+
+def _table_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _manifest_path(table: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{table}.manifest.json")
+
+
+def _read_manifest(table: str):
+    if table in _loaded_manifests:
+        return _loaded_manifests[table]
+    try:
+        with open(_manifest_path(table), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _build_lock(table: str) -> FileLock:
+    """Lock held by the one worker process building a table's snapshot."""
+    return FileLock(os.path.join(SNAPSHOT_DIR, f"{table}.build.lock"))
+
+
+def _save_array(path: str, array):
+    """np.save to a temporary file renamed into place, never rewriting a file another process maps."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(manifest, source_stat) -> bool:
+    return (
+        manifest is not None
+        and manifest.get('format') == SNAPSHOT_FORMAT
+        and manifest.get('source_mtime_ns') == source_stat.st_mtime_ns
+        and manifest.get('source_size') == source_stat.st_size
+    )
+
+
+def build_snapshot(path: str) -> dict:
+    """
+    Convert one CSV into per-column .npy files and write its manifest.
+
+    Numeric and boolean columns are stored as-is. Text columns are stored as
+    int32 codes into a sorted array of distinct values (-1 for missing), which
+    keeps them memory-mappable. Column files are named after the source mtime,
+    and every file is written under a temporary name and renamed into place,
+    so readers in other processes never see (or have mapped) a half-written
+    snapshot. read_dataset() runs builds under _build_lock, so worker
+    processes don't build the same snapshot at once.
+    """
+    table = _table_name(path)
+    with dataset_lock(path, shared=True):
+        source_stat = os.stat(path)
+        df = pd.read_csv(path, encoding='utf-8-sig')
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    stamp = source_stat.st_mtime_ns
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        prefix = os.path.join(SNAPSHOT_DIR, f"{table}.{stamp}.{i}")
+        if series.dtype == object:
+            codes, uniques = pd.factorize(series, sort=True)
+            _save_array(f"{prefix}.codes.npy", codes.astype(np.int32))
+            _save_array(f"{prefix}.values.npy", np.asarray(uniques, dtype=str))
+            columns.append({'name': name, 'kind': 'text', 'file': f"{table}.{stamp}.{i}"})
+        else:
+            _save_array(f"{prefix}.npy", series.to_numpy())
+            columns.append({'name': name, 'kind': 'array', 'file': f"{table}.{stamp}.{i}"})
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'table': table,
+        'source': os.path.basename(path),
+        'source_mtime_ns': source_stat.st_mtime_ns,
+        'source_size': source_stat.st_size,
+        'rows': len(df),
+        'columns': columns,
+    }
+    tmp_path = f"{_manifest_path(table)}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(table))
+
+    _remove_stale_columns(table, stamp)
+    return manifest
+
+
+def _remove_stale_columns(table: str, keep_stamp: int):
+    """Best-effort cleanup of column files from older snapshots of a table."""
+    prefix = f"{table}."
+    for name in os.listdir(SNAPSHOT_DIR):
+        if (name.startswith(prefix) and name.endswith('.npy')
+                and not name.startswith(f"{table}.{keep_stamp}.")):
+            try:
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+            except OSError:
+                pass
+
+
+def _load_column(column: dict):
+    """
+    Load (once per process) a column's read-only, memory-mapped arrays.
+
+    Text columns are kept as their codes and fixed-width values arrays rather
+    than as an object array: they hold no Python objects, so reading them
+    never writes a reference count, and pages shared with a parent process
+    (see server.py) or with other processes mapping the same file stay shared.
+    """
+    key = column['file']
+    if key in _loaded_columns:
+        return _loaded_columns[key]
+
+    prefix = os.path.join(SNAPSHOT_DIR, key)
+    if column['kind'] == 'array':
+        result = np.load(f"{prefix}.npy", mmap_mode='r')
+    else:
+        result = (np.load(f"{prefix}.codes.npy", mmap_mode='r'),
+                  np.load(f"{prefix}.values.npy", mmap_mode='r'))
+
+    _loaded_columns[key] = result
+    return result
+
+
+def _column_values(column: dict, categorical: bool = False):
+    """
+    Column data for a DataFrame; text columns are decoded into a new object
+    array, or wrapped as a Categorical over the snapshot codes if categorical.
+    """
+    loaded = _load_column(column)
+    if column['kind'] == 'array':
+        return pd.Categorical(loaded) if categorical else loaded
+
+    codes, values = loaded
+    if categorical:
+        return pd.Categorical.from_codes(np.asarray(codes), categories=values.astype(object))
+
+    result = np.empty(len(codes), dtype=object)
+    present = codes >= 0
+    result[present] = values.astype(object)[codes[present]]
+    result[~present] = np.nan
+    return result
+
+
+def _forget_table(table: str):
+    """Drop this process's memoized snapshot of a table."""
+    _loaded_manifests.pop(table, None)
+    for key in [k for k in _loaded_columns if k.startswith(f"{table}.")]:
+        del _loaded_columns[key]
+
+
+def load_snapshot(manifest: dict, usecols=None, mmap: bool = False, categories=()) -> pd.DataFrame:
+    """
+    Rebuild a DataFrame from its snapshot, with the columns named in
+    categories as categoricals.
+
+    Columns are loaded once per process and kept read-only and memory-mapped,
+    so processes that load the same snapshot share those pages. By default
+    the returned frame owns a private copy and may be modified freely. With
+    mmap=True numeric columns wrap the shared arrays directly and callers
+    must treat the frame as read-only.
+    """
+    columns = manifest['columns']
+    if usecols is not None:
+        wanted = set(usecols)
+        columns = [c for c in columns if c['name'] in wanted]
+    data = {c['name']: _column_values(c, c['name'] in categories) for c in columns}
+    return pd.DataFrame(data, copy=not mmap)
+
+
+def read_dataset(path: str, usecols=None, mmap: bool = False, categories=()) -> pd.DataFrame:
+    """
+    Load a CSV from the data directory through its columnar snapshot.
+
+    Equivalent to pd.read_csv(path, encoding='utf-8-sig'), rebuilding the
+    snapshot first when the CSV is newer, except that the columns named in
+    categories are loaded as categoricals. Falls back to parsing the CSV if
+    the snapshot cannot be written or read.
+    """
+    try:
+        source_stat = os.stat(path)
+        table = _table_name(path)
+        manifest = _read_manifest(table)
+        if not _is_fresh(manifest, source_stat):
+            with _snapshot_lock:
+                _forget_table(table)
+                manifest = _read_manifest(table)
+                if not _is_fresh(manifest, source_stat):
+                    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+                    with _build_lock(table):
+                        # Another worker may have built it while we waited
+                        manifest = _read_manifest(table)
+                        if not _is_fresh(manifest, os.stat(path)):
+                            manifest = build_snapshot(path)
+                _loaded_manifests[table] = manifest
+        return load_snapshot(manifest, usecols=usecols, mmap=mmap, categories=categories)
+    except FileNotFoundError:
+        raise
+    except Exception as e:
+        print(f"Error loading snapshot for {path}, reading CSV: {e}")
+        return pd.read_csv(path, encoding='utf-8-sig', usecols=usecols,
+                           dtype={name: 'category' for name in categories})
+
+
+# ===== TYPED TABLES =====
+
+SEASON_DTYPE = 'int16'
+COUNT_DTYPE = 'int16'
+CAREER_SUM_COLUMNS = ['Goals', 'Assists', 'Saves', 'POTM', 'MP', 'Yellow', 'Red']
+
+# Table name (CSV file name without .csv) -> how to type its columns:
+#   categories: columns loaded as categoricals
+#   counts:     integer columns narrowed to COUNT_DTYPE (missing values -> 0)
+#   cards:      a "yellow-red" column parsed into Yellow and Red
+TABLE_SCHEMAS = {
+    'season_player_stats': {
+        'categories': ['Name', 'Team', 'Y-R', 'Record'],
+        'counts': ['Goals', 'Assists', 'Saves', 'POTM', 'MP'],
+        'cards': 'Y-R',
+    },
+    'player_match_stats': {
+        'categories': ['Name', 'My Team', 'Opponent', 'Start?', 'P', 'Y-R'],
+        'counts': ['External Sub', 'POTM', 'G', 'A', 'S'],
+        'cards': 'Y-R',
+    },
+    'Match_Results': {
+        'categories': ['Team 1', 'Team 2', 'Group', 'Time'],
+        'counts': ['Red Card Team 1', 'Red Card Team 2', 'Win Team 1', 'Win Team 2'],
+    },
+}
+
+
+def _card_count(value, index: int) -> int:
+    parts = str(value).split('-')
+    if index >= len(parts):
+        return 0
+    part = parts[index].strip()
+    return int(part) if part.isdigit() else 0
+
+
+def parse_cards(series: pd.Series):
+    """
+    Split a 'Y-R' column ("1-0" is one yellow, no red) into integer
+    (yellow, red) Series. Missing or unreadable values count as 0.
+
+    Each distinct value is parsed once, so categorical columns cost one
+    lookup per row rather than a string split.
+    """
+    labels = series.astype('category')
+    categories = labels.cat.categories
+    codes = labels.cat.codes.to_numpy()
+    # Code -1 (missing) picks the trailing 0
+    yellow = np.array([_card_count(c, 0) for c in categories] + [0], dtype=COUNT_DTYPE)
+    red = np.array([_card_count(c, 1) for c in categories] + [0], dtype=COUNT_DTYPE)
+    return (pd.Series(yellow[codes], index=series.index, name='Yellow'),
+            pd.Series(red[codes], index=series.index, name='Red'))
+
+
+def _split_totals(df):
+    """(rows with an integer Season, 'Total' rows)."""
+    if pd.api.types.is_numeric_dtype(df['Season']):
+        season_rows, total_rows = df.copy(), df.iloc[0:0]
+    else:
+        is_total = df['Season'].astype(str) == 'Total'
+        season_rows, total_rows = df[~is_total].copy(), df[is_total]
+    season_rows['Season'] = pd.to_numeric(season_rows['Season'], errors='coerce').fillna(0).astype(SEASON_DTYPE)
+    return season_rows, total_rows
+
+
+def split_career_stats(stats_df):
+    """
+    Split player stats into (per-season rows, career rows).
+
+    Season rows get an integer Season. Career rows are the 'Total' rows when
+    the data has them; otherwise they are summed from the season rows,
+    keeping each player's latest team. Career rows have no Season column.
+    """
+    df = stats_df.copy()
+    for col in CAREER_SUM_COLUMNS:
+        if col in df.columns and not pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    season_rows, total_rows = _split_totals(df)
+    if not total_rows.empty:
+        return season_rows, total_rows.drop(columns='Season').reset_index(drop=True)
+
+    ordered = season_rows.sort_values('Season', kind='stable')
+    by_name = ordered.groupby('Name', sort=False, observed=True)
+    sum_cols = [c for c in CAREER_SUM_COLUMNS if c in ordered.columns]
+    career_rows = by_name[sum_cols].sum()
+    career_rows['Team'] = by_name['Team'].last()
+    return season_rows, career_rows.reset_index()
+
+
+def _typed_frame(name: str) -> pd.DataFrame:
+    schema = TABLE_SCHEMAS[name]
+    df = read_dataset(os.path.join(DATA_DIR, f"{name}.csv"), categories=schema.get('categories', ()))
+    for col in schema.get('counts', ()):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(COUNT_DTYPE)
+    cards = schema.get('cards')
+    if cards in df.columns:
+        df['Yellow'], df['Red'] = parse_cards(df[cards])
+    return df
+
+
+def load_table(name: str) -> pd.DataFrame:
+    """
+    Load one of the TABLE_SCHEMAS tables with compact dtypes.
+
+    Season is an integer column and career ('Total') rows are left out; see
+    load_career_table(). Each call returns a new frame.
+    """
+    df = _typed_frame(name)
+    if 'Season' not in df.columns:
+        return df
+    return _split_totals(df)[0]
+
+
+def load_career_table() -> pd.DataFrame:
+    """One row of career totals per player, from season_player_stats."""
+    return split_career_stats(_typed_frame('season_player_stats'))[1]
+
+
+# ===== APPENDS =====
+
+def _line_ending(path: str) -> str:
+    """The line ending used by the CSV's header row."""
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+    return '\r\n' if first_line.endswith(b'\r\n') else '\n'
+
+
+def _encoding(path: str) -> str:
+    """'utf-8-sig' if the CSV starts with a byte order mark, else 'utf-8'."""
+    with open(path, 'rb') as f:
+        return 'utf-8-sig' if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 'utf-8'
+
+
+def append_rows(path: str, rows: list) -> int:
+    """
+    Append rows (dicts keyed by column name) to the end of a CSV.
+
+    Values are written in the order of the file's header, with its line
+    ending; columns a row does not have are left empty. The rows are
+    serialized first and written with one write under the dataset lock, then
+    fsynced. The rest of the file is not rewritten. Returns the number of
+    rows written.
+    """
+    if not rows:
+        return 0
+    with dataset_lock(path):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            header = [col.strip() for col in next(csv.reader(f))]
+        line_ending = _line_ending(path)
+
+        buffer = io.StringIO()
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b'\n', b'\r'):
+                    buffer.write(line_ending)
+        writer = csv.writer(buffer, lineterminator=line_ending)
+        for row in rows:
+            writer.writerow(['' if row.get(col) is None else row.get(col) for col in header])
+
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+    return len(rows)
+
+
+def replace_csv(path: str, df: pd.DataFrame):
+    """
+    Write df over the CSV at path, for files small enough to rewrite.
+
+    The new contents go to a temporary file that is fsynced and renamed over
+    the old one under the dataset lock, so readers see either file whole. An
+    existing file's byte order mark and line ending are kept.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with dataset_lock(path):
+        encoding, line_ending = 'utf-8', '\n'
+        if os.path.exists(path):
+            encoding, line_ending = _encoding(path), _line_ending(path)
+        with open(tmp_path, 'w', encoding=encoding, newline='') as f:
+            df.to_csv(f, index=False, lineterminator=line_ending)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def build_all_snapshots() -> list:
+    """Snapshot every CSV in the data directory (e.g. as a deploy step)."""
+    manifests = []
+    for name in _dataset_files():
+        manifests.append(build_snapshot(os.path.join(DATA_DIR, name)))
+    return manifests
+
+
+if __name__ == "__main__":
+    for built in build_all_snapshots():
+        print(f"{built['table']}: {built['rows']} rows, {len(built['columns'])} columns")
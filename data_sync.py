@@ -0,0 +1,214 @@
+"""
+Incremental sync of submitted matches from Firebase into the local datasets.
+
+submit_match_result stores each match under game_day_stats/MD{n}_S{s}/{id}.
+sync_new_matches() copies the matches the CSVs do not have yet into
+Match_Results.csv and player_match_stats.csv:
+
+- The watermark is the highest Match ID in Match_Results.csv, so it
+  survives restarts and is shared by every worker on the machine.
+- Only matchdays of the watermark's season or later are read, each with a
+  key-ordered query that starts after the watermark.
+- Matches are synced in ID order and stop at a missing ID, in case it is
+  still being written, unless a later match is older than SYNC_GAP_SECONDS.
+- Entries are converted to the canonical columns and appended to the end of
+  each file (data_store.append_rows), then the data version is bumped so
+  every cache derived from the CSVs reloads.
+- The new matches are then applied to season_standings.csv and
+  season_player_stats.csv (season_tables.update_season_tables).
+
+match_syncer runs the sync every SYNC_INTERVAL_SECONDS in a background thread
+and right after a match is submitted. A file lock keeps worker processes from
+appending the same matches twice.
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+from firebase_admin import db
+from data_store import DATA_DIR, FileLock, read_dataset, append_rows, bump_data_version
+from season_tables import update_season_tables
+
+GAME_DAY_PATH = 'game_day_stats'
+MATCHDAY_KEY = re.compile(r'^MD(\d+)_S(\d+)$')
+RESULTS_PATH = os.path.join(DATA_DIR, 'Match_Results.csv')
+PLAYER_STATS_PATH = os.path.join(DATA_DIR, 'player_match_stats.csv')
+SYNC_LOCK_PATH = os.path.join(DATA_DIR, '.cache', 'sync.lock')
+SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", "60"))
+# A missing match ID older than this is assumed abandoned and skipped
+SYNC_GAP_SECONDS = 600
+
+
+def synced_watermark() -> tuple:
+    """(highest Match ID, its Season) in Match_Results.csv; (-1, 0) when empty."""
+    results = read_dataset(RESULTS_PATH, usecols=['Match ID', 'Season'])
+    if results.empty:
+        return -1, 0
+    last = results.loc[results['Match ID'].idxmax()]
+    return int(last['Match ID']), int(last['Season'])
+
+
+def fetch_matches_after(watermark: int, season: int) -> list:
+    """Submitted matches with an ID above watermark from matchdays of season or later, by ID."""
+    matchday_keys = db.reference(GAME_DAY_PATH).get(shallow=True) or {}
+    matches = []
+    for key in matchday_keys:
+        parsed = MATCHDAY_KEY.match(key)
+        if not parsed or int(parsed.group(2)) < season:
+            continue
+        entries = (
+            db.reference(f"{GAME_DAY_PATH}/{key}")
+            .order_by_key().start_at(str(watermark + 1)).get()
+        ) or {}
+        values = entries.values() if isinstance(entries, dict) else entries
+        for entry in values:
+            if isinstance(entry, dict) and int(entry.get('match_id', -1)) > watermark:
+                matches.append(entry)
+    return sorted(matches, key=lambda entry: int(entry['match_id']))
+
+
+def _submitted_age(entry: dict) -> float:
+    try:
+        return (datetime.now() - datetime.fromisoformat(entry.get('submitted_at', ''))).total_seconds()
+    except (TypeError, ValueError):
+        return float('inf')
+
+
+def ready_matches(matches: list, watermark: int) -> list:
+    """The matches to sync now: consecutive IDs after watermark, skipping only stale gaps."""
+    ready = []
+    expected = watermark + 1
+    for entry in matches:
+        match_id = int(entry['match_id'])
+        if match_id != expected and _submitted_age(entry) < SYNC_GAP_SECONDS:
+            break
+        ready.append(entry)
+        expected = match_id + 1
+    return ready
+
+
+def match_result_row(match: dict) -> dict:
+    """A game_day_stats entry as a Match_Results.csv row."""
+    score1, score2 = int(match['score1']), int(match['score2'])
+    players = list(match.get('player_stats') or []) + list(match.get('external_subs') or [])
+    red_cards = {match['team1']: 0, match['team2']: 0}
+    for stat in players:
+        if stat.get('team') in red_cards:
+            red_cards[stat['team']] += int(stat.get('red_cards', 0))
+    return {
+        'Team 1': match['team1'],
+        'Team 2': match['team2'],
+        'Season': int(match['season']),
+        'Group': match.get('group', ''),
+        'Match ID': int(match['match_id']),
+        'Score Team 1': score1,
+        'Score Team 2': score2,
+        'Time': 'Final',
+        'Red Card Team 1': red_cards[match['team1']],
+        'Red Card Team 2': red_cards[match['team2']],
+        'Win Team 1': int(score1 > score2),
+        'Win Team 2': int(score2 > score1),
+    }
+
+
+def player_match_rows(match: dict) -> list:
+    """
+    A game_day_stats entry as player_match_stats.csv rows.
+
+    The data entry form records neither positions nor starts, so P and
+    Start? are left blank; fantasy scoring falls back to the player's
+    primary position and gives no start bonus for such rows.
+    """
+    opponents = {match['team1']: match['team2'], match['team2']: match['team1']}
+    rows = []
+    for stat in list(match.get('player_stats') or []) + list(match.get('external_subs') or []):
+        if not stat.get('player'):
+            continue
+        external = bool(stat.get('is_external'))
+        rows.append({
+            'Name': stat['player'],
+            'Season': int(match['season']),
+            'Match ID': int(match['match_id']),
+            'My Team': stat.get('team', ''),
+            'Start?': '',
+            'External Sub': int(external),
+            'P': '',
+            'Y-R': f"{int(stat.get('yellow_cards', 0))}-{int(stat.get('red_cards', 0))}",
+            'POTM': int(bool(stat.get('is_potm'))),
+            'G': int(stat.get('goals', 0)),
+            'A': int(stat.get('assists', 0)),
+            'S': int(stat.get('saves', 0)),
+            'Opponent': opponents.get(stat.get('team'), ''),
+        })
+    return rows
+
+
+def sync_new_matches() -> dict:
+    """Append every ready match above the watermark to the CSVs. Returns a report."""
+    watermark, season = synced_watermark()
+    matches = ready_matches(fetch_matches_after(watermark, season), watermark)
+    report = {'watermark': watermark, 'synced': 0, 'player_rows': 0, 'aggregated': 0}
+    if not matches:
+        # Also catches the season tables up after a crash mid-sync
+        report['aggregated'] = update_season_tables(watermark)
+        return report
+
+    player_rows = [row for match in matches for row in player_match_rows(match)]
+    # Player rows first: a crash in between leaves the watermark (from
+    # Match_Results) behind, and the retry skips player rows already written
+    existing = set(read_dataset(PLAYER_STATS_PATH, usecols=['Match ID'])['Match ID'].astype(int))
+    report['player_rows'] = append_rows(
+        PLAYER_STATS_PATH, [row for row in player_rows if row['Match ID'] not in existing]
+    )
+    report['synced'] = append_rows(RESULTS_PATH, [match_result_row(match) for match in matches])
+    report['watermark'] = int(matches[-1]['match_id'])
+    bump_data_version()
+    report['aggregated'] = update_season_tables(watermark)
+    return report
+
+
+class MatchSyncer:
+    """Runs sync_new_matches() on demand and every interval seconds in the background."""
+
+    def __init__(self, interval: float = SYNC_INTERVAL_SECONDS, lock_path: str = SYNC_LOCK_PATH):
+        self.interval = interval
+        self.lock_path = lock_path
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self) -> dict:
+        """Sync now; one sync at a time across threads and processes."""
+        with self._lock, FileLock(self.lock_path):
+            report = sync_new_matches()
+        report['synced_at'] = datetime.now().isoformat()
+        self.last_report = report
+        if report['synced']:
+            print(f"Synced {report['synced']} matches up to Match ID {report['watermark']}")
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Error syncing matches: {e}")
+
+    def start(self):
+        """Start the background sync thread (once)."""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='match-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+
+match_syncer = MatchSyncer()
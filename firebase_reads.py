@@ -0,0 +1,116 @@
+"""
+Deduplicated Firebase reads.
+
+read(path) is db.reference(path).get() with two kinds of deduplication:
+
+- Within a request (a scope opened by FirebaseReadScopeMiddleware), each path
+  is fetched at most once. Later reads of that path, or of anything below a
+  path already fetched, are answered from the earlier result. Code that
+  writes a path should call forget(path), so that a read after the write in
+  the same request goes back to Firebase.
+- Across threads, a read of a path that is already being fetched waits for
+  that fetch instead of issuing another one (single-flight).
+
+Results are deep copies, so callers may modify what they get back. Outside a
+request scope only the single-flight part applies.
+"""
+
+import copy
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from firebase_admin import db
+
+# path -> value fetched during the current request; None outside a request
+_request_reads: ContextVar = ContextVar('firebase_request_reads', default=None)
+
+_inflight_lock = threading.Lock()
+_inflight = {}
+
+
+def _normalize(path: str) -> str:
+    return '/'.join(part for part in path.split('/') if part)
+
+
+@contextmanager
+def request_scope():
+    """Open a read memo for the duration of one request."""
+    token = _request_reads.set({})
+    try:
+        yield
+    finally:
+        _request_reads.reset(token)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _fetch(path: str):
+    """Read path from Firebase, sharing the result with concurrent readers of it."""
+    with _inflight_lock:
+        flight = _inflight.get(path)
+        leader = flight is None
+        if leader:
+            flight = _inflight[path] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = db.reference(path).get()
+        return flight.value
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(path, None)
+        flight.done.set()
+
+
+def _lookup(memo: dict, path: str):
+    """(True, value) if path, or an ancestor of it, was already read in this request."""
+    if path in memo:
+        return True, memo[path]
+    parts = path.split('/')
+    for i in range(len(parts) - 1, 0, -1):
+        ancestor = '/'.join(parts[:i])
+        if ancestor in memo:
+            value = memo[ancestor]
+            for part in parts[i:]:
+                value = value.get(part) if isinstance(value, dict) else None
+            return True, value
+    return False, None
+
+
+def read(path: str):
+    """Return the value at path, like db.reference(path).get()."""
+    path = _normalize(path)
+    memo = _request_reads.get()
+    if memo is not None:
+        found, value = _lookup(memo, path)
+        if found:
+            return copy.deepcopy(value)
+
+    value = _fetch(path)
+    if memo is not None:
+        memo[path] = value
+    return copy.deepcopy(value)
+
+
+def forget(path: str):
+    """Drop memoized reads that overlap path, e.g. after writing it."""
+    memo = _request_reads.get()
+    if not memo:
+        return
+    path = _normalize(path)
+    for key in list(memo):
+        if key == path or key.startswith(f"{path}/") or path.startswith(f"{key}/"):
+            del memo[key]
@@ -0,0 +1,119 @@
+"""
+In-memory replicas of small Firebase nodes.
+
+Nodes like Fantasy/current_week are read on nearly every request but only
+change a few times a week. A FirebaseReplica keeps a local copy so those
+reads are synchronous dictionary lookups:
+
+- start() subscribes with Reference.listen(). Firebase streams the node's
+  current value and then every change to it, which are applied to the copy.
+- Without a stream (Firebase not initialized, start() never called as in
+  tests, or the listener failed to start), get() polls instead: the node is
+  re-read once the copy is older than poll_seconds.
+- apply() records a write this process has just made, so the writer sees
+  its own change immediately rather than when the stream or poll catches up.
+"""
+
+import copy
+import os
+import threading
+import time
+from firebase_admin import db
+
+REPLICA_POLL_SECONDS = float(os.getenv("REPLICA_POLL_SECONDS", "15"))
+
+
+def _split_path(path: str) -> list:
+    return [part for part in (path or '').split('/') if part]
+
+
+def _set_path(node, parts: list, value):
+    """Return node with value stored at parts, like a Firebase set (None deletes)."""
+    if not parts:
+        return value
+    result = dict(node) if isinstance(node, dict) else {}
+    child = _set_path(result.get(parts[0]), parts[1:], value)
+    if child is None:
+        result.pop(parts[0], None)
+    else:
+        result[parts[0]] = child
+    return result or None
+
+
+class FirebaseReplica:
+    """Local copy of one Firebase node, kept fresh by a listener or by polling."""
+
+    def __init__(self, path: str, poll_seconds: float = REPLICA_POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._value = None
+        self._fetched_at = None
+        self._listener = None
+        # True once the stream has delivered the node's initial value
+        self._streaming = False
+
+    def start(self) -> bool:
+        """Subscribe to changes; returns False (and keeps polling) if listening is unavailable."""
+        if self._listener is not None:
+            return True
+        try:
+            self._listener = db.reference(self.path).listen(self._on_event)
+            return True
+        except Exception as e:
+            print(f"Error listening to {self.path}, polling instead: {e}")
+            return False
+
+    def stop(self):
+        """Close the listener and fall back to polling."""
+        listener, self._listener = self._listener, None
+        with self._lock:
+            self._streaming = False
+            self._fetched_at = None
+        if listener is not None:
+            try:
+                listener.close()
+            except Exception as e:
+                print(f"Error closing listener for {self.path}: {e}")
+
+    def _on_event(self, event):
+        parts = _split_path(event.path)
+        with self._lock:
+            if event.event_type == 'put':
+                self._value = _set_path(self._value, parts, event.data)
+            elif event.event_type == 'patch':
+                for key, value in (event.data or {}).items():
+                    self._value = _set_path(self._value, parts + _split_path(key), value)
+            self._streaming = True
+            self._fetched_at = time.monotonic()
+
+    def apply(self, value, path: str = ''):
+        """Record a write this process made to path (relative to the node)."""
+        with self._lock:
+            self._value = _set_path(self._value, _split_path(path), copy.deepcopy(value))
+
+    def invalidate(self):
+        """Force the next get() to re-read the node when not streaming."""
+        with self._lock:
+            self._fetched_at = None
+
+    def get(self):
+        """Current value of the node, like Reference.get() but from memory."""
+        with self._lock:
+            if self._streaming or (
+                self._fetched_at is not None
+                and time.monotonic() - self._fetched_at < self.poll_seconds
+            ):
+                return copy.deepcopy(self._value)
+
+        try:
+            value = db.reference(self.path).get()
+        except Exception as e:
+            print(f"Error reading {self.path}: {e}")
+            value = self._value
+
+        with self._lock:
+            if not self._streaming:
+                self._value = value
+                self._fetched_at = time.monotonic()
+            return copy.deepcopy(self._value)
@@ -2,7 +2,7 @@ import yagmail
 import os, tempfile
 import json, ast, pandas as pd
 from dotenv import load_dotenv
-from functools import lru_cache
+from caching import memoize
 
 load_dotenv()
 
@@ -58,7 +58,7 @@ def send_email(email, bccs, subject, message, attachment=None):
             except OSError as e:
                 print(f"Failed to remove temp file: {str(e)}")
 
-@lru_cache(maxsize=5)
+@memoize('recent_potm', max_bytes=256 * 1024)
 def get_k_recent_potm(k, season=None):
     match_results = pd.read_csv('data/Match_Results.csv')
     if season:
@@ -0,0 +1,289 @@
+"""
+Background jobs for long admin operations.
+
+Operations that loop over every fantasy user (processing a matchweek,
+snapshotting teams, resetting transfers, starting a season) used to run
+inside the HTTP request. They now run on a small thread pool instead:
+
+    job = job_runner.submit('set_current_week', run, season, matchweek)
+
+The endpoint redirects to a status page that polls GET /admin/jobs/{id}.
+run(job, ...) reports as it goes with job.start(total), job.advance(...)
+and job.error(...), and returns the message shown when it finishes.
+
+At most one job of each kind is queued or running at a time; submitting
+another raises JobConflict carrying the active job. Across worker processes
+this is enforced by FirebaseJobLock, a transaction on AdminJobs/active/{kind}
+taken on submit and released when the job finishes or fails. Job state is
+mirrored to Firebase (AdminJobs/{id}) so a status poll that reaches a
+different worker process can still answer it.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from firebase_admin import db
+
+JOB_WORKERS = 2
+# Finished jobs kept in memory for status polls
+JOB_HISTORY = 50
+# Minimum seconds between progress writes to Firebase while a job runs
+JOB_PUBLISH_SECONDS = 1.0
+# Errors recorded per job; later ones are only counted
+JOB_MAX_ERRORS = 100
+# Seconds after which a kind lock left by a dead worker may be taken over
+JOB_LOCK_SECONDS = 6 * 3600
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobConflict(Exception):
+    """A job of the same kind is already queued or running."""
+
+    def __init__(self, job):
+        super().__init__(f"A {job.kind} job is already {job.status}")
+        self.job = job
+
+
+class Job:
+    """Progress and outcome of one background job."""
+
+    def __init__(self, kind: str, description: str = '', return_url: str = ''):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.description = description or kind
+        self.return_url = return_url
+        self.status = 'queued'
+        self.total = None
+        self.done = 0
+        self.counts = {}
+        self.errors = []
+        self.error_count = 0
+        self.message = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._on_change = None
+        self._published_at = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def start(self, total: int):
+        """Record how many items the job will work through."""
+        with self._lock:
+            self.total = total
+        self._changed()
+
+    def advance(self, n: int = 1, **counts):
+        """Mark n more items done, adding any named counts (e.g. skipped=1)."""
+        with self._lock:
+            self.done += n
+            for name, value in counts.items():
+                self.counts[name] = self.counts.get(name, 0) + value
+        self._changed()
+
+    def error(self, message: str, item=None):
+        """Record a failure for one item; the job carries on."""
+        with self._lock:
+            self.error_count += 1
+            if len(self.errors) < JOB_MAX_ERRORS:
+                self.errors.append({'item': item, 'error': str(message)} if item is not None else {'error': str(message)})
+        self._changed()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'description': self.description,
+                'return_url': self.return_url,
+                'status': self.status,
+                'total': self.total,
+                'done': self.done,
+                'percent': round(100 * self.done / self.total, 1) if self.total else None,
+                'counts': dict(self.counts),
+                'errors': list(self.errors),
+                'error_count': self.error_count,
+                'message': self.message,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+    def _set_status(self, status: str, message: str = None):
+        with self._lock:
+            self.status = status
+            if status == 'running':
+                self.started_at = datetime.now().isoformat()
+            elif status in ('succeeded', 'failed'):
+                self.finished_at = datetime.now().isoformat()
+            if message is not None:
+                self.message = message
+        self._changed(force=True)
+
+    def _changed(self, force: bool = False):
+        if self._on_change is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._published_at < JOB_PUBLISH_SECONDS:
+            return
+        self._published_at = now
+        self._on_change(self)
+
+
+def publish_to_firebase(job: Job):
+    """Mirror a job's state to AdminJobs/{id}."""
+    try:
+        db.reference(f'AdminJobs/{job.id}').set(job.to_dict())
+    except Exception as e:
+        print(f"Error publishing job {job.id}: {e}")
+
+
+class FirebaseJobLock:
+    """Per-kind job lock at AdminJobs/active/{kind}, shared by every worker process."""
+
+    def __init__(self, path: str = 'AdminJobs/active', stale_seconds: float = JOB_LOCK_SECONDS):
+        self.path = path
+        self.stale_seconds = stale_seconds
+
+    def acquire(self, job: Job):
+        """Take the lock for job's kind; returns None, or the id of the job already holding it."""
+        holder = []
+
+        def claim(current):
+            holder.clear()  # Transactions may retry
+            if current and current.get('id') != job.id and time.time() - current.get('acquired_at', 0) < self.stale_seconds:
+                holder.append(current['id'])
+                return current
+            return {'id': job.id, 'acquired_at': time.time()}
+
+        db.reference(f'{self.path}/{job.kind}').transaction(claim)
+        return holder[0] if holder else None
+
+    def release(self, job: Job):
+        """Free the lock for job's kind if job still holds it."""
+        def free(current):
+            return None if current and current.get('id') == job.id else current
+
+        try:
+            db.reference(f'{self.path}/{job.kind}').transaction(free)
+        except Exception as e:
+            print(f"Error releasing {job.kind} job lock: {e}")
+
+
+class JobRunner:
+    """Thread pool running jobs, with at most one active job per kind."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS, history: int = JOB_HISTORY, publish=None, lock=None):
+        self.max_workers = max_workers
+        self.history = history
+        self.publish = publish
+        # Cross-process lock (e.g. FirebaseJobLock); without one, kinds are only exclusive in this process
+        self.lock = lock
+        self._executor = None
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so importing the app (and forking workers) starts no threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        return self._executor
+
+    def submit(self, kind: str, func, *args, description: str = '', return_url: str = '', **kwargs) -> Job:
+        """Queue func(job, *args, **kwargs); raises JobConflict if a kind job is active."""
+        with self._lock:
+            active = self._active(kind)
+        if active is not None:
+            raise JobConflict(active)
+
+        job = Job(kind, description, return_url)
+        # Taken outside self._lock, so a slow Firebase call never blocks status polls
+        holder = self.lock.acquire(job) if self.lock is not None else None
+        if holder is not None:
+            # Active in another worker process; its status page reads AdminJobs/{id}
+            active = Job(kind)
+            active.id, active.status = holder, 'running'
+            raise JobConflict(active)
+
+        with self._lock:
+            # Another thread may have registered one while the lock was taken
+            active = self._active(kind)
+            if active is None:
+                job._on_change = self.publish
+                self._jobs[job.id] = job
+                self._prune()
+                executor = self._get_executor()
+        if active is not None:
+            if self.lock is not None:
+                self.lock.release(job)
+            raise JobConflict(active)
+
+        job._changed(force=True)
+        executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _active(self, kind: str):
+        """This process's queued or running kind job, or None; call with self._lock held."""
+        for job in self._jobs.values():
+            if job.kind == kind and job.active:
+                return job
+        return None
+
+    def _run(self, job: Job, func, args, kwargs):
+        job._set_status('running')
+        try:
+            status, message = 'succeeded', func(job, *args, **kwargs)
+        except Exception as e:
+            print(f"Error in {job.kind} job {job.id}: {e}")
+            status, message = 'failed', str(e)
+        # Released before the job reports finishing, so a resubmit after wait() is not refused
+        if self.lock is not None:
+            self.lock.release(job)
+        job._set_status(status, message)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str):
+        """Job by id from this process, or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 10) -> list:
+        """Most recently created jobs first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)[:limit]
+
+    def wait(self, job_id: str, timeout: float = None) -> bool:
+        """Block until a job finishes (used by tests and scripts); False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and job.active:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+def job_status(job_id: str):
+    """Status dict for job_id from this process, else from Firebase, else None."""
+    job = job_runner.get(job_id)
+    if job is not None:
+        return job.to_dict()
+    try:
+        return db.reference(f'AdminJobs/{job_id}').get() or None
+    except Exception as e:
+        print(f"Error reading job {job_id}: {e}")
+        return None
+
+
+job_runner = JobRunner(publish=publish_to_firebase, lock=FirebaseJobLock())
@@ -36,6 +36,9 @@ class FirebaseLogger:
         if IS_PRODUCTION:
             self._start_worker()
             logger.info("Firebase logger background worker started (PRODUCTION MODE)")
+            # Threads do not survive fork(); pre-forked workers (server.py) need their own
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._restart_after_fork)
         else:
             logger.info("Firebase logging DISABLED (LOCAL DEVELOPMENT MODE)")
 
@@ -45,6 +48,13 @@ class FirebaseLogger:
         worker.start()
         logger.info("Firebase logger background worker started")
 
+    def _restart_after_fork(self):
+        """Give a forked worker an empty queue and its own background thread"""
+        global log_queue
+        log_queue = queue.Queue(maxsize=1000)
+        self.db_ref = None
+        self._start_worker()
+
     def _process_queue(self):
         """Process log entries from queue in background"""
         while self.running:
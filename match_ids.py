@@ -0,0 +1,89 @@
+"""
+Match ID allocation for submitted matches.
+
+Match IDs used to be computed on every submission as one more than the
+highest ID in Match_Results.csv and the whole game_day_stats tree, which
+was slow and let two admins submitting at once get the same ID. IDs now
+come from a single counter node holding the last ID handed out:
+
+    first_id = match_id_allocator.allocate()      # or allocate(count) for a batch
+
+Each allocation is one Firebase transaction on MATCH_ID_COUNTER_PATH, so
+concurrent submissions always get distinct IDs. The first allocation seeds
+the counter from the highest existing ID (seed_match_id), after which the
+match data is never scanned again.
+
+InMemoryMatchIdAllocator has the same interface without Firebase, for tests.
+"""
+
+import threading
+from firebase_admin import db
+from data_sync import GAME_DAY_PATH, synced_watermark
+
+MATCH_ID_COUNTER_PATH = 'Counters/last_match_id'
+
+
+def seed_match_id() -> int:
+    """The highest match ID in Match_Results.csv or game_day_stats (0 if none)."""
+    highest = 0
+    try:
+        highest = max(highest, synced_watermark()[0])
+    except Exception as e:
+        print(f"Could not read CSV for match ID: {e}")
+
+    try:
+        matchday_keys = db.reference(GAME_DAY_PATH).get(shallow=True) or {}
+        for matchday_key in matchday_keys:
+            match_keys = db.reference(f"{GAME_DAY_PATH}/{matchday_key}").get(shallow=True) or {}
+            for match_key in match_keys:
+                try:
+                    highest = max(highest, int(match_key))
+                except ValueError:
+                    continue
+    except Exception as e:
+        print(f"Could not read Firebase for match ID: {e}")
+    return highest
+
+
+class MatchIdAllocator:
+    """Hands out match IDs from a Firebase counter, seeded once from existing matches."""
+
+    def __init__(self, counter_path: str = MATCH_ID_COUNTER_PATH, seed=seed_match_id):
+        self.counter_path = counter_path
+        self.seed = seed
+
+    def allocate(self, count: int = 1) -> int:
+        """Reserve count consecutive IDs and return the first."""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        seeded = []
+
+        def reserve(last_id):
+            if last_id is None:
+                # Transactions may retry; only seed once
+                if not seeded:
+                    seeded.append(self.seed())
+                last_id = seeded[0]
+            return int(last_id) + count
+
+        last_id = db.reference(self.counter_path).transaction(reserve)
+        return int(last_id) - count + 1
+
+
+class InMemoryMatchIdAllocator:
+    """MatchIdAllocator stand-in keeping the counter in memory."""
+
+    def __init__(self, last_id: int = 0):
+        self.last_id = last_id
+        self._lock = threading.Lock()
+
+    def allocate(self, count: int = 1) -> int:
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with self._lock:
+            first_id = self.last_id + 1
+            self.last_id += count
+        return first_id
+
+
+match_id_allocator = MatchIdAllocator()
@@ -0,0 +1,184 @@
+"""
+Whole-matchday uploads for admin data entry.
+
+Instead of entering a matchday one match at a time through the data entry
+form, an admin can upload every result and player line at once, as JSON
+(a list of matches in the form's match_data shape, or {"matches": [...]})
+or as a CSV with one row per player:
+
+    Match,Team 1,Team 2,Score 1,Score 2,Group,Name,Team,Goals,Assists,Saves,Yellow,Red,POTM,External
+
+Match is any non-blank label grouping the rows of one match; a row with no
+Name only declares a match. parse_matchday() turns either format into match dicts,
+validate_matchday() checks every row in one pass against the season's teams
+and rosters, and build_match_entry() produces the game_day_stats entry that
+submit_match_result also stores for a single match.
+"""
+
+import io
+import json
+from datetime import datetime
+import pandas as pd
+
+CSV_MATCH_COLUMNS = {'Team 1': 'team1', 'Team 2': 'team2', 'Score 1': 'score1', 'Score 2': 'score2', 'Group': 'group'}
+CSV_PLAYER_COLUMNS = {'Name': 'name', 'Team': 'team', 'Goals': 'goals', 'Assists': 'assists', 'Saves': 'saves',
+                      'Yellow': 'yellow', 'Red': 'red', 'POTM': 'potm', 'External': 'external'}
+REQUIRED_MATCH_FIELDS = ['team1', 'team2', 'score1', 'score2', 'group']
+PLAYER_COUNT_FIELDS = ['goals', 'assists', 'saves', 'yellow', 'red']
+TRUE_VALUES = {'1', 'y', 'yes', 'true'}
+
+
+def _flag(value) -> bool:
+    return value is True or str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_matchday_csv(text: str) -> list:
+    """Matches (match_data dicts) from a one-row-per-player CSV."""
+    df = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False)
+    df.columns = [col.strip() for col in df.columns]
+    missing = [col for col in ['Match', *CSV_MATCH_COLUMNS, 'Name', 'Team'] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    df['Match'] = df['Match'].str.strip()
+    blank = df.index[df['Match'] == ''] + 2  # Row numbers as in a spreadsheet, after the header
+    if len(blank):
+        raise ValueError(f"Missing Match label on row(s) {', '.join(map(str, blank))}")
+
+    matches = []
+    for _, rows in df.groupby('Match', sort=False):
+        first = rows.iloc[0]
+        match = {field: first[col].strip() for col, field in CSV_MATCH_COLUMNS.items()}
+        match['player_stats'], match['external_subs'] = [], []
+        for row in rows[rows['Name'].str.strip() != ''].to_dict('records'):
+            stat = {field: str(row.get(col, '')).strip() for col, field in CSV_PLAYER_COLUMNS.items()}
+            stat['potm'] = _flag(stat['potm'])
+            external = _flag(stat.pop('external'))
+            if stat['potm']:
+                match['potm'] = stat['name']
+            match['external_subs' if external else 'player_stats'].append(stat)
+        matches.append(match)
+    return matches
+
+
+def parse_matchday(filename: str, content: bytes) -> list:
+    """Matches from an uploaded .json or .csv matchday file."""
+    text = content.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        data = json.loads(text)
+        matches = data.get('matches', []) if isinstance(data, dict) else data
+        if not isinstance(matches, list):
+            raise ValueError("JSON upload must be a list of matches")
+        return matches
+    return parse_matchday_csv(text)
+
+
+def _player_frame(matches: list) -> pd.DataFrame:
+    rows = []
+    for index, match in enumerate(matches):
+        for key, external in (('player_stats', False), ('external_subs', True)):
+            for stat in match.get(key) or []:
+                rows.append({'match': index, 'name': str(stat.get('name', '')).strip(),
+                             'team': str(stat.get('team', '')).strip(), 'external': external,
+                             'manual': _flag(stat.get('is_manual', False)),
+                             **{field: stat.get(field, 0) for field in PLAYER_COUNT_FIELDS}})
+    columns = ['match', 'name', 'team', 'external', 'manual', *PLAYER_COUNT_FIELDS]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def validate_matchday(matches: list, teams: list, rosters: dict) -> list:
+    """
+    Every problem with an upload, as messages naming the match (empty if valid).
+
+    teams are the season's teams and rosters maps each team to its players;
+    players not on their team's roster must be external subs or marked
+    is_manual, as in the entry form.
+    """
+    if not matches:
+        return ["No matches in upload"]
+
+    errors = []
+    results = pd.DataFrame([{field: match.get(field) for field in REQUIRED_MATCH_FIELDS} for match in matches])
+    labels = pd.Series([f"Match {i + 1}" for i in range(len(matches))])
+
+    for field in REQUIRED_MATCH_FIELDS:
+        missing = results[field].isna() | (results[field].astype(str).str.strip() == '')
+        errors += [f"{label}: missing {field}" for label in labels[missing]]
+    for field in ('score1', 'score2'):
+        scores = pd.to_numeric(results[field], errors='coerce')
+        errors += [f"{label}: {field} must be a whole number" for label in labels[~(scores >= 0) | (scores % 1 != 0)]]
+    for field in ('team1', 'team2'):
+        unknown = ~results[field].isin(teams)
+        errors += [f"{label}: unknown team {team}" for label, team in zip(labels[unknown], results[field][unknown])]
+    same = results['team1'] == results['team2']
+    errors += [f"{label}: a team cannot play itself" for label in labels[same]]
+
+    players = _player_frame(matches)
+    if not players.empty:
+        player_labels = labels[players['match']].to_numpy()
+        sides = results.loc[players['match'], ['team1', 'team2']].to_numpy()
+        wrong_team = (players['team'].to_numpy() != sides[:, 0]) & (players['team'].to_numpy() != sides[:, 1])
+        errors += [f"{label}: {name} is not on a team in this match"
+                   for label, name in zip(player_labels[wrong_team], players['name'][wrong_team])]
+
+        roster = pd.DataFrame([(team, name) for team, names in rosters.items() for name in names],
+                              columns=['team', 'name']).assign(on_roster=True)
+        checked = players.merge(roster, on=['team', 'name'], how='left')
+        off_roster = checked['on_roster'].isna() & ~checked['external'] & ~checked['manual']
+        errors += [f"{label}: {name} is not on the {team} roster" for label, name, team in
+                   zip(player_labels[off_roster], checked['name'][off_roster], checked['team'][off_roster])]
+
+        duplicate = players.duplicated(['match', 'name'], keep='first') | (players['name'] == '')
+        errors += [f"{label}: player '{name}' is missing or listed twice"
+                   for label, name in zip(player_labels[duplicate], players['name'][duplicate])]
+
+        counts = players[PLAYER_COUNT_FIELDS].apply(pd.to_numeric, errors='coerce')
+        bad_counts = (~(counts >= 0) | (counts % 1 != 0)).any(axis=1)
+        errors += [f"{label}: {name} has an invalid stat"
+                   for label, name in zip(player_labels[bad_counts], players['name'][bad_counts])]
+    return errors
+
+
+def build_match_entry(match_data: dict, match_id: int, matchday: int, season: int, submitted_by: str) -> dict:
+    """The game_day_stats entry for one match in the entry form's match_data shape."""
+    entry = {
+        'match_id': match_id,
+        'team1': match_data['team1'],
+        'score1': int(match_data['score1']),
+        'team2': match_data['team2'],
+        'score2': int(match_data['score2']),
+        'matchday': matchday,
+        'group': match_data['group'],
+        'season': season,
+        'potm': match_data.get('potm', ''),
+        'referee': match_data.get('referee', ''),
+        'data_collector': match_data.get('data_collector', ''),
+        'submitted_by': submitted_by,
+        'submitted_at': datetime.now().isoformat(),
+        'player_stats': [],
+        'external_subs': []
+    }
+
+    # Handle penalty shootout data
+    if match_data.get('has_penalties'):
+        entry['has_penalties'] = True
+        entry['penalty1'] = int(match_data.get('penalty1', 0))
+        entry['penalty2'] = int(match_data.get('penalty2', 0))
+
+    for key, external in (('player_stats', False), ('external_subs', True)):
+        for stat in match_data.get(key) or []:
+            stat_entry = {
+                'player': stat.get('name', ''),
+                'team': stat.get('team', ''),
+                'goals': int(stat.get('goals') or 0),
+                'assists': int(stat.get('assists') or 0),
+                'saves': int(stat.get('saves') or 0),
+                'yellow_cards': int(stat.get('yellow') or 0),
+                'red_cards': int(stat.get('red') or 0),
+                'is_potm': stat.get('potm', False),
+            }
+            if external:
+                stat_entry['is_external'] = True
+            else:
+                stat_entry['is_manual'] = stat.get('is_manual', False)
+            entry[key].append(stat_entry)
+    return entry
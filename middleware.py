@@ -1,9 +1,17 @@
+import os
+import re
 import time
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 from logging_config import log_request
 from urllib.parse import parse_qs, urlparse
+from caching import LRUCache
+from data_store import get_data_version
+from firebase_reads import request_scope
+
+# Rendered public pages for anonymous visitors (default budget: 32 MB)
+page_cache = LRUCache('pages', max_bytes=int(os.getenv("PAGE_CACHE_MAX_BYTES", 32 * 1024 * 1024)))
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """
@@ -117,3 +125,79 @@ class RateLimitLoggingMiddleware(BaseHTTPMiddleware):
             })
 
         return response
+
+
+class PageCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serve public pages from an in-process cache for anonymous visitors.
+
+    Only GET requests to the pages listed in CACHEABLE_PATHS are cached, and
+    only when the request carries no login or session cookie. Entries are keyed
+    on path + sorted query string + data version, so a data change naturally
+    retires every page rendered from the old data.
+    """
+
+    CACHEABLE_PATHS = re.compile(r"^/(statistics|hall-of-fame|archives|teams|players|matches(/\d+)?)/?$")
+    BYPASS_COOKIES = ("session_token", "session")
+
+    def __init__(self, app, cache: LRUCache = None):
+        super().__init__(app)
+        self.cache = cache if cache is not None else page_cache
+
+    async def dispatch(self, request: Request, call_next):
+        if not self._is_cacheable(request):
+            return await call_next(request)
+
+        key = self._cache_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            status_code, headers, body = cached
+            response = Response(content=body, status_code=status_code, headers=headers)
+            response.headers["X-Page-Cache"] = "HIT"
+            return response
+
+        response = await call_next(request)
+
+        content_type = response.headers.get("content-type", "")
+        if (response.status_code != 200 or "set-cookie" in response.headers
+                or not content_type.startswith("text/html")):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        self.cache.set(key, (response.status_code, headers, body), size=len(body))
+
+        response = Response(content=body, status_code=response.status_code, headers=headers)
+        response.headers["X-Page-Cache"] = "MISS"
+        return response
+
+    def _is_cacheable(self, request: Request) -> bool:
+        if request.method != "GET":
+            return False
+        if any(request.cookies.get(name) for name in self.BYPASS_COOKIES):
+            return False
+        return bool(self.CACHEABLE_PATHS.match(request.url.path))
+
+    def _cache_key(self, request: Request) -> tuple:
+        """Path + normalized (sorted) query + data version."""
+        query = tuple(sorted(request.query_params.multi_items()))
+        return (request.url.path.rstrip("/") or "/", query, get_data_version())
+
+
+class FirebaseReadScopeMiddleware:
+    """
+    Give each HTTP request its own Firebase read memo (see firebase_reads.py).
+
+    Plain ASGI rather than BaseHTTPMiddleware so the context variable is set
+    in the same context the endpoint runs in.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        with request_scope():
+            await self.app(scope, receive, send)
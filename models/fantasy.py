@@ -3,7 +3,16 @@ from typing import List, Optional, Dict, ClassVar, Tuple
 import pandas as pd
 import numpy as np
 from firebase_admin import db
+from data_store import read_dataset
+from caching import DataCache, estimate_size
+from firebase_replica import FirebaseReplica
+import firebase_reads
 from datetime import datetime
+from collections import Counter
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 import secrets
 import string
 
@@ -69,13 +78,13 @@ class FantasyUser(BaseModel):
             'captain': self.team.captain
         }
         db.reference(f'Fantasy/Users/{self.user_id}').set(user_data)
+        firebase_reads.forget(f'Fantasy/Users/{self.user_id}')
     
     @classmethod
     def load_from_firebase(cls, user_id: str, username: str):
         """Load user data from Firebase"""
-        user_ref = db.reference(f'Fantasy/Users/{user_id}')
-        user_data = user_ref.get()
-        admin_ref = db.reference(f'Users/{username}').get()
+        user_data = firebase_reads.read(f'Fantasy/Users/{user_id}')
+        admin_ref = firebase_reads.read(f'Users/{username}')
         
         if not user_data:
             # Create new Fantasy user
@@ -99,9 +108,16 @@ class FantasyUser(BaseModel):
             team=team
         )
 
+# Local copies of the fantasy week and settings nodes, read on most fantasy requests
+current_week_replica = FirebaseReplica('Fantasy/current_week')
+settings_replica = FirebaseReplica('Fantasy/settings')
+FANTASY_REPLICAS = (current_week_replica, settings_replica)
+
 class FantasyService:
     def __init__(self, season: int = None):
         self.players_df = None
+        self.players_by_name = MappingProxyType({})
+        self.players_by_first_last = MappingProxyType({})
         self.season = season
         self.load_players_data()
     
@@ -109,7 +125,7 @@ class FantasyService:
     def get_current_season() -> int:
         """Get the current season from Firebase settings"""
         try:
-            week_data = db.reference('Fantasy/current_week').get() or {}
+            week_data = current_week_replica.get() or {}
             season = week_data.get('Season')
             if season:
                 return int(season)
@@ -117,7 +133,7 @@ class FantasyService:
             pass
         # Fall back to most recent season in Fantasy_Data.csv
         try:
-            df = pd.read_csv('data/Fantasy_Data.csv')
+            df = read_dataset('data/Fantasy_Data.csv')
             df.columns = [c.strip() for c in df.columns]
             return int(df['Season'].max())
         except Exception:
@@ -129,7 +145,7 @@ class FantasyService:
         context: 'squad' for full squad (8 players), 'starting' for weekly team (5 players)
         """
         try:
-            settings = db.reference('Fantasy/settings').get() or {}
+            settings = settings_replica.get() or {}
             if context == 'squad':
                 return settings.get('min_different_teams_squad', 5)
             return settings.get('min_different_teams_starting', 4)
@@ -139,7 +155,7 @@ class FantasyService:
     def load_players_data(self):
         """Load players data from CSV, filtered by season"""
         try:
-            full_df = pd.read_csv('data/Fantasy_Data.csv')
+            full_df = read_dataset('data/Fantasy_Data.csv')
             # Clean column names
             full_df.columns = [col.strip() for col in full_df.columns]
             
@@ -176,15 +192,43 @@ class FantasyService:
                           'OVR Rating', 'Fantasy Cost', 'full_name']
             available_cols = [col for col in core_columns if col in full_df.columns]
             self.players_df = full_df[available_cols].copy()
+            self.players_by_name, self.players_by_first_last = self._build_catalog(self.players_df)
                 
         except Exception as e:
             print(f"Error loading players data: {e}")
             self.players_df = pd.DataFrame()
+            self.players_by_name = MappingProxyType({})
+            self.players_by_first_last = MappingProxyType({})
+    
+    @staticmethod
+    def _build_catalog(players_df: pd.DataFrame) -> Tuple[MappingProxyType, MappingProxyType]:
+        """Read-only maps of "First Last" and (First, Last) -> player record, built once per load.
+        Every player is indexed by (First, Last), for get_player_by_name. Only
+        names that split back into (First, Last) at the first space are
+        indexed by full name, matching how full names were always split.
+        The first row wins in both.
+        """
+        by_name, by_first_last = {}, {}
+        for record in players_df.to_dict('records'):
+            first, last = record.get('First'), record.get('Last')
+            if not isinstance(first, str) or not isinstance(last, str):
+                continue
+            record = by_first_last.setdefault((first, last), MappingProxyType(record))
+            if ' ' not in first:
+                by_name.setdefault(f"{first} {last}", record)
+        return MappingProxyType(by_name), MappingProxyType(by_first_last)
+    
+    def _squad_profile(self, player_names: List[str]) -> Tuple[List, Counter, Counter]:
+        """Catalog records for the names found, with position and team counts"""
+        records = [self.players_by_name[name] for name in player_names if name in self.players_by_name]
+        positions = Counter(record['Primary_Position'] for record in records)
+        teams = Counter(record['Team'] for record in records)
+        return records, positions, teams
     
     def has_players_for_season(self, season: int) -> bool:
         """Check if Fantasy_Data.csv has players for a given season"""
         try:
-            full_df = pd.read_csv('data/Fantasy_Data.csv')
+            full_df = read_dataset('data/Fantasy_Data.csv')
             full_df.columns = [col.strip() for col in full_df.columns]
             return not full_df[full_df['Season'] == season].empty
         except Exception:
@@ -198,37 +242,19 @@ class FantasyService:
     
     def get_player_by_name(self, first_name: str, last_name: str) -> Optional[Dict]:
         """Get a specific player by name"""
-        if self.players_df.empty:
-            return None
-        
-        player = self.players_df[
-            (self.players_df['First'] == first_name) & 
-            (self.players_df['Last'] == last_name)
-        ]
-        
-        if not player.empty:
-            return player.iloc[0].to_dict()
-        return None
+        player = self.players_by_first_last.get((first_name, last_name))
+        return dict(player) if player is not None else None
     
     def get_players_by_names(self, player_names: List[str]) -> List[Dict]:
         """Get multiple players by their full names"""
-        players = []
-        for name in player_names:
-            try:
-                first, last = name.split(" ", 1)
-                player = self.get_player_by_name(first, last)
-                if player:
-                    players.append(player)
-            except ValueError:
-                continue
-        return players
+        return [dict(self.players_by_name[name]) for name in player_names if name in self.players_by_name]
     
     def validate_team_creation(self, selected_players: List[str], available_balance: float) -> tuple[bool, str]:
         """Validate team creation rules"""
         if len(selected_players) != 8:
             return False, "You must select exactly 8 players"
         
-        players_data = self.get_players_by_names(selected_players)
+        players_data, positions, teams = self._squad_profile(selected_players)
         if len(players_data) != 8:
             return False, "Some selected players were not found"
         
@@ -236,24 +262,20 @@ class FantasyService:
         if total_cost > available_balance:
             return False, f"Insufficient funds. Cost: {total_cost}, Available: {available_balance}"
         
-        # Count positions and teams
-        positions = [player['Primary_Position'] for player in players_data]
-        teams = [player['Team'] for player in players_data]
-        
         min_teams = self.get_min_different_teams('squad')
-        if len(set(teams)) < min_teams:
+        if len(teams) < min_teams:
             return False, f"You need players from at least {min_teams} different teams"
         
-        if positions.count('GK') < 2:
+        if positions['GK'] < 2:
             return False, "You need at least 2 Goalkeepers"
         
-        if positions.count('D') < 2:
+        if positions['D'] < 2:
             return False, "You need at least 2 Defenders"
         
-        if positions.count('M') < 1:
+        if positions['M'] < 1:
             return False, "You need at least 1 Midfielder"
         
-        if positions.count('F') < 2:
+        if positions['F'] < 2:
             return False, "You need at least 2 Forwards"
         
         return True, "Team creation rules satisfied"
@@ -268,33 +290,29 @@ class FantasyService:
             if player not in all_players:
                 return False, f"{player} is not in your squad"
         
-        players_data = self.get_players_by_names(starting_team)
+        players_data, positions, teams = self._squad_profile(starting_team)
         if len(players_data) != 5:
             return False, "Some selected players were not found"
         
-        # Count positions and teams
-        positions = [player['Primary_Position'] for player in players_data]
-        teams = [player['Team'] for player in players_data]
-        
         min_teams = self.get_min_different_teams('starting')
-        if len(set(teams)) < min_teams:
+        if len(teams) < min_teams:
             return False, f"You need to start players from at least {min_teams} different teams"
         
-        if positions.count('GK') != 1:
+        if positions['GK'] != 1:
             return False, "You need exactly 1 Goalkeeper in your starting team"
         
-        if positions.count('D') + positions.count('M') < 2:
+        if positions['D'] + positions['M'] < 2:
             return False, "You need at least 2 defenders + midfielders in your starting team"
         
-        if positions.count('F') < 1:
+        if positions['F'] < 1:
             return False, "You need at least 1 Forward in your starting team"
         
         return True, "Weekly team rules satisfied"
     
     def validate_transfer(self, player_in_name: str, player_out_name: str, user: FantasyUser) -> tuple[bool, str]:
         """Validate transfer rules"""
-        player_in = self.get_player_by_name(*player_in_name.split(" ", 1))
-        player_out = self.get_player_by_name(*player_out_name.split(" ", 1))
+        player_in = self.players_by_name.get(player_in_name)
+        player_out = self.players_by_name.get(player_out_name)
         
         if not player_in or not player_out:
             return False, "Player not found"
@@ -315,24 +333,22 @@ class FantasyService:
         test_players.remove(player_out_name)
         test_players.append(player_in_name)
         
-        players_data = self.get_players_by_names(test_players)
-        positions = [player['Primary_Position'] for player in players_data]
-        teams = [player['Team'] for player in players_data]
+        _, positions, teams = self._squad_profile(test_players)
         
         min_teams = self.get_min_different_teams('squad')
-        if len(set(teams)) < min_teams:
+        if len(teams) < min_teams:
             return False, f"Transfer would violate team diversity rule (need {min_teams} different teams)"
         
-        if positions.count('GK') < 2:
+        if positions['GK'] < 2:
             return False, "Transfer would violate goalkeeper rule (need at least 2 GK)"
         
-        if positions.count('D') < 2:
+        if positions['D'] < 2:
             return False, "Transfer would violate defender rule (need at least 2 D)"
         
-        if positions.count('M') < 1:
+        if positions['M'] < 1:
             return False, "Transfer would violate midfielder rule (need at least 1 M)"
         
-        if positions.count('F') < 2:
+        if positions['F'] < 2:
             return False, "Transfer would violate forward rule (need at least 2 F)"
         
         # If player being transferred out is in starting team, check starting team rules
@@ -341,21 +357,19 @@ class FantasyService:
             test_starting.remove(player_out_name)
             test_starting.append(player_in_name)
             
-            starting_players_data = self.get_players_by_names(test_starting)
-            starting_positions = [player['Primary_Position'] for player in starting_players_data]
-            starting_teams = [player['Team'] for player in starting_players_data]
+            _, starting_positions, starting_teams = self._squad_profile(test_starting)
             
             min_starting_teams = self.get_min_different_teams('starting')
-            if len(set(starting_teams)) < min_starting_teams:
+            if len(starting_teams) < min_starting_teams:
                 return False, "Transfer would violate starting team diversity rule"
             
-            if starting_positions.count('GK') != 1:
+            if starting_positions['GK'] != 1:
                 return False, "Transfer would violate starting team goalkeeper rule"
             
-            if starting_positions.count('D') + starting_positions.count('M') < 2:
+            if starting_positions['D'] + starting_positions['M'] < 2:
                 return False, "Transfer would violate starting team defender/midfielder rule"
             
-            if starting_positions.count('F') < 1:
+            if starting_positions['F'] < 1:
                 return False, "Transfer would violate starting team forward rule"
 
         return True, "Transfer is valid"
@@ -400,12 +414,12 @@ class MiniLeague(BaseModel):
             'description': self.description
         }
         db.reference(f'Fantasy/MiniLeagues/{self.league_id}').set(league_data)
+        firebase_reads.forget(f'Fantasy/MiniLeagues/{self.league_id}')
 
     @classmethod
     def load_from_firebase(cls, league_id: str) -> Optional['MiniLeague']:
         """Load league from Firebase"""
-        league_ref = db.reference(f'Fantasy/MiniLeagues/{league_id}')
-        league_data = league_ref.get()
+        league_data = firebase_reads.read(f'Fantasy/MiniLeagues/{league_id}')
 
         if not league_data:
             return None
@@ -426,8 +440,7 @@ class MiniLeague(BaseModel):
     @staticmethod
     def find_by_code(code: str) -> Optional['MiniLeague']:
         """Find a league by its invite code"""
-        leagues_ref = db.reference('Fantasy/MiniLeagues')
-        all_leagues = leagues_ref.get() or {}
+        all_leagues = firebase_reads.read('Fantasy/MiniLeagues') or {}
 
         for league_id, league_data in all_leagues.items():
             if league_data.get('league_code') == code.upper():
@@ -437,8 +450,7 @@ class MiniLeague(BaseModel):
     @staticmethod
     def get_user_leagues(user_id: str) -> List['MiniLeague']:
         """Get all leagues a user is a member of"""
-        leagues_ref = db.reference('Fantasy/MiniLeagues')
-        all_leagues = leagues_ref.get() or {}
+        all_leagues = firebase_reads.read('Fantasy/MiniLeagues') or {}
 
         user_leagues = []
         for league_id, league_data in all_leagues.items():
@@ -453,8 +465,7 @@ class MiniLeague(BaseModel):
     @staticmethod
     def get_public_leagues() -> List['MiniLeague']:
         """Get all public leagues"""
-        leagues_ref = db.reference('Fantasy/MiniLeagues')
-        all_leagues = leagues_ref.get() or {}
+        all_leagues = firebase_reads.read('Fantasy/MiniLeagues') or {}
 
         public_leagues = []
         for league_id, league_data in all_leagues.items():
@@ -492,14 +503,14 @@ class MiniLeague(BaseModel):
     def delete(self):
         """Delete the league"""
         db.reference(f'Fantasy/MiniLeagues/{self.league_id}').delete()
+        firebase_reads.forget(f'Fantasy/MiniLeagues/{self.league_id}')
 
     def get_leaderboard(self) -> List[Dict]:
         """Get the league leaderboard"""
         leaderboard = []
 
         for user_id in self.members.keys():
-            user_ref = db.reference(f'Fantasy/Users/{user_id}')
-            user_data = user_ref.get()
+            user_data = firebase_reads.read(f'Fantasy/Users/{user_id}')
 
             if user_data:
                 leaderboard.append({
@@ -521,6 +532,31 @@ class MiniLeague(BaseModel):
 
 # ============ Match Predictions Models ============
 
+# Points for predicting the right result, plus a bonus for the exact score
+PREDICTION_RESULT_POINTS = 3
+PREDICTION_EXACT_BONUS = 5
+# Match ID -> when its predictions were scored; batch scoring skips these matches
+PREDICTIONS_PROCESSED_PATH = 'PredictionsProcessed'
+# Fantasy/settings flag set by backfill_prediction_indexes(); once set, lookups
+# that miss the UserPredictions/MatchPredictions indexes no longer scan Predictions
+PREDICTIONS_INDEXED_SETTING = 'predictions_indexed'
+
+
+def legacy_prediction_scan_enabled() -> bool:
+    """Whether index misses may still fall back to downloading all of Predictions."""
+    return not (settings_replica.get() or {}).get(PREDICTIONS_INDEXED_SETTING)
+
+
+def score_predictions(predicted_home, predicted_away, actual_home, actual_away) -> np.ndarray:
+    """Points for each prediction, given aligned arrays of predicted and actual scores."""
+    predicted_home, predicted_away, actual_home, actual_away = (
+        np.asarray(values, dtype=int) for values in (predicted_home, predicted_away, actual_home, actual_away)
+    )
+    correct = np.sign(predicted_home - predicted_away) == np.sign(actual_home - actual_away)
+    exact = correct & (predicted_home == actual_home) & (predicted_away == actual_away)
+    return PREDICTION_RESULT_POINTS * correct + PREDICTION_EXACT_BONUS * exact
+
+
 class MatchPrediction(BaseModel):
     """Represents a user's prediction for a match"""
     prediction_id: str
@@ -548,8 +584,8 @@ class MatchPrediction(BaseModel):
             return 'away'
         return 'draw'
 
-    def save_to_firebase(self):
-        """Save prediction to Firebase with indexed paths for efficient queries"""
+    def firebase_paths(self) -> Dict[str, Dict]:
+        """The prediction's primary record and its index copies, by path"""
         prediction_data = {
             'user_id': self.user_id,
             'username': self.username,
@@ -562,15 +598,35 @@ class MatchPrediction(BaseModel):
             'points_earned': self.points_earned,
             'is_processed': self.is_processed
         }
-        # Primary storage
-        db.reference(f'Predictions/{self.prediction_id}').set(prediction_data)
-        # Indexed by user + match for fast lookups
-        db.reference(f'UserPredictions/{self.user_id}/{self.match_id}').set({
-            'prediction_id': self.prediction_id,
-            **prediction_data
-        })
-        # Indexed by match for fast match-level queries
-        db.reference(f'MatchPredictions/{self.match_id}/{self.prediction_id}').set(prediction_data)
+        return {
+            # Primary storage
+            f'Predictions/{self.prediction_id}': prediction_data,
+            # Indexed by user + match for fast lookups
+            f'UserPredictions/{self.user_id}/{self.match_id}': {'prediction_id': self.prediction_id, **prediction_data},
+            # Indexed by match for fast match-level queries
+            f'MatchPredictions/{self.match_id}/{self.prediction_id}': prediction_data,
+        }
+
+    def save_to_firebase(self):
+        """Save prediction and its index copies to Firebase in one atomic multi-path update"""
+        db.reference('/').update(self.firebase_paths())
+
+    @classmethod
+    def from_record(cls, prediction_id: str, data: Dict, **defaults) -> 'MatchPrediction':
+        """Build a prediction from a stored record, filling missing ids from defaults"""
+        return cls(
+            prediction_id=prediction_id,
+            user_id=data.get('user_id', defaults.get('user_id', '')),
+            username=data.get('username', ''),
+            match_id=data.get('match_id', defaults.get('match_id', '')),
+            home_team=data.get('home_team', ''),
+            away_team=data.get('away_team', ''),
+            predicted_home_score=data.get('predicted_home_score', 0),
+            predicted_away_score=data.get('predicted_away_score', 0),
+            predicted_at=data.get('predicted_at', ''),
+            points_earned=data.get('points_earned', 0),
+            is_processed=data.get('is_processed', False)
+        )
 
     @classmethod
     def load_from_firebase(cls, prediction_id: str) -> Optional['MatchPrediction']:
@@ -581,19 +637,19 @@ class MatchPrediction(BaseModel):
         if not pred_data:
             return None
 
-        return cls(
-            prediction_id=prediction_id,
-            user_id=pred_data.get('user_id', ''),
-            username=pred_data.get('username', ''),
-            match_id=pred_data.get('match_id', ''),
-            home_team=pred_data.get('home_team', ''),
-            away_team=pred_data.get('away_team', ''),
-            predicted_home_score=pred_data.get('predicted_home_score', 0),
-            predicted_away_score=pred_data.get('predicted_away_score', 0),
-            predicted_at=pred_data.get('predicted_at', ''),
-            points_earned=pred_data.get('points_earned', 0),
-            is_processed=pred_data.get('is_processed', False)
-        )
+        return cls.from_record(prediction_id, pred_data)
+
+    @staticmethod
+    def _legacy_scan(matches) -> List['MatchPrediction']:
+        """Predictions whose stored record satisfies matches, by downloading all of Predictions"""
+        if not legacy_prediction_scan_enabled():
+            return []
+        all_preds = db.reference('Predictions').get() or {}
+        return [
+            MatchPrediction.from_record(pred_id, pred_data)
+            for pred_id, pred_data in all_preds.items()
+            if isinstance(pred_data, dict) and matches(pred_data)
+        ]
 
     @staticmethod
     def get_user_prediction_for_match(user_id: str, match_id: str) -> Optional['MatchPrediction']:
@@ -601,29 +657,16 @@ class MatchPrediction(BaseModel):
         # Try indexed path first
         indexed_ref = db.reference(f'UserPredictions/{user_id}/{match_id}')
         indexed_data = indexed_ref.get()
-        
+
         if indexed_data and 'prediction_id' in indexed_data:
-            return MatchPrediction(
-                prediction_id=indexed_data['prediction_id'],
-                user_id=indexed_data.get('user_id', user_id),
-                username=indexed_data.get('username', ''),
-                match_id=indexed_data.get('match_id', match_id),
-                home_team=indexed_data.get('home_team', ''),
-                away_team=indexed_data.get('away_team', ''),
-                predicted_home_score=indexed_data.get('predicted_home_score', 0),
-                predicted_away_score=indexed_data.get('predicted_away_score', 0),
-                predicted_at=indexed_data.get('predicted_at', ''),
-                points_earned=indexed_data.get('points_earned', 0),
-                is_processed=indexed_data.get('is_processed', False)
-            )
-        
-        # Fallback to legacy full scan for old data
-        preds_ref = db.reference('Predictions')
-        all_preds = preds_ref.get() or {}
-        for pred_id, pred_data in all_preds.items():
-            if pred_data.get('user_id') == user_id and pred_data.get('match_id') == match_id:
-                return MatchPrediction.load_from_firebase(pred_id)
-        return None
+            return MatchPrediction.from_record(indexed_data['prediction_id'], indexed_data,
+                                               user_id=user_id, match_id=match_id)
+
+        # Fallback to legacy full scan for old data (until backfilled)
+        legacy = MatchPrediction._legacy_scan(
+            lambda data: data.get('user_id') == user_id and data.get('match_id') == match_id
+        )
+        return legacy[0] if legacy else None
 
     @staticmethod
     def get_user_predictions(user_id: str) -> List['MatchPrediction']:
@@ -631,36 +674,19 @@ class MatchPrediction(BaseModel):
         # Try indexed path first
         user_preds_ref = db.reference(f'UserPredictions/{user_id}')
         user_preds_data = user_preds_ref.get() or {}
-        
+
         user_preds = []
         if user_preds_data:
             for match_id, pred_data in user_preds_data.items():
                 try:
-                    pred = MatchPrediction(
-                        prediction_id=pred_data.get('prediction_id', ''),
-                        user_id=pred_data.get('user_id', user_id),
-                        username=pred_data.get('username', ''),
-                        match_id=pred_data.get('match_id', match_id),
-                        home_team=pred_data.get('home_team', ''),
-                        away_team=pred_data.get('away_team', ''),
-                        predicted_home_score=pred_data.get('predicted_home_score', 0),
-                        predicted_away_score=pred_data.get('predicted_away_score', 0),
-                        predicted_at=pred_data.get('predicted_at', ''),
-                        points_earned=pred_data.get('points_earned', 0),
-                        is_processed=pred_data.get('is_processed', False)
-                    )
-                    user_preds.append(pred)
+                    user_preds.append(MatchPrediction.from_record(
+                        pred_data.get('prediction_id', ''), pred_data, user_id=user_id, match_id=match_id
+                    ))
                 except Exception:
                     continue
         else:
-            # Fallback to legacy full scan
-            preds_ref = db.reference('Predictions')
-            all_preds = preds_ref.get() or {}
-            for pred_id, pred_data in all_preds.items():
-                if pred_data.get('user_id') == user_id:
-                    pred = MatchPrediction.load_from_firebase(pred_id)
-                    if pred:
-                        user_preds.append(pred)
+            # Fallback to legacy full scan (until backfilled)
+            user_preds = MatchPrediction._legacy_scan(lambda data: data.get('user_id') == user_id)
 
         user_preds.sort(key=lambda x: x.predicted_at, reverse=True)
         return user_preds
@@ -671,36 +697,17 @@ class MatchPrediction(BaseModel):
         # Try indexed path first
         match_preds_ref = db.reference(f'MatchPredictions/{match_id}')
         match_preds_data = match_preds_ref.get() or {}
-        
+
         match_preds = []
         if match_preds_data:
             for pred_id, pred_data in match_preds_data.items():
                 try:
-                    pred = MatchPrediction(
-                        prediction_id=pred_id,
-                        user_id=pred_data.get('user_id', ''),
-                        username=pred_data.get('username', ''),
-                        match_id=pred_data.get('match_id', match_id),
-                        home_team=pred_data.get('home_team', ''),
-                        away_team=pred_data.get('away_team', ''),
-                        predicted_home_score=pred_data.get('predicted_home_score', 0),
-                        predicted_away_score=pred_data.get('predicted_away_score', 0),
-                        predicted_at=pred_data.get('predicted_at', ''),
-                        points_earned=pred_data.get('points_earned', 0),
-                        is_processed=pred_data.get('is_processed', False)
-                    )
-                    match_preds.append(pred)
+                    match_preds.append(MatchPrediction.from_record(pred_id, pred_data, match_id=match_id))
                 except Exception:
                     continue
         else:
-            # Fallback to legacy full scan
-            preds_ref = db.reference('Predictions')
-            all_preds = preds_ref.get() or {}
-            for pred_id, pred_data in all_preds.items():
-                if pred_data.get('match_id') == match_id:
-                    pred = MatchPrediction.load_from_firebase(pred_id)
-                    if pred:
-                        match_preds.append(pred)
+            # Fallback to legacy full scan (until backfilled)
+            match_preds = MatchPrediction._legacy_scan(lambda data: data.get('match_id') == match_id)
 
         return match_preds
 
@@ -720,11 +727,11 @@ class MatchPrediction(BaseModel):
 
         # Points for correct result
         if predicted_result == actual_result:
-            points += 3
+            points += PREDICTION_RESULT_POINTS
 
             # Bonus for exact score
             if self.predicted_home_score == actual_home_score and self.predicted_away_score == actual_away_score:
-                points += 5
+                points += PREDICTION_EXACT_BONUS
 
         return points
 
@@ -740,6 +747,122 @@ class MatchPrediction(BaseModel):
         # Update user's prediction points
         PredictionLeaderboard.add_points(self.user_id, self.username, self.points_earned)
 
+    @staticmethod
+    def process_completed_matches(matches: List[Dict]) -> Dict:
+        """
+        Score every unprocessed prediction for the given completed matches.
+
+        matches are dicts with match_id, home_score and away_score. Only
+        matches not yet marked processed are read: those in the
+        MatchPredictions index once each and, until backfill_prediction_indexes()
+        has run, unindexed legacy predictions for the rest in one scan of
+        Predictions. Points are computed for all their predictions at once,
+        and the updated records, index copies, leaderboard increments and
+        processed markers are committed in a single multi-path update, so a
+        failed run writes nothing and can simply be repeated. Only matches
+        that had predictions are marked processed, so a match whose
+        predictions were not found is scored by a later run.
+        """
+        processed = db.reference(PREDICTIONS_PROCESSED_PATH).get(shallow=True) or {}
+        predicted = db.reference('MatchPredictions').get(shallow=True) or {}
+        unprocessed = {
+            str(match['match_id']): (match['home_score'], match['away_score'])
+            for match in matches
+            if str(match['match_id']) not in processed
+        }
+
+        found = {}
+        for match_id in unprocessed:
+            if match_id in predicted:
+                for pred in MatchPrediction.get_match_predictions(match_id):
+                    found[pred.prediction_id] = pred
+        if legacy_prediction_scan_enabled():
+            for pred in MatchPrediction._legacy_scan(lambda data: str(data.get('match_id')) in unprocessed):
+                found.setdefault(pred.prediction_id, pred)
+
+        scores = {match_id: unprocessed[match_id] for match_id in {str(pred.match_id) for pred in found.values()}}
+        predictions = [pred for pred in found.values() if not pred.is_processed]
+        result = {'matches': len(scores), 'processed_count': len(predictions), 'total_points_awarded': 0}
+        if not scores:
+            return result
+
+        points = np.zeros(0, dtype=int)
+        if predictions:
+            actual = np.array([scores[str(pred.match_id)] for pred in predictions], dtype=int).reshape(-1, 2)
+            points = score_predictions(
+                [pred.predicted_home_score for pred in predictions],
+                [pred.predicted_away_score for pred in predictions],
+                actual[:, 0], actual[:, 1],
+            )
+
+        updates = {}
+        for pred, earned in zip(predictions, points.tolist()):
+            pred.points_earned = earned
+            pred.is_processed = True
+            updates.update(pred.firebase_paths())
+
+        per_user = pd.DataFrame({
+            'user_id': [pred.user_id for pred in predictions],
+            'username': [pred.username for pred in predictions],
+            'points': points,
+        })
+        per_user['correct'] = per_user['points'] >= PREDICTION_RESULT_POINTS
+        per_user['exact'] = per_user['points'] >= PREDICTION_RESULT_POINTS + PREDICTION_EXACT_BONUS
+        totals = per_user.groupby('user_id').agg(
+            username=('username', 'last'), points=('points', 'sum'), count=('points', 'size'),
+            correct=('correct', 'sum'), exact=('exact', 'sum'),
+        )
+        for user_id, row in totals.iterrows():
+            stats_path = f'PredictionStats/{user_id}'
+            updates[f'{stats_path}/username'] = row['username']
+            updates[f'{stats_path}/total_points'] = increment(int(row['points']))
+            updates[f'{stats_path}/total_predictions'] = increment(int(row['count']))
+            updates[f'{stats_path}/correct_results'] = increment(int(row['correct']))
+            updates[f'{stats_path}/exact_scores'] = increment(int(row['exact']))
+
+        processed_at = datetime.now().isoformat()
+        for match_id in scores:
+            updates[f'{PREDICTIONS_PROCESSED_PATH}/{match_id}'] = processed_at
+
+        db.reference('/').update(updates)
+        firebase_reads.forget('PredictionStats')
+        result['total_points_awarded'] = int(points.sum())
+        return result
+
+
+def backfill_prediction_indexes(job=None) -> Dict:
+    """
+    One-shot migration indexing legacy predictions, then disabling the full scans.
+
+    Every record in Predictions is copied to UserPredictions and
+    MatchPredictions (the latest prediction wins where a user has several for
+    one match) in chunked multi-path updates, and the predictions_indexed
+    setting is turned on. Running it again rewrites the same copies.
+    """
+    all_preds = db.reference('Predictions').get() or {}
+    predictions = sorted(
+        (MatchPrediction.from_record(pred_id, data) for pred_id, data in all_preds.items() if isinstance(data, dict)),
+        key=lambda pred: pred.predicted_at
+    )
+    index_copies = {}
+    for pred in predictions:
+        for path, data in pred.firebase_paths().items():
+            if not path.startswith('Predictions/'):
+                index_copies[path] = data
+
+    paths = list(index_copies)
+    if job is not None:
+        job.start(len(paths))
+    for i in range(0, len(paths), PROCESS_CHUNK_SIZE):
+        chunk = paths[i:i + PROCESS_CHUNK_SIZE]
+        db.reference('/').update({path: index_copies[path] for path in chunk})
+        if job is not None:
+            job.advance(len(chunk))
+
+    db.reference(f'Fantasy/settings/{PREDICTIONS_INDEXED_SETTING}').set(True)
+    settings_replica.apply(True, PREDICTIONS_INDEXED_SETTING)
+    return {'predictions': len(predictions), 'index_entries': len(index_copies)}
+
 
 class PredictionLeaderboard:
     """Manages the predictions leaderboard"""
@@ -747,8 +870,7 @@ class PredictionLeaderboard:
     @staticmethod
     def get_user_stats(user_id: str) -> Dict:
         """Get a user's prediction stats"""
-        stats_ref = db.reference(f'PredictionStats/{user_id}')
-        stats = stats_ref.get() or {}
+        stats = firebase_reads.read(f'PredictionStats/{user_id}') or {}
 
         return {
             'user_id': user_id,
@@ -773,6 +895,7 @@ class PredictionLeaderboard:
             'exact_scores': current_stats.get('exact_scores', 0) + (1 if points >= 8 else 0)
         }
         stats_ref.set(new_stats)
+        firebase_reads.forget(f'PredictionStats/{user_id}')
 
     @staticmethod
     def increment_prediction_count(user_id: str, username: str):
@@ -789,12 +912,12 @@ class PredictionLeaderboard:
                 'correct_results': 0,
                 'exact_scores': 0
             })
+            firebase_reads.forget(f'PredictionStats/{user_id}')
 
     @staticmethod
     def get_leaderboard(limit: int = 50) -> List[Dict]:
         """Get the predictions leaderboard"""
-        stats_ref = db.reference('PredictionStats')
-        all_stats = stats_ref.get() or {}
+        all_stats = firebase_reads.read('PredictionStats') or {}
 
         leaderboard = []
         for user_id, stats in all_stats.items():
@@ -819,8 +942,48 @@ class PredictionLeaderboard:
 
 # ============ Fantasy Points Calculator ============
 
+# Users recorded per multi-path update, and chunks in flight at once,
+# when processing a matchweek
+PROCESS_CHUNK_SIZE = 200
+PROCESS_WORKERS = 4
+# Seconds after which a processing run's claim, left by a worker that died, may be taken over
+PROCESS_RUN_STALE_SECONDS = 3600
+
+
+# Per-player point components kept in the live (provisional) totals
+LIVE_POINT_KEYS = ('goals', 'assists', 'start', 'potm', 'cards', 'win', 'clean_sheet', 'total')
+LIVE_POINTS_PATH = 'Fantasy/LivePoints'
+# Seconds a matchweek's player -> owners index is reused between submissions
+LIVE_OWNERS_TTL = 60
+
+
+class ProcessingRunActive(Exception):
+    """Raised when a matchweek is already being processed by another run."""
+
+
+# Characters Firebase forbids in keys, and '%' so that firebase_key() is reversible
+FIREBASE_KEY_ESCAPES = {char: f"%{ord(char):02X}" for char in '%.$#[]/'}
+
+
+def firebase_key(name: str) -> str:
+    """name as a Firebase key: forbidden characters percent-encoded, so different names never share a key."""
+    return ''.join(FIREBASE_KEY_ESCAPES.get(char, char) for char in name)
+
+
+def increment(amount):
+    """Firebase server value adding amount to whatever is stored at the path."""
+    return {'.sv': {'increment': amount}}
+
+
 class FantasyPointsCalculator:
-    """Handles all fantasy points calculation based on match performance"""
+    """
+    Handles all fantasy points calculation based on match performance.
+
+    The CSVs are loaded once per instance and indexed by Match ID, and each
+    (season, matchweek) is scored once per instance (matchweek_breakdown).
+    Use get_points_calculator() for the process-wide instance, which is
+    replaced when the data version changes.
+    """
 
     # Points configuration constants
     GOAL_POINTS = {'F': 3, 'M': 4, 'D': 5, 'GK': 6}
@@ -838,30 +1001,71 @@ class FantasyPointsCalculator:
         self.match_results_df = None
         self.matchweeks_df = None
         self.fantasy_data_df = None
+        # match_id -> {player name: first stats row}, and the rows in file order
+        self._player_rows = {}
+        self._match_rows = {}
+        # match_id -> first results row
+        self._results = {}
+        # full name -> team code and primary position from Fantasy_Data.csv
+        self._player_teams = {}
+        self._player_positions = {}
+        # (season, matchweek) -> matchweek_breakdown() result
+        self._matchweeks = {}
+        self._matchweeks_lock = threading.Lock()
         self._load_data()
+        self._build_indexes()
+
+    def __sizeof__(self):
+        frames = [self.player_stats_df, self.match_results_df, self.matchweeks_df, self.fantasy_data_df]
+        return (object.__sizeof__(self)
+                + sum(estimate_size(df) for df in frames if df is not None)
+                + estimate_size(self._matchweeks))
 
     def _load_data(self):
         """Load all required CSV data files"""
         try:
             # Load player match stats
-            self.player_stats_df = pd.read_csv('data/player_match_stats.csv')
+            self.player_stats_df = read_dataset('data/player_match_stats.csv')
             self.player_stats_df.columns = [col.strip() for col in self.player_stats_df.columns]
 
             # Load match results
-            self.match_results_df = pd.read_csv('data/Match_Results.csv')
+            self.match_results_df = read_dataset('data/Match_Results.csv')
             self.match_results_df.columns = [col.strip() for col in self.match_results_df.columns]
 
             # Load matchweeks
-            self.matchweeks_df = pd.read_csv('data/matchweeks.csv')
+            self.matchweeks_df = read_dataset('data/matchweeks.csv')
             self.matchweeks_df.columns = [col.strip() for col in self.matchweeks_df.columns]
 
             # Load fantasy data for team mapping
-            self.fantasy_data_df = pd.read_csv('data/Fantasy_Data.csv')
+            self.fantasy_data_df = read_dataset('data/Fantasy_Data.csv')
             self.fantasy_data_df.columns = [col.strip() for col in self.fantasy_data_df.columns]
 
         except Exception as e:
             print(f"Error loading data for points calculation: {e}")
 
+    def _build_indexes(self):
+        """Index the loaded frames so scoring a match is a few dict lookups"""
+        if self.player_stats_df is not None:
+            for row in self.player_stats_df.to_dict(orient='records'):
+                match_id = row['Match ID']
+                self._match_rows.setdefault(match_id, []).append(row)
+                self._player_rows.setdefault(match_id, {}).setdefault(row['Name'], row)
+
+        if self.match_results_df is not None:
+            for row in self.match_results_df.to_dict(orient='records'):
+                self._results.setdefault(row['Match ID'], row)
+
+        if self.fantasy_data_df is not None:
+            full_names = (
+                self.fantasy_data_df['First Name'].fillna('') + ' ' +
+                self.fantasy_data_df['Last Name'].fillna('')
+            ).str.strip()
+            for name, team in zip(full_names, self.fantasy_data_df['Team']):
+                self._player_teams.setdefault(name, team)
+            if 'Primary Position' in self.fantasy_data_df.columns:
+                for name, position in zip(full_names, self.fantasy_data_df['Primary Position']):
+                    self._player_positions.setdefault(name, position)
+
     def get_match_ids_for_matchweek(self, season: int, matchweek: int) -> List[int]:
         """Get all match IDs within a matchweek range"""
         if self.matchweeks_df is None:
@@ -880,36 +1084,29 @@ class FantasyPointsCalculator:
 
         return list(range(start_id, end_id + 1))
 
+    def matchweek_for_match(self, season: int, match_id: int) -> Optional[int]:
+        """The matchweek whose ID range contains match_id, else the current week of that season"""
+        if self.matchweeks_df is not None:
+            season_rows = self.matchweeks_df[self.matchweeks_df['Season'] == season]
+            for _, row in season_rows.iterrows():
+                if int(row['Start ID']) <= match_id <= int(row['End ID']):
+                    return int(row['MW'])
+
+        week_data = current_week_replica.get() or {}
+        if week_data.get('Season') and int(week_data['Season']) == season and week_data.get('Week'):
+            return int(week_data['Week'])
+        return None
+
     def get_player_team(self, player_name: str) -> Optional[str]:
         """Get the 3-letter team code for a player from Fantasy_Data.csv"""
-        if self.fantasy_data_df is None:
-            return None
-
-        # Create full name from First Name and Last Name
-        self.fantasy_data_df['full_name'] = (
-            self.fantasy_data_df['First Name'].fillna('') + ' ' +
-            self.fantasy_data_df['Last Name'].fillna('')
-        ).str.strip()
-
-        player_row = self.fantasy_data_df[self.fantasy_data_df['full_name'] == player_name]
-
-        if player_row.empty:
-            return None
-
-        return player_row.iloc[0]['Team']
+        return self._player_teams.get(player_name)
 
     def did_team_win(self, team_code: str, match_id: int) -> bool:
         """Check if a team won a specific match"""
-        if self.match_results_df is None:
+        row = self._results.get(match_id)
+        if row is None:
             return False
 
-        match_row = self.match_results_df[self.match_results_df['Match ID'] == match_id]
-
-        if match_row.empty:
-            return False
-
-        row = match_row.iloc[0]
-
         # Check if team is Team 1 and won
         if row['Team 1'] == team_code and row['Win Team 1'] == 1:
             return True
@@ -922,16 +1119,10 @@ class FantasyPointsCalculator:
 
     def is_clean_sheet(self, team_code: str, match_id: int) -> bool:
         """Check if team kept a clean sheet (opponent scored 0)"""
-        if self.match_results_df is None:
+        row = self._results.get(match_id)
+        if row is None:
             return False
 
-        match_row = self.match_results_df[self.match_results_df['Match ID'] == match_id]
-
-        if match_row.empty:
-            return False
-
-        row = match_row.iloc[0]
-
         # If team is Team 1, check if Team 2 scored 0
         if row['Team 1'] == team_code:
             return int(row['Score Team 2']) == 0
@@ -992,23 +1183,15 @@ class FantasyPointsCalculator:
             'played': False
         }
 
-        if self.player_stats_df is None:
-            return result
-
         # Find player's match stats
-        player_stats = self.player_stats_df[
-            (self.player_stats_df['Name'] == player_name) &
-            (self.player_stats_df['Match ID'] == match_id)
-        ]
-
-        if player_stats.empty:
+        row = self._player_rows.get(match_id, {}).get(player_name)
+        if row is None:
             return result  # Player didn't play
 
-        row = player_stats.iloc[0]
-        position = row['P']
+        position = self._row_position(row)
 
-        if position == '-' or pd.isna(position) or position == '':
-            return result  # Non-playing sub
+        if position == '-' or position is None:
+            return result  # Non-playing sub, or no known position
 
         result['played'] = True
         team_code = row['My Team']
@@ -1060,6 +1243,52 @@ class FantasyPointsCalculator:
 
         return result
 
+    def _row_position(self, row: Dict) -> Optional[str]:
+        """A player_match_stats row's position; rows synced from the entry form leave P blank, so use the primary position."""
+        position = row['P']
+        if pd.isna(position) or position == '':
+            return self._player_positions.get(row['Name'])
+        return position
+
+    def score_submitted_match(self, match: Dict) -> Dict:
+        """
+        Points for every player in a match as submitted to game_day_stats.
+
+        Like calculate_player_match_points, but from the submission: the
+        position is the player's primary position and there is no start
+        bonus, since the data entry form records neither. Returns
+        {player_name: {goals, assists, start, potm, cards, win, clean_sheet,
+        total, position, team}}.
+        """
+        scores = {
+            match['team1']: (int(match['score1']), int(match['score2'])),
+            match['team2']: (int(match['score2']), int(match['score1'])),
+        }
+        results = {}
+        for entry in list(match.get('player_stats') or []) + list(match.get('external_subs') or []):
+            player_name = entry.get('player', '')
+            position = self._player_positions.get(player_name)
+            if not player_name or position not in self.GOAL_POINTS or player_name in results:
+                continue
+
+            team_code = entry.get('team', '')
+            scored, conceded = scores.get(team_code, (0, None))
+            result = {
+                'goals': int(entry.get('goals', 0)) * self.GOAL_POINTS[position],
+                'assists': int(entry.get('assists', 0)) * self.ASSIST_POINTS[position],
+                'start': 0,
+                'potm': self.POTM_BONUS if entry.get('is_potm') else 0,
+                'cards': (int(entry.get('yellow_cards', 0)) * self.YELLOW_CARD_PENALTY
+                          + int(entry.get('red_cards', 0)) * self.RED_CARD_PENALTY),
+                'win': self.WIN_BONUS if conceded is not None and scored > conceded else 0,
+                'clean_sheet': self.CLEAN_SHEET_POINTS.get(position, 0) if conceded == 0 else 0,
+                'position': position,
+                'team': self.get_player_team(player_name) or team_code
+            }
+            result['total'] = sum(result[key] for key in LIVE_POINT_KEYS if key != 'total')
+            results[player_name] = result
+        return results
+
     def calculate_player_matchweek_points(
         self,
         player_name: str,
@@ -1068,14 +1297,12 @@ class FantasyPointsCalculator:
         is_captain: bool = False
     ) -> int:
         """Calculate total points for a player across all matches in a matchweek"""
-        match_ids = self.get_match_ids_for_matchweek(season, matchweek)
-
-        total_points = 0
-        for match_id in match_ids:
-            result = self.calculate_player_match_points(player_name, match_id, is_captain)
-            total_points += result['total']
-
-        return total_points
+        player_points = self.matchweek_breakdown(season, matchweek).get(player_name)
+        if player_points is None:
+            return 0
+        if is_captain:
+            return player_points['total'] * self.CAPTAIN_MULTIPLIER
+        return player_points['total']
 
     def calculate_user_matchweek_points(
         self,
@@ -1103,31 +1330,17 @@ class FantasyPointsCalculator:
 
         return breakdown
 
-    def bulk_compute_all_player_points(self, season: int, matchweek: int) -> Dict:
-        """Compute points for ALL players who appeared in the matchweek's matches.
-        Returns {player_name: {goals, assists, start, potm, cards, win, clean_sheet, total, matches_played, position, team}}
-        """
-        match_ids = self.get_match_ids_for_matchweek(season, matchweek)
-        if not match_ids:
-            return {}
-
+    def _compute_matchweek(self, season: int, matchweek: int) -> Dict:
         all_player_points = {}
 
-        for match_id in match_ids:
-            if self.player_stats_df is None:
-                continue
-
-            # Get all players who appeared in this match
-            match_players = self.player_stats_df[
-                self.player_stats_df['Match ID'] == match_id
-            ]
-
-            for _, player_row in match_players.iterrows():
+        for match_id in self.get_match_ids_for_matchweek(season, matchweek):
+            # Every player who appeared in this match
+            for player_row in self._match_rows.get(match_id, ()):
                 player_name = player_row['Name']
-                position = player_row['P']
+                position = self._row_position(player_row)
 
                 # Skip non-playing entries
-                if position == '-' or pd.isna(position) or position == '':
+                if position == '-' or position is None:
                     continue
 
                 # Calculate this player's points for this match (without captain bonus)
@@ -1142,32 +1355,48 @@ class FantasyPointsCalculator:
                     all_player_points[player_name] = {
                         'goals': 0, 'assists': 0, 'start': 0, 'potm': 0,
                         'cards': 0, 'win': 0, 'clean_sheet': 0, 'total': 0,
-                        'matches_played': 0, 'position': position, 'team': team_code or ''
+                        'matches_played': 0, 'position': position, 'team': team_code or '',
+                        'matches': []
                     }
 
                 pp = all_player_points[player_name]
-                pp['goals'] += result['goals']
-                pp['assists'] += result['assists']
-                pp['start'] += result['start']
-                pp['potm'] += result['potm']
-                pp['cards'] += result['cards']
-                pp['win'] += result['win']
-                pp['clean_sheet'] += result['clean_sheet']
-                pp['total'] += result['total']
+                for key in ('goals', 'assists', 'start', 'potm', 'cards', 'win', 'clean_sheet', 'total'):
+                    pp[key] += result[key]
                 pp['matches_played'] += 1
+                pp['matches'].append({**result, 'match_id': match_id})
 
         return all_player_points
 
+    def matchweek_breakdown(self, season: int, matchweek: int) -> Dict:
+        """Points for every player who played in a matchweek, computed once per instance.
+        Returns {player_name: {goals, assists, start, potm, cards, win, clean_sheet, total,
+        matches_played, position, team, matches}}, where matches lists the per-match
+        results (with match_id). The result is shared: do not modify it.
+        """
+        key = (int(season), int(matchweek))
+        with self._matchweeks_lock:
+            if key not in self._matchweeks:
+                self._matchweeks[key] = self._compute_matchweek(*key)
+            return self._matchweeks[key]
+
+    def bulk_compute_all_player_points(self, season: int, matchweek: int) -> Dict:
+        """Compute points for ALL players who appeared in the matchweek's matches.
+        Returns {player_name: {goals, assists, start, potm, cards, win, clean_sheet, total, matches_played, position, team}}
+        """
+        return {
+            player_name: {key: value for key, value in points.items() if key != 'matches'}
+            for player_name, points in self.matchweek_breakdown(season, matchweek).items()
+        }
+
     def cache_player_points_to_firebase(self, season: int, matchweek: int, all_player_points: Dict):
         """Save pre-computed player points to Firebase for the explore page"""
         cache_key = f"S{season}_MW{matchweek}"
         cache_ref = db.reference(f'Fantasy/PlayerPoints/{cache_key}')
 
-        # Convert to Firebase-safe format (no dots in keys)
+        # Keys are Firebase-safe names; the name itself is stored with the points
         firebase_data = {}
         for player_name, points_data in all_player_points.items():
-            safe_key = player_name.replace('.', '_')
-            firebase_data[safe_key] = {
+            firebase_data[firebase_key(player_name)] = {
                 'player_name': player_name,
                 **points_data
             }
@@ -1181,25 +1410,138 @@ class FantasyPointsCalculator:
         cache_ref = db.reference(f'Fantasy/PlayerPoints/{cache_key}')
         cached_data = cache_ref.get() or {}
 
-        # Convert back from Firebase format
-        result = {}
-        for safe_key, points_data in cached_data.items():
-            player_name = points_data.get('player_name', safe_key.replace('_', '.'))
-            result[player_name] = points_data
+        return {
+            points_data['player_name']: points_data
+            for points_data in cached_data.values()
+            if isinstance(points_data, dict) and 'player_name' in points_data
+        }
 
-        return result
+    def _claim_user(self, run_path: str, token: str, user_id: str) -> bool:
+        """
+        Claim a user's ledger entry for this run; False if their points are already committed.
 
-    def process_all_users_matchweek(self, season: int, matchweek: int) -> Dict:
-        """Process matchweek points for all fantasy users using bulk pre-compute"""
-        users_ref = db.reference('Fantasy/Users')
-        history_ref = db.reference('Fantasy/UserHistory')
-        snapshots_ref = db.reference('Fantasy/TeamSnapshots')
-        all_users = users_ref.get() or {}
-        all_snapshots = snapshots_ref.get() or {}
-        snapshot_key = f"S{season}_MW{matchweek}"
+        A committed entry holds the user's points. A claim ({'run': token})
+        left by an earlier run means that run died before its commit, since
+        the commit replaces the claim in the same write that adds the points,
+        so it is taken over.
+        """
+        claimed = []
+
+        def claim(current):
+            claimed.clear()  # Transactions may retry
+            if current is not None and not isinstance(current, dict):
+                return current
+            claimed.append(True)
+            return {'run': token}
+
+        db.reference(f"{run_path}/users/{user_id}").transaction(claim)
+        return bool(claimed)
+
+    def _commit_processed_chunk(self, run_path: str, season: int, matchweek: int, chunk: List[Dict]):
+        """
+        Commit one chunk of claimed users in a single multi-path update.
+
+        Each user's points, history entry and ledger entry are written
+        together, so the chunk is either fully applied or not at all. Totals
+        use server-side increments rather than values read earlier.
+        """
+        history_key = f"S{season}_MW{matchweek}"
+        processed_at = datetime.now().isoformat()
+        updates = {}
+        for entry in chunk:
+            user_id = entry['user_id']
+            week_points = entry['week_points']
+            user_path = f"Fantasy/Users/{user_id}"
+            updates[f"{user_path}/week_points"] = week_points
+            updates[f"{user_path}/total_points"] = increment(week_points)
+            updates[f"{user_path}/season_points/{season}"] = increment(week_points)
+            updates[f"Fantasy/UserHistory/{user_id}/{history_key}"] = {
+                'season': season,
+                'matchweek': matchweek,
+                'points': week_points,
+                'breakdown': entry['breakdown'],
+                'team': entry['team'],
+                'captain': entry['captain'],
+                'processed_at': processed_at
+            }
+            updates[f"{run_path}/users/{user_id}"] = week_points
+        db.reference('/').update(updates)
+
+    def _claim_run(self, run_path: str) -> str:
+        """
+        Claim a processing run for this worker and return the claim's token.
+
+        Raises ProcessingRunActive if another worker claimed it less than
+        PROCESS_RUN_STALE_SECONDS ago; an older claim was left by a run that
+        died and is taken over.
+        """
+        token = secrets.token_hex(8)
+
+        def claim(current):
+            if current and time.time() - current.get('claimed_at', 0) < PROCESS_RUN_STALE_SECONDS:
+                raise ProcessingRunActive(f"{run_path} is already being processed")
+            return {'token': token, 'claimed_at': time.time()}
+
+        db.reference(f"{run_path}/claim").transaction(claim)
+        return token
+
+    def _release_run(self, run_path: str, token: str):
+        """Drop this worker's claim on a processing run, if it still holds it."""
+        def release(current):
+            return None if current and current.get('token') == token else current
+
+        try:
+            db.reference(f"{run_path}/claim").transaction(release)
+        except Exception as e:
+            print(f"Error releasing {run_path}: {e}")
+
+    def process_all_users_matchweek(self, season: int, matchweek: int, job=None) -> Dict:
+        """
+        Process matchweek points for all fantasy users, at most once per user.
+
+        The run at Fantasy/ProcessingRuns/S{season}_MW{matchweek} is claimed
+        in a transaction first, so only one worker processes a matchweek at a
+        time; ProcessingRunActive is raised if it is already running, unless
+        that claim is older than PROCESS_RUN_STALE_SECONDS. The run's ledger
+        lists every user whose points have been committed. Users already in
+        it are skipped, so re-running after a failure resumes where the last
+        run stopped. Each remaining user's ledger entry is claimed in a
+        transaction, then users are committed in chunks of
+        PROCESS_CHUNK_SIZE, PROCESS_WORKERS chunks at a time, each chunk's
+        points and ledger entries in one write.
+
+        job, if given, is a jobs.Job that is told the user count up front and
+        advanced as users are skipped or committed.
+        """
+        run_key = f"S{season}_MW{matchweek}"
+        run_path = f"Fantasy/ProcessingRuns/{run_key}"
+        token = self._claim_run(run_path)
+        try:
+            db.reference(run_path).update({'status': 'running', 'started_at': datetime.now().isoformat()})
+            results = self._process_claimed_run(run_key, run_path, token, season, matchweek, job)
+            db.reference(run_path).update({
+                'status': 'failed' if results['errors'] else 'complete',
+                'finished_at': datetime.now().isoformat(),
+                'committed': results['processed_count'] + results['already_processed'],
+                'errors': len(results['errors'])
+            })
+        except Exception:
+            db.reference(run_path).update({'status': 'failed', 'finished_at': datetime.now().isoformat()})
+            raise
+        finally:
+            self._release_run(run_path, token)
+        return results
+
+    def _process_claimed_run(self, run_key: str, run_path: str, token: str, season: int, matchweek: int, job=None) -> Dict:
+        all_users = db.reference('Fantasy/Users').get() or {}
+        all_snapshots = db.reference('Fantasy/TeamSnapshots').get() or {}
+        # Claims ({'run': token}) left by a run that died are not commits
+        ledger = db.reference(f"{run_path}/users").get() or {}
+        committed = {user_id for user_id, value in ledger.items() if not isinstance(value, dict)}
 
         results = {
             'processed_count': 0,
+            'already_processed': 0,
             'total_points_awarded': 0,
             'errors': [],
             'user_results': []
@@ -1211,34 +1553,33 @@ class FantasyPointsCalculator:
         # Step 2: Cache to Firebase for the explore page
         self.cache_player_points_to_firebase(season, matchweek, all_player_points)
 
-        # Step 3: For each user, look up their team's players from pre-computed dict
+        if job is not None:
+            job.start(len(all_users))
+
+        # Step 3: Score every user not yet committed from the pre-computed dict
+        pending = []
         for user_id, user_data in all_users.items():
+            if user_id in committed:
+                results['already_processed'] += 1
+                if job is not None:
+                    job.advance(already_processed=1)
+                continue
+
             try:
-                # Try to use snapshotted team first, fall back to current team
-                user_snapshot = all_snapshots.get(user_id, {}).get(snapshot_key)
-                if user_snapshot:
-                    current_team = user_snapshot.get('team', [])
-                    captain = user_snapshot.get('captain')
-                else:
-                    current_team = user_data.get('current_team', [])
-                    captain = user_data.get('captain')
+                current_team, captain = self.user_lineup(user_data, all_snapshots.get(user_id, {}).get(run_key))
 
                 # Skip users without valid starting team
                 if not current_team or len(current_team) != 5:
+                    if job is not None:
+                        job.advance(skipped=1)
                     continue
 
-                # Step 4: Look up points from pre-computed dict + apply captain
                 player_breakdown = {}
                 week_points = 0
-
                 for player_name in current_team:
                     is_captain = (player_name == captain)
                     base_points = all_player_points.get(player_name, {}).get('total', 0)
-
-                    if is_captain:
-                        player_points = base_points * self.CAPTAIN_MULTIPLIER
-                    else:
-                        player_points = base_points
+                    player_points = base_points * self.CAPTAIN_MULTIPLIER if is_captain else base_points
 
                     player_breakdown[player_name] = {
                         'points': player_points,
@@ -1246,47 +1587,118 @@ class FantasyPointsCalculator:
                     }
                     week_points += player_points
 
-                # Update user in Firebase
-                current_total = user_data.get('total_points', 0)
-                current_season_points = user_data.get('season_points', {})
-                season_key = str(season)
-                current_season_points[season_key] = current_season_points.get(season_key, 0) + week_points
-
-                users_ref.child(user_id).update({
+                pending.append({
+                    'user_id': user_id,
+                    'username': user_data.get('username', 'Unknown'),
                     'week_points': week_points,
-                    'total_points': current_total + week_points,
-                    'season_points': current_season_points
-                })
-
-                # Save to user history
-                history_key = f"S{season}_MW{matchweek}"
-                history_ref.child(user_id).child(history_key).set({
-                    'season': season,
-                    'matchweek': matchweek,
-                    'points': week_points,
                     'breakdown': player_breakdown,
                     'team': current_team,
-                    'captain': captain,
-                    'processed_at': datetime.now().isoformat()
+                    'captain': captain
                 })
 
-                results['processed_count'] += 1
-                results['total_points_awarded'] += week_points
-                results['user_results'].append({
-                    'user_id': user_id,
-                    'username': user_data.get('username', 'Unknown'),
-                    'week_points': week_points,
-                    'breakdown': {'players': player_breakdown, 'total': week_points}
-                })
+            except Exception as e:
+                results['errors'].append({'user_id': user_id, 'error': str(e)})
+                if job is not None:
+                    job.error(e, user_id)
+                    job.advance()
+
+        # Step 4: Claim users one by one, then commit each chunk; failed users are left for the next run
+        chunks = [pending[i:i + PROCESS_CHUNK_SIZE] for i in range(0, len(pending), PROCESS_CHUNK_SIZE)]
 
+        def commit(chunk):
+            added, already, failed = [], [], []
+            for entry in chunk:
+                try:
+                    (added if self._claim_user(run_path, token, entry['user_id']) else already).append(entry)
+                except Exception as e:
+                    print(f"Error claiming {entry['user_id']} in {run_key}: {e}")
+                    failed.append((entry, e))
+            try:
+                if added:
+                    self._commit_processed_chunk(run_path, season, matchweek, added)
             except Exception as e:
-                results['errors'].append({
-                    'user_id': user_id,
-                    'error': str(e)
-                })
+                # Nothing was added; the claims are taken over by the next run
+                print(f"Error committing {len(added)} users for {run_key}: {e}")
+                failed += [(entry, e) for entry in added]
+                added = []
+            return added, already, failed
+
+        with ThreadPoolExecutor(max_workers=PROCESS_WORKERS) as executor:
+            for added, already, failed in executor.map(commit, chunks):
+                for entry, error in failed:
+                    results['errors'].append({'user_id': entry['user_id'], 'error': str(error)})
+                    if job is not None:
+                        job.error(error, entry['user_id'])
+                        job.advance()
+
+                results['already_processed'] += len(already)
+                if job is not None and already:
+                    job.advance(len(already), already_processed=len(already))
+
+                chunk_points = sum(entry['week_points'] for entry in added)
+                results['processed_count'] += len(added)
+                results['total_points_awarded'] += chunk_points
+                results['user_results'].extend({
+                    'user_id': entry['user_id'],
+                    'username': entry['username'],
+                    'week_points': entry['week_points'],
+                    'breakdown': {'players': entry['breakdown'], 'total': entry['week_points']}
+                } for entry in added)
+                if job is not None and added:
+                    job.advance(len(added), processed=len(added), points=chunk_points)
 
         return results
 
+    @staticmethod
+    def user_lineup(user_data: Dict, user_snapshot: Optional[Dict] = None) -> Tuple[List[str], Optional[str]]:
+        """(starting team, captain) scored for a user: the matchweek's team snapshot if there is one, else the current team"""
+        if user_snapshot:
+            return user_snapshot.get('team', []), user_snapshot.get('captain')
+        return user_data.get('current_team', []), user_data.get('captain')
+
+    def preview_all_users(self, season: int, matchweek: int, all_users: Dict, all_snapshots: Optional[Dict] = None) -> List[Dict]:
+        """Preview every user's matchweek points without saving, as processing would score them.
+        Players are scored once for the whole matchweek; each user's five players and
+        captain are then array lookups into those totals. Users without a valid
+        starting team are left out.
+        """
+        all_snapshots = all_snapshots or {}
+        snapshot_key = f"S{season}_MW{matchweek}"
+        player_points = self.matchweek_breakdown(season, matchweek)
+
+        users = []
+        for user_id, user_data in all_users.items():
+            current_team, captain = self.user_lineup(user_data, all_snapshots.get(user_id, {}).get(snapshot_key))
+            if current_team and len(current_team) == 5:
+                users.append((user_id, user_data, list(current_team), captain))
+        if not users:
+            return []
+
+        # Player totals by index; the extra last slot is 0 for players who did not play
+        names = list(player_points)
+        index = {name: i for i, name in enumerate(names)}
+        totals = np.array([player_points[name]['total'] for name in names] + [0])
+
+        lineups = np.array([[index.get(name, len(names)) for name in team] for _, _, team, _ in users])
+        captains = np.array([[name == captain for name in team] for _, _, team, captain in users])
+        points = totals[lineups] * np.where(captains, self.CAPTAIN_MULTIPLIER, 1)
+        week_points = points.sum(axis=1)
+
+        return [
+            {
+                'user_id': user_id,
+                'username': user_data.get('username', 'Unknown'),
+                'current_team': team,
+                'captain': captain,
+                'week_points': int(week_points[row]),
+                'breakdown': {
+                    name: {'points': int(points[row, col]), 'is_captain': bool(captains[row, col])}
+                    for col, name in enumerate(team)
+                }
+            }
+            for row, (user_id, user_data, team, captain) in enumerate(users)
+        ]
+
     def reset_all_week_points(self) -> int:
         """Reset week_points to 0 for all users. Returns count of users reset."""
         users_ref = db.reference('Fantasy/Users')
@@ -1330,3 +1742,148 @@ class FantasyPointsCalculator:
             'week_points': breakdown['total'],
             'breakdown': breakdown
         }
+
+
+class LivePoints:
+    """
+    Provisional fantasy points, updated as each match result is submitted.
+
+    record_match() scores only the players in the submitted match and adds
+    their points, and each owning user's share (doubled for captains), to
+    Fantasy/LivePoints/S{season}_MW{matchweek} in one multi-path update of
+    server-side increments. Each match is first claimed under matches/{id}
+    in a transaction, so a match is only added once even when submitted
+    twice at the same time. Players are keyed by firebase_key(name). The official points still come
+    from process_all_users_matchweek; these are shown until then.
+
+    The player -> owners index for a matchweek is built from Users and
+    TeamSnapshots and kept in memory for LIVE_OWNERS_TTL seconds; the
+    totals themselves live only in Firebase, so every worker reads the same.
+    """
+
+    def __init__(self):
+        self.owners_cache = DataCache('fantasy_live_owners', ttl=LIVE_OWNERS_TTL)
+
+    @staticmethod
+    def week_path(season: int, matchweek: int) -> str:
+        return f"{LIVE_POINTS_PATH}/S{season}_MW{matchweek}"
+
+    def _build_owners(self, season: int, matchweek: int) -> Dict:
+        all_users = firebase_reads.read('Fantasy/Users') or {}
+        all_snapshots = firebase_reads.read('Fantasy/TeamSnapshots') or {}
+        snapshot_key = f"S{season}_MW{matchweek}"
+        owners = {}
+        for user_id, user_data in all_users.items():
+            current_team, captain = FantasyPointsCalculator.user_lineup(
+                user_data, all_snapshots.get(user_id, {}).get(snapshot_key)
+            )
+            if not current_team or len(current_team) != 5:
+                continue
+            for player_name in current_team:
+                multiplier = FantasyPointsCalculator.CAPTAIN_MULTIPLIER if player_name == captain else 1
+                owners.setdefault(player_name, []).append((user_id, multiplier))
+        return owners
+
+    def owners(self, season: int, matchweek: int) -> Dict:
+        """{player name: [(user_id, multiplier)]} for users' starting lineups in a matchweek"""
+        return self.owners_cache.get(
+            f"{season}:{matchweek}", lambda: self._build_owners(season, matchweek)
+        )
+
+    def record_match(self, match: Dict, calculator: 'FantasyPointsCalculator' = None) -> Optional[Dict]:
+        """Add one submitted match's points to the live totals; None if skipped"""
+        calculator = calculator or get_points_calculator()
+        season = int(match['season'])
+        match_id = int(match['match_id'])
+        matchweek = calculator.matchweek_for_match(season, match_id)
+        if matchweek is None:
+            return None
+
+        path = self.week_path(season, matchweek)
+        player_scores = calculator.score_submitted_match(match)
+        claim_ref = db.reference(f"{path}/matches/{match_id}")
+        token = secrets.token_hex(8)
+        claimed = []
+
+        def claim(current):
+            claimed.clear()  # Transactions may retry
+            if current:
+                return current
+            claimed.append(True)
+            return {'players': len(player_scores), 'recorded_at': datetime.now().isoformat(), 'claim': token}
+
+        # Claimed first, so a match submitted twice at once is only counted by one of them
+        claim_ref.transaction(claim)
+        if not claimed:
+            return None  # already counted
+
+        updates = {f"{path}/matches/{match_id}/claim": None}
+        owners = self.owners(season, matchweek)
+        user_points = {}
+        for player_name, result in player_scores.items():
+            player_path = f"{path}/players/{firebase_key(player_name)}"
+            updates[f"{player_path}/player_name"] = player_name
+            updates[f"{player_path}/position"] = result['position']
+            updates[f"{player_path}/team"] = result['team']
+            updates[f"{player_path}/matches_played"] = increment(1)
+            for key in LIVE_POINT_KEYS:
+                updates[f"{player_path}/{key}"] = increment(result[key])
+
+            for user_id, multiplier in owners.get(player_name, ()):
+                user_points[user_id] = user_points.get(user_id, 0) + result['total'] * multiplier
+
+        for user_id, points in user_points.items():
+            updates[f"{path}/users/{user_id}"] = increment(points)
+
+        try:
+            db.reference('/').update(updates)
+        except Exception:
+            # Nothing was added; free the match so a resubmission counts it
+            claim_ref.transaction(lambda current: None if current and current.get('claim') == token else current)
+            raise
+        return {'season': season, 'matchweek': matchweek, 'players': len(player_scores), 'users': len(user_points)}
+
+    def player_points(self, season: int, matchweek: int) -> Dict:
+        """Live per-player totals, in the shape of get_cached_player_points()"""
+        players = firebase_reads.read(f"{self.week_path(season, matchweek)}/players") or {}
+        return {
+            data['player_name']: data
+            for data in players.values()
+            if isinstance(data, dict) and 'player_name' in data
+        }
+
+    def user_points(self, season: int, matchweek: int, user_id: str) -> Optional[int]:
+        """A user's live matchweek total, or None if none of their players has scored yet"""
+        return firebase_reads.read(f"{self.week_path(season, matchweek)}/users/{user_id}")
+
+
+live_points = LivePoints()
+
+
+def points_distribution(points: List[int]) -> Dict:
+    """Summary statistics of users' week points (all zero when there are none)"""
+    if not points:
+        return {'users': 0, 'total': 0, 'mean': 0, 'median': 0, 'min': 0, 'max': 0, 'std': 0, 'p25': 0, 'p75': 0}
+    values = np.asarray(points)
+    p25, median, p75 = np.percentile(values, [25, 50, 75])
+    return {
+        'users': int(values.size),
+        'total': int(values.sum()),
+        'mean': round(float(values.mean()), 1),
+        'median': round(float(median), 1),
+        'min': int(values.min()),
+        'max': int(values.max()),
+        'std': round(float(values.std()), 1),
+        'p25': round(float(p25), 1),
+        'p75': round(float(p75), 1),
+    }
+
+
+# Process-wide calculator; a new one (with empty matchweek results) is built
+# when the data version changes
+points_cache = DataCache('fantasy_points', ttl=6000)
+
+
+def get_points_calculator() -> FantasyPointsCalculator:
+    """Shared FantasyPointsCalculator for the current data version"""
+    return points_cache.get('calculator', FantasyPointsCalculator)
@@ -2,12 +2,16 @@ from fastapi import APIRouter, Request, Form, Depends, Cookie, HTTPException, Qu
 from fastapi.templating import Jinja2Templates
 from starlette.responses import RedirectResponse, HTMLResponse
 from firebase_admin import db
-from models.fantasy import FantasyUser, FantasyService, FantasyPointsCalculator
+from models.fantasy import FantasyUser, FantasyService, FantasyPointsCalculator, current_week_replica, settings_replica, live_points, backfill_prediction_indexes, legacy_prediction_scan_enabled
 from firebase_admin import auth
 from datetime import datetime
 import os
 import urllib.parse
 from functions import send_email
+from jobs import job_runner, job_status, JobConflict
+from data_sync import match_syncer
+from match_ids import match_id_allocator
+from matchday_upload import parse_matchday, validate_matchday, build_match_entry
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
@@ -232,6 +236,8 @@ async def deny_player_verification(
 import pandas as pd
 import json
 from starlette.responses import JSONResponse
+from caching import cache_stats
+from server import process_memory
 
 def get_teams_for_season(season=None):
     """Get list of teams for a given season"""
@@ -250,7 +256,7 @@ def get_players_for_team(team_name, season=None):
     try:
         stats = pd.read_csv('data/season_player_stats.csv', encoding='utf-8-sig')
         if season:
-            stats = stats[stats['Season'] == str(season)]
+            stats = stats[stats['Season'].astype(str) == str(season)]
         else:
             stats = stats[stats['Season'] != 'Total']
         team_players = stats[stats['Team'] == team_name]['Name'].unique().tolist()
@@ -307,35 +313,13 @@ async def get_team_players(team: str, season: int = None, user: dict = Depends(g
     return JSONResponse(content={"players": players})
 
 
-def get_next_match_id():
-    """Get the next match ID by checking both CSV and Firebase"""
-    csv_max_id = 0
-    firebase_max_id = 0
-
-    # Get max from CSV
-    try:
-        results_path = 'data/Match_Results.csv'
-        results_df = pd.read_csv(results_path, encoding='utf-8-sig')
-        csv_max_id = int(results_df['Match ID'].max())
-    except Exception as e:
-        print(f"Could not read CSV for match ID: {e}")
-
-    # Get max from Firebase
-    try:
-        game_day_ref = db.reference('game_day_stats')
-        all_matchdays = game_day_ref.get() or {}
-        for matchday_key, matches in all_matchdays.items():
-            if isinstance(matches, dict):
-                for match_id_str in matches.keys():
-                    try:
-                        match_id = int(match_id_str)
-                        firebase_max_id = max(firebase_max_id, match_id)
-                    except ValueError:
-                        continue
-    except Exception as e:
-        print(f"Could not read Firebase for match ID: {e}")
+@router.get("/api/admin/cache-stats")
+async def get_cache_stats(user: dict = Depends(get_current_user)):
+    """API endpoint reporting the size, budget and hit rate of every in-process cache"""
+    if not is_admin(user):
+        return JSONResponse(content={"error": "Forbidden"}, status_code=403)
 
-    return max(csv_max_id, firebase_max_id) + 1
+    return JSONResponse(content={**cache_stats(), "process": process_memory()})
 
 
 @router.post("/admin/submit-match")
@@ -357,68 +341,14 @@ async def submit_match_result(request: Request, user: dict = Depends(get_current
             if field not in match_data:
                 return RedirectResponse(url=f"/admin/data-entry?error=Missing+field:+{field}", status_code=303)
 
-        # Get next match ID (checks both CSV and Firebase)
-        next_id = get_next_match_id()
+        # Reserve the next match ID (one counter transaction)
+        next_id = match_id_allocator.allocate()
         matchday = int(match_data['matchday'])
         season = int(match_data['season'])
 
         # Build the match data for Firebase
         # Schema: game_day_stats / MD{matchday}_S{season} / {match_id} / data
-        firebase_match_data = {
-            'match_id': next_id,
-            'team1': match_data['team1'],
-            'score1': int(match_data['score1']),
-            'team2': match_data['team2'],
-            'score2': int(match_data['score2']),
-            'matchday': matchday,
-            'group': match_data['group'],
-            'season': season,
-            'potm': match_data.get('potm', ''),
-            'referee': match_data.get('referee', ''),
-            'data_collector': match_data.get('data_collector', ''),
-            'submitted_by': user.get('email', 'unknown'),
-            'submitted_at': datetime.now().isoformat(),
-            'player_stats': [],
-            'external_subs': []
-        }
-
-        # Handle penalty shootout data
-        if match_data.get('has_penalties'):
-            firebase_match_data['has_penalties'] = True
-            firebase_match_data['penalty1'] = int(match_data.get('penalty1', 0))
-            firebase_match_data['penalty2'] = int(match_data.get('penalty2', 0))
-
-        # Process player stats from team rosters
-        player_stats = match_data.get('player_stats', [])
-        for player_stat in player_stats:
-            stat_entry = {
-                'player': player_stat.get('name', ''),
-                'team': player_stat.get('team', ''),
-                'goals': int(player_stat.get('goals', 0)),
-                'assists': int(player_stat.get('assists', 0)),
-                'saves': int(player_stat.get('saves', 0)),
-                'yellow_cards': int(player_stat.get('yellow', 0)),
-                'red_cards': int(player_stat.get('red', 0)),
-                'is_potm': player_stat.get('potm', False),
-                'is_manual': player_stat.get('is_manual', False)
-            }
-            firebase_match_data['player_stats'].append(stat_entry)
-
-        # Process external subs
-        external_subs = match_data.get('external_subs', [])
-        for ext_sub in external_subs:
-            sub_entry = {
-                'player': ext_sub.get('name', ''),
-                'team': ext_sub.get('team', ''),
-                'goals': int(ext_sub.get('goals', 0)),
-                'assists': int(ext_sub.get('assists', 0)),
-                'saves': int(ext_sub.get('saves', 0)),
-                'yellow_cards': int(ext_sub.get('yellow', 0)),
-                'red_cards': int(ext_sub.get('red', 0)),
-                'is_potm': ext_sub.get('potm', False),
-                'is_external': True
-            }
-            firebase_match_data['external_subs'].append(sub_entry)
+        firebase_match_data = build_match_entry(match_data, next_id, matchday, season, user.get('email', 'unknown'))
 
         # Save to Firebase game_day_stats
         # Schema: game_day_stats / MD{matchday}_S{season} / {match_id}
@@ -426,51 +356,17 @@ async def submit_match_result(request: Request, user: dict = Depends(get_current
         game_day_ref = db.reference(f'game_day_stats/{matchday_key}/{next_id}')
         game_day_ref.set(firebase_match_data)
 
-        # Also save to local CSV for backwards compatibility (dev environment)
+        # Provisional fantasy points for the players in this match
+        try:
+            live_points.record_match(firebase_match_data)
+        except Exception as e:
+            print(f"Error recording live points for match {next_id}: {e}")
+
+        # Copy it into the local CSVs (the background sync would catch up otherwise)
         try:
-            results_path = 'data/Match_Results.csv'
-            results_df = pd.read_csv(results_path, encoding='utf-8-sig')
-
-            new_match = {
-                'Match ID': next_id,
-                'Team 1': match_data['team1'],
-                'Score Team 1': int(match_data['score1']),
-                'Team 2': match_data['team2'],
-                'Score Team 2': int(match_data['score2']),
-                'MD': matchday,
-                'Group': match_data['group'],
-                'Season': season
-            }
-            results_df = pd.concat([results_df, pd.DataFrame([new_match])], ignore_index=True)
-            results_df.to_csv(results_path, index=False, encoding='utf-8-sig')
-
-            # Also save player stats to CSV (both roster players and external subs)
-            all_player_stats = player_stats + external_subs
-            if all_player_stats:
-                stats_path = 'data/player_match_stats.csv'
-                try:
-                    stats_df = pd.read_csv(stats_path, encoding='utf-8-sig')
-                except FileNotFoundError:
-                    stats_df = pd.DataFrame(columns=['Match ID', 'Player', 'Team', 'Goals', 'Assists', 'Saves', 'Yellow', 'Red', 'POTM', 'External'])
-
-                for player_stat in all_player_stats:
-                    stat_entry = {
-                        'Match ID': next_id,
-                        'Player': player_stat.get('name', ''),
-                        'Team': player_stat.get('team', ''),
-                        'Goals': int(player_stat.get('goals', 0)),
-                        'Assists': int(player_stat.get('assists', 0)),
-                        'Saves': int(player_stat.get('saves', 0)),
-                        'Yellow': int(player_stat.get('yellow', 0)),
-                        'Red': int(player_stat.get('red', 0)),
-                        'POTM': 1 if player_stat.get('potm', False) else 0,
-                        'External': 1 if player_stat.get('is_external', False) else 0
-                    }
-                    stats_df = pd.concat([stats_df, pd.DataFrame([stat_entry])], ignore_index=True)
-                stats_df.to_csv(stats_path, index=False, encoding='utf-8-sig')
-        except Exception as csv_error:
-            # CSV save failed but Firebase succeeded - log but don't fail
-            print(f"CSV save failed (Firebase succeeded): {csv_error}")
+            match_syncer.sync()
+        except Exception as e:
+            print(f"Error syncing match {next_id} to CSV (Firebase succeeded): {e}")
 
         # Log the action to audit trail
         log_entry = {
@@ -497,6 +393,82 @@ async def submit_match_result(request: Request, user: dict = Depends(get_current
         return RedirectResponse(url=f"/admin/data-entry?error=Error+saving+match:+{str(e)}", status_code=303)
 
 
+@router.post("/admin/upload-matchday")
+async def upload_matchday(request: Request, user: dict = Depends(get_current_user)):
+    """Submit a whole matchday (CSV or JSON upload) in one write"""
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Forbidden: Admins only")
+
+    try:
+        form_data = await request.form()
+        upload = form_data.get('matchday_file')
+        if upload is None or not getattr(upload, 'filename', ''):
+            return RedirectResponse(url="/admin/data-entry?error=No+file+uploaded", status_code=303)
+        matchday = int(form_data.get('matchday', 0))
+        season = int(form_data.get('season', 0))
+        if matchday < 1 or season < 1:
+            return RedirectResponse(url="/admin/data-entry?error=Matchday+and+season+are+required", status_code=303)
+
+        try:
+            matches = parse_matchday(upload.filename, await upload.read())
+        except (ValueError, UnicodeDecodeError) as e:
+            return RedirectResponse(url=f"/admin/data-entry?error={urllib.parse.quote_plus(f'Could not read upload: {e}')}", status_code=303)
+
+        # Validate every row before anything is written
+        teams = get_teams_for_season(season)
+        rosters = {team: get_players_for_team(team, season) for team in teams}
+        errors = validate_matchday(matches, teams, rosters)
+        if errors:
+            shown = '; '.join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else '')
+            return RedirectResponse(url=f"/admin/data-entry?error={urllib.parse.quote_plus(shown)}", status_code=303)
+
+        # One ID reservation and one multi-path write for the whole matchday
+        first_id = match_id_allocator.allocate(len(matches))
+        matchday_key = f"MD{matchday}_S{season}"
+        submitted_by = user.get('email', 'unknown')
+        entries = [
+            build_match_entry(match, first_id + i, matchday, season, submitted_by)
+            for i, match in enumerate(matches)
+        ]
+        db.reference('/').update({
+            f"game_day_stats/{matchday_key}/{entry['match_id']}": entry for entry in entries
+        })
+
+        for entry in entries:
+            try:
+                live_points.record_match(entry)
+            except Exception as e:
+                print(f"Error recording live points for match {entry['match_id']}: {e}")
+
+        # Appends every new match to each CSV at once
+        try:
+            match_syncer.sync()
+        except Exception as e:
+            print(f"Error syncing matchday {matchday_key} to CSV (Firebase succeeded): {e}")
+
+        last_id = entries[-1]['match_id']
+        log_entry = {
+            'timestamp': datetime.now().isoformat(),
+            'user': submitted_by,
+            'action': 'matchday_upload',
+            'match_id': first_id,
+            'matchday_key': matchday_key,
+            'summary': f"{len(entries)} matches uploaded ({upload.filename}), IDs {first_id}-{last_id}"
+        }
+        try:
+            db.reference('AdminAuditLog').push(log_entry)
+        except Exception as e:
+            print(f"Failed to log audit entry: {e}")
+
+        success_msg = urllib.parse.quote_plus(f"{len(entries)} matches saved for {matchday_key} (IDs {first_id}-{last_id})")
+        return RedirectResponse(url=f"/admin/data-entry?success={success_msg}", status_code=303)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return RedirectResponse(url=f"/admin/data-entry?error={urllib.parse.quote_plus(f'Error uploading matchday: {e}')}", status_code=303)
+
+
 # ===========================
 # FANTASY USER MANAGEMENT
 # ===========================
@@ -787,6 +759,8 @@ async def week_management_page(
             "season_matchweeks": season_matchweeks,
             "total_users": len(all_users),
             "users_with_teams": users_with_teams,
+            "recent_jobs": [job.to_dict() for job in job_runner.recent(5)],
+            "predictions_indexed": not legacy_prediction_scan_enabled(),
             "success": urllib.parse.unquote(success) if success else None,
             "error": urllib.parse.unquote(error) if error else None
         })
@@ -800,10 +774,222 @@ async def week_management_page(
             "season_matchweeks": {},
             "total_users": 0,
             "users_with_teams": 0,
+            "recent_jobs": [],
+            "predictions_indexed": False,
             "error": str(e)
         })
 
 
+def run_set_current_week(job, season: int, matchweek: int, deadline: str, admin_email: str) -> str:
+    """Background job: archive the current week, save and reset every user's week, then set the new week"""
+    week_ref = db.reference('Fantasy/current_week')
+    previous_weeks_ref = db.reference('Fantasy/previous_weeks')
+    history_ref = db.reference('Fantasy/UserHistory')
+
+    # Archive current week data
+    current_data = week_ref.get()
+    if current_data:
+        previous_weeks_ref.push(current_data)
+
+    users_ref = db.reference('Fantasy/Users')
+    all_users = users_ref.get() or {}
+    job.start(len(all_users))
+
+    history_key = None
+    if current_data:
+        old_season = current_data.get('Season')
+        old_week = current_data.get('Week')
+        if old_season and old_week:
+            history_key = f"S{old_season}_MW{old_week}"
+
+    reset_count = 0
+    for uid, udata in all_users.items():
+        try:
+            # Save each user's current week_points to history before reset
+            if history_key:
+                # Save all users regardless of points to maintain a complete audit trail.
+                # Only skip if a history entry already exists (e.g. saved by process_all_users_matchweek).
+                existing = history_ref.child(uid).child(history_key).get()
+                if not existing:
+                    history_ref.child(uid).child(history_key).set({
+                        'season': old_season,
+                        'matchweek': old_week,
+                        'points': udata.get('week_points', 0),
+                        'saved_at': datetime.now().isoformat()
+                    })
+
+            # Reset week_points to 0 and free_transfers to 2
+            users_ref.child(uid).update({
+                'week_points': 0,
+                'free_transfers': 2
+            })
+            reset_count += 1
+            job.advance(reset=1)
+        except Exception as e:
+            job.error(e, uid)
+            job.advance()
+
+    # Set new week data
+    new_week = {
+        'Season': season,
+        'Week': matchweek,
+        'Deadline': deadline,
+        'updated_at': datetime.now().isoformat(),
+        'updated_by': admin_email
+    }
+    week_ref.set(new_week)
+    current_week_replica.apply(new_week)
+
+    # Log the action
+    log_entry = {
+        'timestamp': datetime.now().isoformat(),
+        'admin': admin_email,
+        'action': 'set_current_week',
+        'season': season,
+        'matchweek': matchweek,
+        'users_reset': reset_count
+    }
+    db.reference('AdminAuditLog').push(log_entry)
+
+    return f"Set to Season {season} MW{matchweek}. Reset week_points and free_transfers for {reset_count} users."
+
+
+def run_snapshot_teams(job, season: int, matchweek: int) -> str:
+    """Background job: snapshot every complete team for a matchweek"""
+    users_ref = db.reference('Fantasy/Users')
+    snapshots_ref = db.reference('Fantasy/TeamSnapshots')
+    all_users = users_ref.get() or {}
+    snapshot_key = f"S{season}_MW{matchweek}"
+    job.start(len(all_users))
+
+    snapshot_count = 0
+    for uid, user_data in all_users.items():
+        try:
+            current_team = user_data.get('current_team', [])
+            if current_team and len(current_team) == 5:
+                snapshots_ref.child(uid).child(snapshot_key).set({
+                    'team': current_team,
+                    'captain': user_data.get('captain'),
+                    'all_players': user_data.get('all_players', []),
+                    'snapshot_at': datetime.now().isoformat()
+                })
+                snapshot_count += 1
+                job.advance(snapshotted=1)
+            else:
+                job.advance(skipped=1)
+        except Exception as e:
+            job.error(e, uid)
+            job.advance()
+
+    return f"Team editing is now locked. Snapshotted {snapshot_count} teams for {snapshot_key}."
+
+
+def run_reset_free_transfers(job, transfer_count: int, admin_email: str) -> str:
+    """Background job: set every user's free transfers to transfer_count"""
+    users_ref = db.reference('Fantasy/Users')
+    all_users = users_ref.get() or {}
+    job.start(len(all_users))
+
+    reset_count = 0
+    for uid in all_users.keys():
+        try:
+            users_ref.child(uid).update({'free_transfers': transfer_count})
+            reset_count += 1
+            job.advance(reset=1)
+        except Exception as e:
+            job.error(e, uid)
+            job.advance()
+
+    # Log the action
+    log_entry = {
+        'timestamp': datetime.now().isoformat(),
+        'admin': admin_email,
+        'action': 'reset_free_transfers',
+        'transfer_count': transfer_count,
+        'users_affected': reset_count
+    }
+    db.reference('AdminAuditLog').push(log_entry)
+
+    return f"Reset free transfers to {transfer_count} for {reset_count} users"
+
+
+def run_start_new_season(job, new_season: int, current_season, admin_email: str) -> str:
+    """Background job: archive and reset every user, then open week 1 of the new season"""
+    week_ref = db.reference('Fantasy/current_week')
+    users_ref = db.reference('Fantasy/Users')
+    archive_ref = db.reference(f'Fantasy/SeasonArchive/S{current_season}')
+    all_users = users_ref.get() or {}
+    job.start(len(all_users))
+
+    archived_count = 0
+    for uid, user_data in all_users.items():
+        try:
+            # Archive user's current state
+            archive_ref.child(uid).set({
+                'username': user_data.get('username', 'Unknown'),
+                'all_players': user_data.get('all_players', []),
+                'current_team': user_data.get('current_team', []),
+                'captain': user_data.get('captain'),
+                'total_balance': user_data.get('total_balance', 100.0),
+                'total_points': user_data.get('total_points', 0),
+                'season_points': user_data.get('season_points', {}),
+                'week_points': user_data.get('week_points', 0),
+                'archived_at': datetime.now().isoformat()
+            })
+
+            # Reset user for new season — preserve total_points, season_points, UserHistory
+            users_ref.child(uid).update({
+                'all_players': [],
+                'current_team': [],
+                'captain': None,
+                'total_balance': 100.0,
+                'free_transfers': 2,
+                'week_points': 0
+            })
+            archived_count += 1
+            job.advance(archived=1)
+        except Exception as e:
+            job.error(e, uid)
+            job.advance()
+
+    # Unlock teams for the new season
+    db.reference('Fantasy/settings/team_lock').set(False)
+    settings_replica.apply(False, 'team_lock')
+
+    # Set new season week 1
+    new_week = {
+        'Season': new_season,
+        'Week': 1,
+        'Deadline': '',
+        'updated_at': datetime.now().isoformat(),
+        'updated_by': admin_email
+    }
+    week_ref.set(new_week)
+    current_week_replica.apply(new_week)
+
+    # Log the action
+    log_entry = {
+        'timestamp': datetime.now().isoformat(),
+        'admin': admin_email,
+        'action': 'start_new_season',
+        'old_season': current_season,
+        'new_season': new_season,
+        'users_archived': archived_count
+    }
+    db.reference('AdminAuditLog').push(log_entry)
+
+    return f"Started Season {new_season}! Archived {archived_count} users from Season {current_season}. All teams reset."
+
+
+def submit_admin_job(kind: str, func, *args, description: str = ''):
+    """Queue a week-management job and redirect to its status page (or to the one already running)"""
+    try:
+        job = job_runner.submit(kind, func, *args, description=description, return_url="/admin/week-management")
+    except JobConflict as e:
+        job = e.job
+    return RedirectResponse(url=f"/admin/jobs/{job.id}/view", status_code=303)
+
+
 @router.post("/admin/set-current-week")
 async def set_current_week(
     request: Request,
@@ -825,68 +1011,10 @@ async def set_current_week(
             error_msg = f"No player data found in Fantasy_Data.csv for Season {season}. Please update the CSV first."
             return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(error_msg)}", status_code=303)
 
-        week_ref = db.reference('Fantasy/current_week')
-        previous_weeks_ref = db.reference('Fantasy/previous_weeks')
-        history_ref = db.reference('Fantasy/UserHistory')
-
-        # Archive current week data
-        current_data = week_ref.get()
-        if current_data:
-            previous_weeks_ref.push(current_data)
-
-        # Save each user's current week_points to history before reset
-        users_ref = db.reference('Fantasy/Users')
-        all_users = users_ref.get() or {}
-        
-        if current_data:
-            old_season = current_data.get('Season')
-            old_week = current_data.get('Week')
-            if old_season and old_week:
-                history_key = f"S{old_season}_MW{old_week}"
-                for uid, udata in all_users.items():
-                    current_wp = udata.get('week_points', 0)
-                    # Save all users regardless of points to maintain a complete audit trail.
-                    # Only skip if a history entry already exists (e.g. saved by process_all_users_matchweek).
-                    existing = history_ref.child(uid).child(history_key).get()
-                    if not existing:
-                        history_ref.child(uid).child(history_key).set({
-                            'season': old_season,
-                            'matchweek': old_week,
-                            'points': current_wp,
-                            'saved_at': datetime.now().isoformat()
-                        })
-
-        # Reset week_points to 0 and free_transfers to 2 for all users
-        reset_count = 0
-        for uid in all_users.keys():
-            users_ref.child(uid).update({
-                'week_points': 0,
-                'free_transfers': 2
-            })
-            reset_count += 1
-
-        # Set new week data
-        week_ref.set({
-            'Season': season,
-            'Week': matchweek,
-            'Deadline': deadline,
-            'updated_at': datetime.now().isoformat(),
-            'updated_by': user.get('email', 'unknown')
-        })
-
-        # Log the action
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'admin': user.get('email', 'unknown'),
-            'action': 'set_current_week',
-            'season': season,
-            'matchweek': matchweek,
-            'users_reset': reset_count
-        }
-        db.reference('AdminAuditLog').push(log_entry)
-
-        success_msg = f"Set to Season {season} MW{matchweek}. Reset week_points and free_transfers for {reset_count} users."
-        return RedirectResponse(url=f"/admin/week-management?success={urllib.parse.quote(success_msg)}", status_code=303)
+        return submit_admin_job(
+            'set_current_week', run_set_current_week, season, matchweek, deadline, user.get('email', 'unknown'),
+            description=f"Set current week to Season {season} MW{matchweek}"
+        )
 
     except Exception as e:
         return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(str(e))}", status_code=303)
@@ -897,7 +1025,7 @@ async def toggle_team_lock(
     request: Request,
     user: dict = Depends(get_current_user)
 ):
-    """Toggle team editing lock on/off. When locking, auto-snapshot all teams."""
+    """Toggle team editing lock on/off. When locking, auto-snapshot all teams in the background."""
     if not is_admin(user):
         raise HTTPException(status_code=403, detail="Forbidden: Admins only")
 
@@ -908,33 +1036,7 @@ async def toggle_team_lock(
         # Toggle the lock
         new_lock = not current_lock
         lock_ref.set(new_lock)
-
-        snapshot_msg = ""
-        # Auto-snapshot all teams when LOCKING
-        if new_lock:
-            week_data = db.reference('Fantasy/current_week').get() or {}
-            season = week_data.get('Season')
-            matchweek = week_data.get('Week')
-
-            if season and matchweek:
-                users_ref = db.reference('Fantasy/Users')
-                snapshots_ref = db.reference('Fantasy/TeamSnapshots')
-                all_users = users_ref.get() or {}
-                snapshot_key = f"S{season}_MW{matchweek}"
-                snapshot_count = 0
-
-                for uid, user_data in all_users.items():
-                    current_team = user_data.get('current_team', [])
-                    if current_team and len(current_team) == 5:
-                        snapshots_ref.child(uid).child(snapshot_key).set({
-                            'team': current_team,
-                            'captain': user_data.get('captain'),
-                            'all_players': user_data.get('all_players', []),
-                            'snapshot_at': datetime.now().isoformat()
-                        })
-                        snapshot_count += 1
-
-                snapshot_msg = f" Snapshotted {snapshot_count} teams for S{season}_MW{matchweek}."
+        settings_replica.apply(new_lock, 'team_lock')
 
         # Log the action
         log_entry = {
@@ -945,8 +1047,20 @@ async def toggle_team_lock(
         }
         db.reference('AdminAuditLog').push(log_entry)
 
+        # Auto-snapshot all teams when LOCKING
+        if new_lock:
+            week_data = db.reference('Fantasy/current_week').get() or {}
+            season = week_data.get('Season')
+            matchweek = week_data.get('Week')
+
+            if season and matchweek:
+                return submit_admin_job(
+                    'snapshot_teams', run_snapshot_teams, season, matchweek,
+                    description=f"Snapshot teams for S{season}_MW{matchweek}"
+                )
+
         status = "locked" if new_lock else "unlocked"
-        success_msg = f"Team editing is now {status}.{snapshot_msg}"
+        success_msg = f"Team editing is now {status}."
         return RedirectResponse(url=f"/admin/week-management?success={urllib.parse.quote(success_msg)}", status_code=303)
 
     except Exception as e:
@@ -964,29 +1078,40 @@ async def reset_all_free_transfers(
         raise HTTPException(status_code=403, detail="Forbidden: Admins only")
 
     try:
-        users_ref = db.reference('Fantasy/Users')
-        all_users = users_ref.get() or {}
+        return submit_admin_job(
+            'reset_free_transfers', run_reset_free_transfers, transfer_count, user.get('email', 'unknown'),
+            description=f"Reset free transfers to {transfer_count}"
+        )
 
-        reset_count = 0
-        for uid in all_users.keys():
-            users_ref.child(uid).update({'free_transfers': transfer_count})
-            reset_count += 1
+    except Exception as e:
+        return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(str(e))}", status_code=303)
 
-        # Log the action
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'admin': user.get('email', 'unknown'),
-            'action': 'reset_free_transfers',
-            'transfer_count': transfer_count,
-            'users_affected': reset_count
-        }
-        db.reference('AdminAuditLog').push(log_entry)
 
-        success_msg = f"Reset free transfers to {transfer_count} for {reset_count} users"
-        return RedirectResponse(url=f"/admin/week-management?success={urllib.parse.quote(success_msg)}", status_code=303)
+def run_backfill_prediction_indexes(job, admin_email: str) -> str:
+    """Background job: index legacy predictions and turn off the full-scan fallbacks"""
+    results = backfill_prediction_indexes(job=job)
 
-    except Exception as e:
-        return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(str(e))}", status_code=303)
+    log_entry = {
+        'timestamp': datetime.now().isoformat(),
+        'admin': admin_email,
+        'action': 'backfill_prediction_indexes',
+        'predictions': results['predictions']
+    }
+    db.reference('AdminAuditLog').push(log_entry)
+
+    return f"Indexed {results['predictions']} predictions ({results['index_entries']} index entries); legacy scans are now off"
+
+
+@router.post("/admin/predictions/backfill-indexes")
+async def backfill_predictions(request: Request, user: dict = Depends(get_current_user)):
+    """Queue the one-shot migration indexing legacy predictions"""
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Forbidden: Admins only")
+
+    return submit_admin_job(
+        'backfill_prediction_indexes', run_backfill_prediction_indexes, user.get('email', 'unknown'),
+        description="Index legacy predictions"
+    )
 
 
 # ===========================
@@ -1017,67 +1142,42 @@ async def start_new_season(
             error_msg = f"No player data found in Fantasy_Data.csv for Season {new_season}. Please update the CSV first."
             return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(error_msg)}", status_code=303)
 
-        # Get current season info
-        week_ref = db.reference('Fantasy/current_week')
-        current_week_data = week_ref.get() or {}
-        current_season = current_week_data.get('Season', new_season - 1)
+        return submit_admin_job(
+            'start_new_season', run_start_new_season, new_season, current_week_data.get('Season', new_season - 1),
+            user.get('email', 'unknown'),
+            description=f"Start Season {new_season}"
+        )
 
-        # Archive current season data for all users
-        users_ref = db.reference('Fantasy/Users')
-        archive_ref = db.reference(f'Fantasy/SeasonArchive/S{current_season}')
-        all_users = users_ref.get() or {}
+    except Exception as e:
+        return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(str(e))}", status_code=303)
 
-        archived_count = 0
-        for uid, user_data in all_users.items():
-            # Archive user's current state
-            archive_ref.child(uid).set({
-                'username': user_data.get('username', 'Unknown'),
-                'all_players': user_data.get('all_players', []),
-                'current_team': user_data.get('current_team', []),
-                'captain': user_data.get('captain'),
-                'total_balance': user_data.get('total_balance', 100.0),
-                'total_points': user_data.get('total_points', 0),
-                'season_points': user_data.get('season_points', {}),
-                'week_points': user_data.get('week_points', 0),
-                'archived_at': datetime.now().isoformat()
-            })
 
-            # Reset user for new season — preserve total_points, season_points, UserHistory
-            users_ref.child(uid).update({
-                'all_players': [],
-                'current_team': [],
-                'captain': None,
-                'total_balance': 100.0,
-                'free_transfers': 2,
-                'week_points': 0
-            })
-            archived_count += 1
+# ===========================
+# BACKGROUND JOBS
+# ===========================
 
-        # Unlock teams for the new season
-        db.reference('Fantasy/settings/team_lock').set(False)
+@router.get("/admin/jobs/{job_id}")
+async def get_job_status(job_id: str, user: dict = Depends(get_current_user)):
+    """API endpoint reporting a background job's status, progress, counts and errors"""
+    if not is_admin(user):
+        return JSONResponse(content={"error": "Forbidden"}, status_code=403)
 
-        # Set new season week 1
-        week_ref.set({
-            'Season': new_season,
-            'Week': 1,
-            'Deadline': '',
-            'updated_at': datetime.now().isoformat(),
-            'updated_by': user.get('email', 'unknown')
-        })
+    status = job_status(job_id)
+    if status is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return JSONResponse(content=status)
 
-        # Log the action
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'admin': user.get('email', 'unknown'),
-            'action': 'start_new_season',
-            'old_season': current_season,
-            'new_season': new_season,
-            'users_archived': archived_count
-        }
-        db.reference('AdminAuditLog').push(log_entry)
 
-        success_msg = f"Started Season {new_season}! Archived {archived_count} users from Season {current_season}. All teams reset."
-        return RedirectResponse(url=f"/admin/week-management?success={urllib.parse.quote(success_msg)}", status_code=303)
+@router.get("/admin/jobs/{job_id}/view", response_class=HTMLResponse)
+async def job_status_page(request: Request, job_id: str, user: dict = Depends(get_current_user)):
+    """Status page for a background job; polls /admin/jobs/{job_id} until it finishes"""
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Forbidden: Admins only")
 
-    except Exception as e:
-        return RedirectResponse(url=f"/admin/week-management?error={urllib.parse.quote(str(e))}", status_code=303)
+    status = job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return templates.TemplateResponse(request=request, name="admin_job.html", context={
+        "request": request,
+        "job": status
+    })
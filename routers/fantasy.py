@@ -2,20 +2,24 @@ from fastapi import Request, Form, APIRouter, Depends, Cookie, HTTPException
 from firebase_admin import auth, db
 from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse, RedirectResponse
-from models.fantasy import FantasyUser, FantasyService, MiniLeague, MatchPrediction, PredictionLeaderboard, FantasyPointsCalculator
+from models.fantasy import FantasyUser, FantasyService, MiniLeague, MatchPrediction, PredictionLeaderboard, FantasyPointsCalculator, get_points_calculator, points_distribution
+from models.fantasy import current_week_replica, settings_replica, live_points
 import pandas as pd
 from datetime import datetime
+from caching import DataCache
+from data_store import read_dataset
+import firebase_reads
+from jobs import job_runner, JobConflict
 import urllib.parse
 from functools import lru_cache
-import time
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
-_players_cache = {"data": None, "timestamp": 0, "season": None}
-_teams_cache = {"data": None, "timestamp": 0, "season": None}
-_fantasy_service_cache = {"service": None, "season": None}
 CACHE_DURATION = 300  # 5 minutes
+# Fantasy player and team lists per season
+fantasy_cache = DataCache('fantasy', ttl=CACHE_DURATION)
+_fantasy_service_cache = {"service": None, "season": None}
 
 def get_current_user(session_token: str = Cookie(None)):
     if not session_token:
@@ -35,57 +39,31 @@ def get_fantasy_service() -> FantasyService:
         _fantasy_service_cache["season"] != current_season):
         _fantasy_service_cache["service"] = FantasyService(season=current_season)
         _fantasy_service_cache["season"] = current_season
-        # Invalidate player/team caches when season changes
-        _players_cache["data"] = None
-        _teams_cache["data"] = None
+        # Drop the previous season's player/team lists
+        fantasy_cache.invalidate()
         print(f"Created FantasyService for Season {current_season}")
     
     return _fantasy_service_cache["service"]
 
 def get_cached_players():
     """Get all players with caching, season-aware"""
-    current_time = time.time()
     current_season = FantasyService.get_current_season()
-    
-    if (_players_cache["data"] is None or 
-        current_time - _players_cache["timestamp"] > CACHE_DURATION or
-        _players_cache["season"] != current_season):
-        
-        service = get_fantasy_service()
-        _players_cache["data"] = service.get_all_players()
-        _players_cache["timestamp"] = current_time
-        _players_cache["season"] = current_season
-        print(f"Refreshed players cache for Season {current_season}")
-    
-    return _players_cache["data"]
+    return fantasy_cache.get(f"players:{current_season}", lambda: get_fantasy_service().get_all_players())
 
 def get_cached_teams():
     """Get all teams with caching, season-aware"""
-    current_time = time.time()
     current_season = FantasyService.get_current_season()
-
-    if (_teams_cache["data"] is None or
-        current_time - _teams_cache["timestamp"] > CACHE_DURATION or
-        _teams_cache["season"] != current_season):
-
-        all_players = get_cached_players()
-        _teams_cache["data"] = sorted(list(set(
-            player.get('Team', 'Unknown')
-            for player in all_players
-            if player.get('Team')
-        )))
-        _teams_cache["timestamp"] = current_time
-        _teams_cache["season"] = current_season
-        print(f"Refreshed teams cache for Season {current_season}")
-
-    return _teams_cache["data"]
+    return fantasy_cache.get(f"teams:{current_season}", lambda: sorted(set(
+        player.get('Team', 'Unknown')
+        for player in get_cached_players()
+        if player.get('Team')
+    )))
 
 
 def is_team_locked():
     """Check if team editing is locked"""
     try:
-        lock_ref = db.reference('Fantasy/settings/team_lock')
-        return lock_ref.get() or False
+        return (settings_replica.get() or {}).get('team_lock') or False
     except Exception as e:
         print(f"Error checking team lock status: {e}")
         return False
@@ -96,7 +74,7 @@ async def fantasy_home(request: Request, user: dict = Depends(get_current_user),
     fantasy_user = FantasyUser.load_from_firebase(user['user_id'], user.get('name', 'User'))
 
     # Get current week data
-    week_data = db.reference('Fantasy/current_week').get() or {}
+    week_data = current_week_replica.get() or {}
     current_week = week_data.get('Week', 1)
     current_season = week_data.get('Season', 6)
     deadline = week_data.get('Deadline', '')
@@ -105,7 +83,12 @@ async def fantasy_home(request: Request, user: dict = Depends(get_current_user),
     team_locked = is_team_locked()
 
     # Get user's matchweek history
-    user_history = db.reference(f'Fantasy/UserHistory/{user["user_id"]}').get() or {}
+    user_history = firebase_reads.read(f'Fantasy/UserHistory/{user["user_id"]}') or {}
+
+    # Provisional points from this week's submitted matches, until the week is processed
+    live_week_points = None
+    if f"S{current_season}_MW{current_week}" not in user_history:
+        live_week_points = live_points.user_points(current_season, current_week, user['user_id'])
 
     all_players = get_cached_players()
     teams = get_cached_teams()
@@ -119,6 +102,7 @@ async def fantasy_home(request: Request, user: dict = Depends(get_current_user),
         "deadline": deadline,
         "team_locked": team_locked,
         "user_history": user_history,
+        "live_week_points": live_week_points,
         "all_players": all_players,
         "teams": teams,
         "has_team": bool(fantasy_user.team.all_players),
@@ -151,7 +135,7 @@ async def fantasy_admin_points(request: Request, user: dict = Depends(get_curren
 
     season_matchweeks = {}
     try:
-        matchweeks_df = pd.read_csv('data/matchweeks.csv')
+        matchweeks_df = read_dataset('data/matchweeks.csv')
         matchweeks_df.columns = [col.strip() for col in matchweeks_df.columns]
         for _, row in matchweeks_df.iterrows():
             s = int(row['Season'])
@@ -164,7 +148,7 @@ async def fantasy_admin_points(request: Request, user: dict = Depends(get_curren
     except Exception:
         season_matchweeks = {}
 
-    week_data = db.reference('Fantasy/current_week').get() or {}
+    week_data = current_week_replica.get() or {}
     current_season = int(week_data.get('Season', 6))
     current_week = int(week_data.get('Week', 1))
 
@@ -746,7 +730,7 @@ async def league_leaderboard_api(
 def get_upcoming_matches():
     """Get upcoming matches that can be predicted"""
     try:
-        matches_df = pd.read_csv('data/S26_Schedule.csv')
+        matches_df = read_dataset('data/S26_Schedule.csv')
         matches_df.columns = [col.strip() for col in matches_df.columns]
 
         # Get matches that haven't been played yet (no score)
@@ -780,7 +764,7 @@ def get_upcoming_matches():
 def get_completed_matches_with_scores():
     """Get completed matches for processing predictions"""
     try:
-        matches_df = pd.read_csv('data/Match_Results.csv')
+        matches_df = read_dataset('data/Match_Results.csv')
         matches_df.columns = [col.strip() for col in matches_df.columns]
 
         # Get matches with scores (using Score Team 1 and Score Team 2 columns)
@@ -789,25 +773,20 @@ def get_completed_matches_with_scores():
             (matches_df['Score Team 2'].notna())
         ].copy()
 
-        matches = []
-        for _, row in completed.iterrows():
-            try:
-                home_score = int(row.get('Score Team 1', 0))
-                away_score = int(row.get('Score Team 2', 0))
-            except:
-                continue
-
-            # Use numeric Match ID to match predictions
-            match_id = str(row.get('Match ID', ''))
-
-            matches.append({
-                'match_id': match_id,
-                'home_team': row.get('Team 1', ''),
-                'away_team': row.get('Team 2', ''),
-                'home_score': home_score,
-                'away_score': away_score,
-                'date': row.get('Date', '')
-            })
+        # Scores that are not plain numbers (e.g. "1(3)") are skipped
+        completed['home_score'] = pd.to_numeric(completed['Score Team 1'], errors='coerce')
+        completed['away_score'] = pd.to_numeric(completed['Score Team 2'], errors='coerce')
+        completed = completed.dropna(subset=['home_score', 'away_score'])
+
+        # Use numeric Match ID to match predictions
+        matches = pd.DataFrame({
+            'match_id': completed['Match ID'].astype(str),
+            'home_team': completed['Team 1'],
+            'away_team': completed['Team 2'],
+            'home_score': completed['home_score'].astype(int),
+            'away_score': completed['away_score'].astype(int),
+            'date': completed['Date'] if 'Date' in completed.columns else '',
+        }).to_dict('records')
 
         return matches
     except Exception as e:
@@ -977,17 +956,12 @@ async def process_predictions(
         # Get completed matches
         completed_matches = get_completed_matches_with_scores()
 
-        processed_count = 0
-        for match in completed_matches:
-            # Get all unprocessed predictions for this match
-            predictions = MatchPrediction.get_match_predictions(match['match_id'])
-
-            for pred in predictions:
-                if not pred.is_processed:
-                    pred.process_result(match['home_score'], match['away_score'])
-                    processed_count += 1
+        # Score every unprocessed prediction in one batch write
+        results = MatchPrediction.process_completed_matches(completed_matches)
 
-        success_message = urllib.parse.quote(f"Processed {processed_count} predictions")
+        success_message = urllib.parse.quote(
+            f"Processed {results['processed_count']} predictions across {results['matches']} matches"
+        )
         return RedirectResponse(url=f"/fantasy/predictions?success={success_message}", status_code=303)
 
     except Exception as e:
@@ -1004,6 +978,26 @@ async def get_predictable_matches(user: dict = Depends(get_current_user)):
 
 # ============ Fantasy Points Admin Routes ============
 
+def run_process_matchweek(job, season: int, matchweek: int, admin_id: str) -> str:
+    """Background job: process matchweek points for every user with the shared calculator"""
+    calculator = get_points_calculator()
+    results = calculator.process_all_users_matchweek(season, matchweek, job=job)
+
+    # Log the action
+    log_user_action(
+        admin_id,
+        "Processed matchweek points",
+        f"Season {season} MW{matchweek}: {results['processed_count']} users, {results['total_points_awarded']} total points"
+    )
+
+    message = f"Processed MW{matchweek} for {results['processed_count']} users. Total points awarded: {results['total_points_awarded']}"
+    if results['already_processed']:
+        message += f" ({results['already_processed']} users were already processed and were skipped)"
+    if results['errors']:
+        message += f". {len(results['errors'])} users failed; run again to retry them"
+    return message
+
+
 @router.post("/fantasy/admin/process-matchweek")
 async def process_matchweek_points(
     request: Request,
@@ -1018,20 +1012,15 @@ async def process_matchweek_points(
         if not fantasy_user.admin:
             raise ValueError("Admin access required")
 
-        # Create calculator and process
-        calculator = FantasyPointsCalculator()
-        results = calculator.process_all_users_matchweek(season, matchweek)
-
-        # Log the action
-        log_user_action(
-            user['user_id'],
-            "Processed matchweek points",
-            f"Season {season} MW{matchweek}: {results['processed_count']} users, {results['total_points_awarded']} total points"
+        job = job_runner.submit(
+            'process_matchweek', run_process_matchweek, season, matchweek, user['user_id'],
+            description=f"Process fantasy points for Season {season} MW{matchweek}",
+            return_url="/fantasy"
         )
+        return RedirectResponse(url=f"/admin/jobs/{job.id}/view", status_code=303)
 
-        success_msg = f"Processed MW{matchweek} for {results['processed_count']} users. Total points awarded: {results['total_points_awarded']}"
-        return RedirectResponse(url=f"/fantasy?success={urllib.parse.quote(success_msg)}", status_code=303)
-
+    except JobConflict as e:
+        return RedirectResponse(url=f"/admin/jobs/{e.job.id}/view", status_code=303)
     except Exception as e:
         print(f"Error processing matchweek: {e}")
         error_msg = f"Error processing matchweek: {str(e)}"
@@ -1050,7 +1039,7 @@ async def reset_week_points(
         if not fantasy_user.admin:
             raise ValueError("Admin access required")
 
-        calculator = FantasyPointsCalculator()
+        calculator = get_points_calculator()
         reset_count = calculator.reset_all_week_points()
 
         log_user_action(user['user_id'], "Reset week points", f"Reset {reset_count} users")
@@ -1064,12 +1053,24 @@ async def reset_week_points(
         return RedirectResponse(url=f"/fantasy?error={urllib.parse.quote(error_msg)}", status_code=303)
 
 
+# Preview sort options: sort -> key function
+PREVIEW_SORTS = {
+    'points': lambda x: x['week_points'],
+    'username': lambda x: x['username'].lower(),
+}
+PREVIEW_PER_PAGE = 50
+
+
 @router.get("/fantasy/admin/preview-points", response_class=HTMLResponse)
 async def preview_matchweek_points(
     request: Request,
     user: dict = Depends(get_current_user),
     season: int = None,
-    matchweek: int = None
+    matchweek: int = None,
+    sort: str = 'points',
+    order: str = 'desc',
+    page: int = 1,
+    per_page: int = PREVIEW_PER_PAGE
 ):
     """Admin route to preview points calculation without saving"""
     try:
@@ -1078,41 +1079,32 @@ async def preview_matchweek_points(
         if not fantasy_user.admin:
             return RedirectResponse(url="/fantasy?error=Admin%20access%20required", status_code=303)
 
+        if sort not in PREVIEW_SORTS:
+            sort = 'points'
+        if order not in ('asc', 'desc'):
+            order = 'desc'
+        per_page = min(max(per_page, 1), 500)
+
         preview_results = []
+        distribution = points_distribution([])
+        total_pages = 1
 
         if season is not None and matchweek is not None:
-            calculator = FantasyPointsCalculator()
-
-            # Get all users and preview their points
-            from firebase_admin import db as firebase_db
-            users_ref = firebase_db.reference('Fantasy/Users')
-            all_users = users_ref.get() or {}
-
-            for user_id, user_data in all_users.items():
-                current_team = user_data.get('current_team', [])
-                if not current_team or len(current_team) != 5:
-                    continue
-
-                captain = user_data.get('captain')
-                breakdown = calculator.calculate_user_matchweek_points(
-                    current_team, captain, season, matchweek
-                )
-
-                preview_results.append({
-                    'username': user_data.get('username', 'Unknown'),
-                    'current_team': current_team,
-                    'captain': captain,
-                    'week_points': breakdown['total'],
-                    'breakdown': breakdown['players']
-                })
-
-            # Sort by week points
-            preview_results.sort(key=lambda x: x['week_points'], reverse=True)
+            # Score the matchweek once and apply each user's team snapshot (or current team) and captain
+            all_users = firebase_reads.read('Fantasy/Users') or {}
+            all_snapshots = firebase_reads.read('Fantasy/TeamSnapshots') or {}
+            preview_results = get_points_calculator().preview_all_users(season, matchweek, all_users, all_snapshots)
+            distribution = points_distribution([r['week_points'] for r in preview_results])
+
+            preview_results.sort(key=PREVIEW_SORTS[sort], reverse=(order == 'desc'))
+            total_pages = max((len(preview_results) + per_page - 1) // per_page, 1)
+            page = min(max(page, 1), total_pages)
+            preview_results = preview_results[(page - 1) * per_page:page * per_page]
 
         # Load matchweeks for dropdown — build season -> [mw, ...] mapping
         season_matchweeks = {}
         try:
-            matchweeks_df = pd.read_csv('data/matchweeks.csv')
+            matchweeks_df = read_dataset('data/matchweeks.csv')
             matchweeks_df.columns = [col.strip() for col in matchweeks_df.columns]
             for _, row in matchweeks_df.iterrows():
                 s = int(row['Season'])
@@ -1130,9 +1122,15 @@ async def preview_matchweek_points(
             "user": user,
             "fantasy_user": fantasy_user,
             "preview_results": preview_results,
+            "distribution": distribution,
             "season_matchweeks": season_matchweeks,
             "selected_season": season,
-            "selected_matchweek": matchweek
+            "selected_matchweek": matchweek,
+            "sort": sort,
+            "order": order,
+            "current_page": page,
+            "per_page": per_page,
+            "total_pages": total_pages
         }
 
         return templates.TemplateResponse(request=request, name="fantasy_admin_preview.html", context=context)
@@ -1151,25 +1149,14 @@ async def get_player_points_breakdown(
 ):
     """API endpoint to get detailed point breakdown for a player"""
     try:
-        calculator = FantasyPointsCalculator()
-        match_ids = calculator.get_match_ids_for_matchweek(season, matchweek)
-
-        breakdown = []
-        total_points = 0
-
-        for match_id in match_ids:
-            result = calculator.calculate_player_match_points(player_name, match_id)
-            if result['played']:
-                result['match_id'] = match_id
-                breakdown.append(result)
-                total_points += result['total']
+        player_points = get_points_calculator().matchweek_breakdown(season, matchweek).get(player_name)
 
         return {
             "player_name": player_name,
             "season": season,
             "matchweek": matchweek,
-            "total_points": total_points,
-            "matches": breakdown
+            "total_points": player_points['total'] if player_points else 0,
+            "matches": list(player_points['matches']) if player_points else []
         }
 
     except Exception as e:
@@ -1190,7 +1177,7 @@ async def fantasy_explore(
         fantasy_user = FantasyUser.load_from_firebase(user['user_id'], user.get('name', 'User'))
 
         # Get current week data for defaults
-        week_data = db.reference('Fantasy/current_week').get() or {}
+        week_data = current_week_replica.get() or {}
         current_season = week_data.get('Season', 6)
         current_week = week_data.get('Week', 1)
         
@@ -1199,8 +1186,16 @@ async def fantasy_explore(
         if matchweek is None:
             matchweek = current_week
 
-        # Read cached player points from Firebase
+        # Read cached player points from Firebase; a matchweek not processed
+        # yet shows its live provisional points, and matchweeks processed
+        # before that cache existed are scored from the CSVs instead
+        provisional = False
         player_points = FantasyPointsCalculator.get_cached_player_points(season, matchweek)
+        if not player_points:
+            player_points = live_points.player_points(season, matchweek)
+            provisional = bool(player_points)
+        if not player_points:
+            player_points = get_points_calculator().bulk_compute_all_player_points(season, matchweek)
         
         # Convert to sorted list for template
         players_list = []
@@ -1225,7 +1220,7 @@ async def fantasy_explore(
         
         # Load available matchweeks for the dropdown
         try:
-            matchweeks_df = pd.read_csv('data/matchweeks.csv')
+            matchweeks_df = read_dataset('data/matchweeks.csv')
             matchweeks_df.columns = [col.strip() for col in matchweeks_df.columns]
             
             season_matchweeks = {}
@@ -1248,6 +1243,7 @@ async def fantasy_explore(
             "selected_season": season,
             "selected_matchweek": matchweek,
             "season_matchweeks": season_matchweeks,
+            "provisional": provisional,
             "has_data": len(players_list) > 0
         }
         
@@ -5,42 +5,47 @@ import pandas as pd
 from fastapi import APIRouter
 import ast
 from datetime import datetime
+from data_store import read_dataset
 
 router = APIRouter()
 
 templates = Jinja2Templates(directory="templates")
-CURRENT_SEASON = max(pd.read_csv("data/season_standings.csv")['Season'].tolist())
+
+def get_current_season():
+    """Latest season in the standings (read on demand, never at import time)"""
+    return max(read_dataset("data/season_standings.csv", usecols=['Season'])['Season'].tolist())
 
 @router.get("/matches", response_class=HTMLResponse)
 async def read_matches(request: Request):
+    current_season = get_current_season()
     return templates.TemplateResponse(request=request, name="matches.html", context={"request": request, 
-                                                       "groups": get_table(CURRENT_SEASON),
-                                                       "matches_data": get_matches(CURRENT_SEASON),
+                                                       "groups": get_table(current_season),
+                                                       "matches_data": get_matches(current_season),
                                                        "upcoming_matches_data": get_upcoming_matches(),
-                                                       "active_season": CURRENT_SEASON,
-                                                       "current_season": CURRENT_SEASON})
+                                                       "active_season": current_season,
+                                                       "current_season": current_season})
 
 @router.get("/matches/{season}", response_class=HTMLResponse)
 async def read_matches(request: Request, season: int):
-    if season <= CURRENT_SEASON and season > 0:
+    current_season = get_current_season()
+    if season <= current_season and season > 0:
         return templates.TemplateResponse(request=request, name="matches.html", context={"request": request, 
                                                         "groups": get_table(season),
                                                         "matches_data": get_matches(season),
                                                         "upcoming_matches_data": get_upcoming_matches(),
                                                         "active_season": season,
-                                                        "current_season": CURRENT_SEASON})
+                                                        "current_season": current_season})
     else:
         return templates.TemplateResponse(request=request, name="matches.html", context={"request": request, 
-                                                        "groups": get_table(CURRENT_SEASON),
-                                                        "matches_data": get_matches(CURRENT_SEASON),
+                                                        "groups": get_table(current_season),
+                                                        "matches_data": get_matches(current_season),
                                                         "upcoming_matches_data": get_upcoming_matches(),
-                                                        "active_season": CURRENT_SEASON,
-                                                        "current_season": CURRENT_SEASON})
+                                                        "active_season": current_season,
+                                                        "current_season": current_season})
 
 def get_table(season):
-    with open("data/season_standings.csv") as file:
-        data = pd.read_csv(file)
-        data['L5'] = data['L5'].apply(lambda x: ast.literal_eval(x))
+    data = read_dataset("data/season_standings.csv")
+    data['L5'] = data['L5'].apply(lambda x: ast.literal_eval(x))
     data = data[data['Season'] == season]
     groupA = data[data["Group"] == 'A'].to_dict(orient='records')
     groupB = data[data["Group"] == 'B'].to_dict(orient='records')
@@ -49,8 +54,7 @@ def get_table(season):
     return [groupA, groupB, groupC] if len(groupC) > 0 else [groupA, groupB]
 
 def get_matches(season):
-    with open("data/Match_Results.csv") as file:
-        data = pd.read_csv(file)
+    data = read_dataset("data/Match_Results.csv")
     data = data[data['Season'] == season]
     subsets = ['Playoff', 'A', 'B', 'C']
     match_data = {}
@@ -63,8 +67,7 @@ def get_matches(season):
 
 def get_upcoming_matches():
     match_dict = {}
-    with open("data/S26_Schedule.csv") as file:
-        data = pd.read_csv(file)[['MD', 'Team 1', 'Team 2', 'Day', 'Time']]
+    data = read_dataset("data/S26_Schedule.csv")[['MD', 'Team 1', 'Team 2', 'Day', 'Time']]
 
     for k, gb in data.groupby(by='MD'):
         match_dict[k] = gb.to_dict(orient='records')
@@ -80,8 +83,7 @@ def get_upcoming_matches():
 async def rss_feed():
     """Generate RSS feed for latest match results"""
     try:
-        with open("data/Match_Results.csv") as file:
-            data = pd.read_csv(file)
+        data = read_dataset("data/Match_Results.csv")
 
         # Get latest season's matches, sorted by Match ID (most recent first)
         latest_season = data['Season'].max()
@@ -163,20 +165,21 @@ async def get_match_preview(team1: str, team2: str, matchday: int = None, time:
     """Get comprehensive match preview data for two teams"""
 
     # Load necessary data
-    match_results_df = pd.read_csv("data/Match_Results.csv")
-    standings_df = pd.read_csv("data/season_standings.csv")
-    player_stats_df = pd.read_csv("data/season_player_stats.csv")
-    team_ratings_df = pd.read_csv("data/team_ratings.csv")
+    match_results_df = read_dataset("data/Match_Results.csv")
+    standings_df = read_dataset("data/season_standings.csv")
+    player_stats_df = read_dataset("data/season_player_stats.csv")
+    team_ratings_df = read_dataset("data/team_ratings.csv")
+    current_season = get_current_season()
 
     # Convert L5 string to list for standings
     standings_df['L5'] = standings_df['L5'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
     
     # Get current season data
-    current_standings = standings_df[standings_df["Season"] == CURRENT_SEASON]
+    current_standings = standings_df[standings_df["Season"] == current_season]
     group = current_standings.loc[current_standings["Team"] == team1, "Group"].iat[0]
     current_standings = current_standings[current_standings["Group"] == group].reset_index(drop=True)
 
-    current_player_stats = player_stats_df[player_stats_df['Season'] == str(CURRENT_SEASON)]
+    current_player_stats = player_stats_df[player_stats_df['Season'] == str(current_season)]
 
     # Essential Information
     team1_rating = team_ratings_df[team_ratings_df['Name'] == team1]['Rating'].values
@@ -283,12 +286,12 @@ async def get_match_preview(team1: str, team2: str, matchday: int = None, time:
 
     # Statistical Comparison
     team1_season_matches = match_results_df[
-        (match_results_df['Season'] == CURRENT_SEASON) &
+        (match_results_df['Season'] == current_season) &
         ((match_results_df['Team 1'] == team1) | (match_results_df['Team 2'] == team1))
     ]
 
     team2_season_matches = match_results_df[
-        (match_results_df['Season'] == CURRENT_SEASON) &
+        (match_results_df['Season'] == current_season) &
         ((match_results_df['Team 1'] == team2) | (match_results_df['Team 2'] == team2))
     ]
 
@@ -337,13 +340,13 @@ async def get_match_preview(team1: str, team2: str, matchday: int = None, time:
 
     # Get POTM awards count
     team1_potm = current_player_stats[
-        (current_player_stats['Season'] == str(CURRENT_SEASON)) &
+        (current_player_stats['Season'] == str(current_season)) &
         (current_player_stats['POTM'] != 0) &
         (current_player_stats['Team'] == team1)
     ]['POTM'].sum()
 
     team2_potm = current_player_stats[
-        (current_player_stats['Season'] == str(CURRENT_SEASON)) &
+        (current_player_stats['Season'] == str(current_season)) &
         (current_player_stats['POTM'] != 0) &
         (current_player_stats['Team'] == team2)
     ]['POTM'].sum()
@@ -369,7 +372,7 @@ async def get_match_preview(team1: str, team2: str, matchday: int = None, time:
 
         # Recent POTM winners
         recent_potm = team_players[
-            (team_players['Season'] == str(CURRENT_SEASON)) &
+            (team_players['Season'] == str(current_season)) &
             (team_players['POTM'] != 0)
         ].tail(3)[['Name']].to_dict(orient='records')
 
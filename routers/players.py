@@ -4,7 +4,10 @@ from fastapi.responses import JSONResponse
 from firebase_admin import db as firebase_db
 from starlette.responses import HTMLResponse
 import pandas as pd
+import numpy as np
 from functions import get_k_recent_potm, get_player_potm
+from caching import DataCache
+from data_store import read_dataset, load_table, load_career_table
 import time
 from collections import defaultdict
 
@@ -12,59 +15,31 @@ router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Data caching system
-class DataCache:
-    def __init__(self, ttl=300):  # 5 minutes TTL by default
-        self.cache = {}
-        self.timestamps = {}
-        self.ttl = ttl
-
-    def get(self, key, loader_func):
-        """Get data from cache or load it using loader_func"""
-        current_time = time.time()
-
-        # Check if cached and not expired
-        if key in self.cache and key in self.timestamps:
-            if current_time - self.timestamps[key] < self.ttl:
-                return self.cache[key]
-
-        # Load fresh data
-        data = loader_func()
-        self.cache[key] = data
-        self.timestamps[key] = current_time
-        return data
-
-    def invalidate(self, key=None):
-        """Invalidate cache for a specific key or all keys"""
-        if key:
-            self.cache.pop(key, None)
-            self.timestamps.pop(key, None)
-        else:
-            self.cache.clear()
-            self.timestamps.clear()
-
-# Initialize cache
-data_cache = DataCache(ttl=6000)
+data_cache = DataCache('players', ttl=6000)
 
 # Cache loader functions
 def load_player_ratings():
-    return pd.read_csv('data/player_ratings.csv')
+    return read_dataset('data/player_ratings.csv')
 
 def load_season_player_stats():
-    return pd.read_csv('data/season_player_stats.csv')
+    return load_table('season_player_stats')
+
+def load_career_stats():
+    return load_career_table()
 
 def load_player_match_stats():
-    return pd.read_csv('data/player_match_stats.csv')
+    return load_table('player_match_stats')
 
 def load_match_results():
-    return pd.read_csv('data/Match_Results.csv')
+    return load_table('Match_Results')
 
 def load_ifl_awards():
-    return pd.read_csv('data/IFL_Awards.csv', encoding='utf-8-sig')
+    return read_dataset('data/IFL_Awards.csv')
 
-# Get current season, filtering out 'Total' and non-numeric values
-season_data = data_cache.get('season_player_stats', load_season_player_stats)
-valid_seasons = [s for s in season_data['Season'].unique() if s != 'Total' and str(s).replace('.', '').isdigit()]
-CURRENT_SEASON = max(valid_seasons) if valid_seasons else 1
+def get_current_season():
+    """Latest season in the player stats"""
+    season_data = data_cache.get('season_player_stats', load_season_player_stats)
+    return int(season_data['Season'].max()) if not season_data.empty else 1
 
 # Pagination settings
 PLAYERS_PER_PAGE = 8
@@ -77,7 +52,7 @@ API_WINDOW = 60  # 60 seconds
 @router.get("/players", response_class=HTMLResponse)
 async def read_players(request: Request, session: int = None, page: int = 1, position_filter: str = None, sort_by: str = None, session_token: str = Cookie(None), db: firebase_db.Reference = Depends(lambda: firebase_db.reference('/'))):
     # Get selected season (default to current)
-    selected_season = session if session else CURRENT_SEASON
+    selected_season = session if session else get_current_season()
 
     # Get all players with stats for the selected season with filters/sorting
     pagination_result = get_all_players_with_stats(
@@ -106,7 +81,7 @@ async def read_players(request: Request, session: int = None, page: int = 1, pos
                                                        'potm_images': potm_images,
                                                        "count": total_count,
                                                        "league_leaders": league_leaders,
-                                                       "current_season": CURRENT_SEASON,
+                                                       "current_season": get_current_season(),
                                                        "selected_season": selected_season,
                                                        "all_seasons": all_seasons,
                                                        "current_page": current_page,
@@ -231,19 +206,19 @@ async def get_player_data(player: str, request: Request, db: firebase_db.Referen
 @router.get("/player_search", response_class=HTMLResponse)
 async def search_players(request: Request, query: str, session: int = None, page: int = 1, position_filter: str = None, sort_by: str = None, db: firebase_db.Reference = Depends(lambda: firebase_db.reference('/'))):
     # Get selected season (default to current)
-    selected_season = session if session else CURRENT_SEASON
-
-    # Get all players with stats for searching (no pagination here since we need to filter first)
-    all_players_result = get_all_players_with_stats(selected_season, page=None, position_filter=position_filter, sort_by=sort_by)
-    all_players = all_players_result['players']
-    filtered_players = [player for player in all_players if query.lower() in player['Name'].lower()]
-
-    # Apply pagination to filtered results
-    total_count = len(filtered_players)
-    total_pages = (total_count + PLAYERS_PER_PAGE - 1) // PLAYERS_PER_PAGE if total_count > 0 else 1
-    start_idx = (page - 1) * PLAYERS_PER_PAGE
-    end_idx = start_idx + PLAYERS_PER_PAGE
-    paginated_players = filtered_players[start_idx:end_idx]
+    selected_season = session if session else get_current_season()
+
+    # Search, filter, sort and paginate on the cached season listing
+    pagination_result = get_all_players_with_stats(
+        selected_season,
+        page=page,
+        position_filter=position_filter,
+        sort_by=sort_by,
+        query=query
+    )
+    paginated_players = pagination_result['players']
+    total_count = pagination_result['total_count']
+    total_pages = pagination_result['total_pages']
     current_page = page
 
     # Get available seasons
@@ -260,7 +235,7 @@ async def search_players(request: Request, query: str, session: int = None, page
                                                        'potm_images': potm_images,
                                                        "count": total_count,
                                                        "league_leaders": league_leaders,
-                                                       "current_season": CURRENT_SEASON,
+                                                       "current_season": get_current_season(),
                                                        "selected_season": selected_season,
                                                        "all_seasons": all_seasons,
                                                        "current_page": current_page,
@@ -311,8 +286,8 @@ def get_previous_matches(player, season=False):
 
 def get_career_totals(player):
     """Calculate career totals for a player"""
-    season_data = data_cache.get('season_player_stats', load_season_player_stats)
-    player_data = season_data[(season_data['Name'] == player) & (season_data['Season'] == "Total")]
+    career_data = data_cache.get('career_stats', load_career_stats)
+    player_data = career_data[career_data['Name'] == player]
     match_data = data_cache.get('player_match_stats', load_player_match_stats)
     player_matches = match_data[match_data['Name'] == player]
 
@@ -324,15 +299,8 @@ def get_career_totals(player):
     total_saves = int(player_data['Saves'].sum())
     total_potm = int(player_data['POTM'].sum())
     total_matches = int(player_data['MP'].sum())
-
-    # Parse Y-R cards (format: "Y-R")
-    total_yellows = 0
-    total_reds = 0
-    for yr in player_data['Y-R'].dropna():
-        if '-' in str(yr):
-            parts = str(yr).split('-')
-            total_yellows += int(parts[0]) if parts[0].isdigit() else 0
-            total_reds += int(parts[1]) if parts[1].isdigit() else 0
+    total_yellows = int(player_data['Yellow'].sum())
+    total_reds = int(player_data['Red'].sum())
 
     # Calculate win/loss/draw record from match data
     wins = 0
@@ -491,7 +459,7 @@ def get_league_rankings(player):
     season_data = data_cache.get('season_player_stats', load_season_player_stats)
 
     # Calculate career totals for all players
-    all_players_totals = season_data.groupby('Name').agg({
+    all_players_totals = season_data.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
@@ -539,7 +507,7 @@ def get_team_contribution(player):
     contributions = []
 
     # Group by team and season
-    for (team, season), group in player_data.groupby(['Team', 'Season']):
+    for (team, season), group in player_data.groupby(['Team', 'Season'], observed=True):
         if team == 0:  # Skip invalid teams
             continue
 
@@ -564,9 +532,7 @@ def get_team_contribution(player):
             'team_assists': int(team_total_assists),
             'assist_percentage': assist_contribution
         })
-        contributions.sort(
-            key=lambda x: (x['season'] == 'Total', int(x['season']) if str(x['season']).isdigit() else float('inf'))
-        )
+        contributions.sort(key=lambda x: x['season'])
 
     return contributions
 
@@ -581,14 +547,13 @@ def get_teammates(player):
     # Get all teams the player has played for
     player_teams = player_data[['Team', 'Season']].drop_duplicates()
 
+    current_season = get_current_season()
     current_teammates = []
     all_teammates = set()
 
     for _, row in player_teams.iterrows():
         team = row['Team']
         season = row['Season']
-        if season == "Total":
-            continue
         if team == 0:  # Skip invalid teams
             continue
 
@@ -599,7 +564,7 @@ def get_teammates(player):
         for teammate in teammates_data['Name'].unique():
             all_teammates.add(teammate)
 
-            if season == CURRENT_SEASON and team == player_data[player_data['Season'] == CURRENT_SEASON]['Team'].values[0]:
+            if season == current_season and team == player_data[player_data['Season'] == current_season]['Team'].values[0]:
                 current_teammates.append({
                     'name': teammate,
                     'team': team
@@ -681,7 +646,7 @@ def get_previous_teams(player):
         return None
 
     teams = []
-    for (team, seasons_group) in player_data.groupby('Team'):
+    for (team, seasons_group) in player_data.groupby('Team', observed=True):
         if team == 0:  # Skip invalid teams
             continue
 
@@ -702,92 +667,97 @@ def get_previous_teams(player):
 def get_all_seasons():
     """Get list of all seasons"""
     season_data = data_cache.get('season_player_stats', load_season_player_stats)
-    seasons = sorted(season_data['Season'].unique().tolist(), reverse=True)
-    if 'Total' in seasons:
-        seasons.remove('Total')
-    return seasons
-
-def get_all_players_with_stats(season=None, page=None, position_filter=None, sort_by=None):
-    """Get all players with their season stats and ratings (with optional pagination, filtering, and sorting)"""
-    if season is None:
-        season = CURRENT_SEASON
-
-    # Get player ratings from cache
-    players_df = data_cache.get('player_ratings', load_player_ratings).copy()
-
-    # Get season stats from cache
-    season_data = data_cache.get('season_player_stats', load_season_player_stats).copy()
-    season_data['Season'] = season_data['Season'].astype(str)
-
-    season_df = season_data[season_data['Season'] == str(season)].copy()
+    return sorted(season_data['Season'].unique().tolist(), reverse=True)
+
+# Listing sort options: sort_by -> (column, ascending)
+PLAYER_SORTS = {
+    'name': ('Name', True),
+    'rating': ('OVR Rating', False),
+    'goals': ('Goals', False),
+    'assists': ('Assists', False),
+    'saves': ('Saves', False),
+    'potm': ('POTM', False),
+}
+
+# Per-season player listings, rebuilt whenever the data version changes
+listing_cache = DataCache('player_listings', ttl=6000)
+
+def build_season_listing(season):
+    """
+    Merged ratings + season stats table for one season, with every sort order
+    precomputed as an array of row positions. The filter/search columns are
+    fixed-width string arrays so they stay free of per-row Python objects.
+    """
+    players_df = data_cache.get('player_ratings', load_player_ratings)
+    season_data = data_cache.get('season_player_stats', load_season_player_stats)
+    season_df = season_data[season_data['Season'] == int(season)]
 
-    # Merge players with their season stats
+    # Only show players that played in this season
     players_with_stats = players_df.merge(
         season_df[['Name', 'Team', 'MP', 'Goals', 'Assists', 'Saves', 'Y-R']],
         on='Name',
-        how='inner'  # Only show players that played in this season
+        how='inner'
     )
 
-    # Apply position filter if specified
-    if position_filter and position_filter != 'all':
-        players_with_stats = players_with_stats[players_with_stats['Primary Position'] == position_filter]
-
-    # Get most recent POTM image for each player in this season from cache
+    # Most recent POTM match per player this season, in a single groupby
     match_stats = data_cache.get('player_match_stats', load_player_match_stats)
-    potm_data = match_stats[(match_stats['Season'] == int(season)) & (match_stats['POTM'] != 0)].copy()
-    # For each player, get their most recent POTM match ID
-
-    player_potm_images = {}
-    for player_name in players_with_stats['Name'].unique():
-        player_potms = potm_data[potm_data['Name'] == player_name]
-        if not player_potms.empty:
-            # Get the most recent (highest) match ID
-            most_recent_potm = player_potms.nlargest(1, 'Match ID')
-            player_potm_images[player_name] = int(most_recent_potm['Match ID'].values[0])
-        else:
-            player_potm_images[player_name] = "ford"
-
-    # Add POTM image to dataframe
-    players_with_stats['POTM_Image'] = players_with_stats['Name'].map(player_potm_images)
-
-    # Apply sorting if specified
+    potm_data = match_stats[(match_stats['Season'] == int(season)) & (match_stats['POTM'] != 0)]
+    latest_potm = potm_data.groupby('Name', observed=True)['Match ID'].max().astype(int).to_dict()
+    players_with_stats['POTM_Image'] = [latest_potm.get(name, "ford") for name in players_with_stats['Name']]
+
+    orders = {None: np.arange(len(players_with_stats))}
+    for sort_by, (column, ascending) in PLAYER_SORTS.items():
+        orders[sort_by] = players_with_stats[column].sort_values(ascending=ascending, kind='stable').index.to_numpy()
+
+    return {
+        'records': players_with_stats.to_dict(orient='records'),
+        'positions': players_with_stats['Primary Position'].to_numpy(dtype=str),
+        'names': np.char.lower(players_with_stats['Name'].to_numpy(dtype=str)),
+        'orders': orders,
+    }
+
+def get_season_listing(season):
+    """Cached listing for a season, valid for the current data version"""
+    return listing_cache.get(str(season), lambda: build_season_listing(season))
+
+def get_all_players_with_stats(season=None, page=None, position_filter=None, sort_by=None, query=None):
+    """Get all players with their season stats and ratings (with optional pagination, filtering, search and sorting)"""
+    if season is None:
+        season = get_current_season()
+
+    listing = get_season_listing(season)
+
+    # Unknown sort keys keep the merge order; no sort key means rating
     if sort_by:
-        if sort_by == 'name':
-            players_with_stats = players_with_stats.sort_values('Name', ascending=True)
-        elif sort_by == 'rating':
-            players_with_stats = players_with_stats.sort_values('OVR Rating', ascending=False)
-        elif sort_by == 'goals':
-            players_with_stats = players_with_stats.sort_values('Goals', ascending=False)
-        elif sort_by == 'assists':
-            players_with_stats = players_with_stats.sort_values('Assists', ascending=False)
-        elif sort_by == 'saves':
-            players_with_stats = players_with_stats.sort_values('Saves', ascending=False)
-        elif sort_by == 'potm':
-            players_with_stats = players_with_stats.sort_values('POTM', ascending=False)
+        order = listing['orders'].get(sort_by, listing['orders'][None])
     else:
-        # Default sort by rating
-        players_with_stats = players_with_stats.sort_values('OVR Rating', ascending=False)
+        order = listing['orders']['rating']
+
+    mask = np.ones(len(listing['records']), dtype=bool)
+    if position_filter and position_filter != 'all':
+        mask &= listing['positions'] == position_filter
+    if query:
+        mask &= np.char.find(listing['names'], query.lower()) >= 0
+    selected = order[mask[order]]
 
-    # Convert to list of dicts
-    all_players = players_with_stats.to_dict(orient='records')
-    total_count = len(all_players)
+    total_count = len(selected)
+    records = listing['records']
 
     # Apply pagination if page is specified
     if page is not None:
         total_pages = (total_count + PLAYERS_PER_PAGE - 1) // PLAYERS_PER_PAGE if total_count > 0 else 1
         start_idx = (page - 1) * PLAYERS_PER_PAGE
         end_idx = start_idx + PLAYERS_PER_PAGE
-        paginated_players = all_players[start_idx:end_idx]
 
         return {
-            'players': paginated_players,
+            'players': [records[i] for i in selected[start_idx:end_idx]],
             'total_count': total_count,
             'total_pages': total_pages
         }
     else:
         # No pagination - return all players
         return {
-            'players': all_players,
+            'players': [records[i] for i in selected],
             'total_count': total_count,
             'total_pages': 1
         }
@@ -795,17 +765,12 @@ def get_all_players_with_stats(season=None, page=None, position_filter=None, sor
 def get_league_leaders(season=None):
     """Get league-wide leaders in various categories"""
     if season is None:
-        season = CURRENT_SEASON
-
-    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats).copy()
-    player_stats_df = player_stats_df[player_stats_df["Season"] != "Total"]
+        season = get_current_season()
 
-    # Parse Y-R cards
-    player_stats_df['Yellow'] = player_stats_df['Y-R'].apply(lambda x: int(str(x).split('-')[0]) if pd.notna(x) and str(x) != 'nan' else 0)
-    player_stats_df['Red'] = player_stats_df['Y-R'].apply(lambda x: int(str(x).split('-')[1]) if pd.notna(x) and '-' in str(x) else 0)
+    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats)
 
     # Group by player across all teams and seasons
-    all_time_stats = player_stats_df.groupby('Name').agg({
+    all_time_stats = player_stats_df.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
@@ -817,8 +782,8 @@ def get_league_leaders(season=None):
     }).reset_index()
 
     # Get selected season stats
-    season_stats_df = player_stats_df[player_stats_df['Season'] == season].copy()
-    season_agg = season_stats_df.groupby('Name').agg({
+    season_stats_df = player_stats_df[player_stats_df['Season'] == int(season)]
+    season_agg = season_stats_df.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
@@ -1,47 +1,33 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 import pandas as pd
+from caching import DataCache
+from data_store import read_dataset, load_career_table
 from typing import Optional
 
 router = APIRouter()
 
-# Cache for search data
-_search_cache = {
-    'players': None,
-    'teams': None,
-    'last_update': None
-}
+# Cache for search data (refreshed every 5 minutes)
+search_cache = DataCache('search', ttl=300)
 
-def load_search_data():
-    """Load and cache data for searching"""
-    import time
-    current_time = time.time()
+def build_search_data():
+    """Players (with their teams) and teams to search over"""
+    # Players with their latest team, from the career table
+    players_total = load_career_table()[['Name', 'Team']].drop_duplicates()
+
+    # Load teams
+    standings_df = read_dataset('data/season_standings.csv')
+    teams = standings_df['Team'].unique().tolist()
 
-    # Refresh cache every 5 minutes
-    if _search_cache['last_update'] and (current_time - _search_cache['last_update']) < 300:
-        return _search_cache
+    return {'players': players_total.to_dict('records'), 'teams': teams}
 
+def load_search_data():
+    """Load and cache data for searching"""
     try:
-        # Load players
-        players_df = pd.read_csv('data/season_player_stats.csv', encoding='utf-8-sig')
-        # Get unique players with their teams (from Total row)
-        players_total = players_df[players_df['Season'] == 'Total'][['Name', 'Team']].drop_duplicates()
-        _search_cache['players'] = players_total.to_dict('records')
-
-        # Load teams
-        standings_df = pd.read_csv('data/season_standings.csv', encoding='utf-8-sig')
-        teams = standings_df['Team'].unique().tolist()
-        _search_cache['teams'] = teams
-
-        _search_cache['last_update'] = current_time
+        return search_cache.get('search_data', build_search_data)
     except Exception as e:
         print(f"Error loading search data: {e}")
-        if _search_cache['players'] is None:
-            _search_cache['players'] = []
-        if _search_cache['teams'] is None:
-            _search_cache['teams'] = []
-
-    return _search_cache
+        return {'players': [], 'teams': []}
 
 
 @router.get("/api/search")
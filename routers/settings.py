@@ -9,6 +9,7 @@ import pandas as pd
 from datetime import datetime
 from firebase_admin import db, auth
 from functions import send_email
+from data_store import read_dataset
 from models.fantasy import FantasyUser
 
 router = APIRouter()
@@ -20,7 +21,7 @@ user = None
 def get_all_players_list():
     """Get list of all player names for the dropdown"""
     try:
-        players_df = pd.read_csv('data/player_ratings.csv')
+        players_df = read_dataset('data/player_ratings.csv')
         return sorted(players_df['Name'].unique().tolist())
     except Exception:
         return []
@@ -3,10 +3,12 @@ from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse
 from auth_utils import get_current_user
 import pandas as pd
-import time
-from numpy import linspace
 import os
 from datetime import datetime
+from caching import DataCache
+from data_store import read_dataset, load_table, load_career_table
+from season_aggregates import get_season_aggregates, parse_score, EMPTY_LEADERS
+from archive_snapshots import get_archive_snapshot, get_hall_of_fame_snapshot
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
@@ -14,52 +16,57 @@ templates = Jinja2Templates(directory="templates")
 # DEVELOPMENT TOGGLE
 IS_DEV = os.getenv("DEV", False) == "true"
 
-# Data caching system
-class DataCache:
-    def __init__(self, ttl=300):
-        self.cache = {}
-        self.timestamps = {}
-        self.ttl = ttl
-
-    def get(self, key, loader_func):
-        """Get data from cache or load it using loader_func"""
-        current_time = time.time()
-
-        if key in self.cache and key in self.timestamps:
-            if current_time - self.timestamps[key] < self.ttl:
-                return self.cache[key]
-
-        data = loader_func()
-        self.cache[key] = data
-        self.timestamps[key] = current_time
-        return data
-
-# Initialize cache (100 minutes TTL)
-data_cache = DataCache(ttl=6000)
+# Data caching system (100 minutes TTL)
+data_cache = DataCache('statistics', ttl=6000)
 
 # Cache loader functions
 def load_player_stats():
-    return pd.read_csv('data/season_player_stats.csv', encoding='utf-8-sig')
+    return load_table('season_player_stats')
+
+def load_career_stats():
+    return load_career_table()
 
 def load_team_standings():
-    return pd.read_csv('data/season_standings.csv', encoding='utf-8-sig')
+    return read_dataset('data/season_standings.csv')
 
 def load_match_results():
-    return pd.read_csv('data/Match_Results.csv', encoding='utf-8-sig')
+    return load_table('Match_Results')
 
 def load_player_ratings():
-    return pd.read_csv('data/player_ratings.csv', encoding='utf-8-sig')
+    return read_dataset('data/player_ratings.csv')
 
 def load_team_ratings():
-    return pd.read_csv('data/team_ratings.csv', encoding='utf-8-sig')
+    return read_dataset('data/team_ratings.csv')
 
 def load_awards():
-    return pd.read_csv('data/IFL_Awards.csv', encoding='utf-8-sig')
+    return read_dataset('data/IFL_Awards.csv')
 
 def load_potm():
-    df = pd.read_csv('data/player_match_stats.csv', encoding='utf-8-sig')
+    df = load_table('player_match_stats')
     return df[df['POTM'] == 1]
 
+def load_statistics_frames():
+    """Frames the season aggregates are built from"""
+    return {
+        'player_stats': data_cache.get('player_stats', load_player_stats),
+        'team_standings': data_cache.get('team_standings', load_team_standings),
+        'team_ratings': data_cache.get('team_ratings', load_team_ratings),
+        'player_ratings': data_cache.get('player_ratings', load_player_ratings),
+        'match_results': data_cache.get('match_results', load_match_results),
+    }
+
+def get_statistics_aggregates():
+    """Per-season dashboard aggregates for the current data version"""
+    return get_season_aggregates(load_statistics_frames)
+
+def get_available_seasons():
+    """Seasons present in the data, oldest first"""
+    try:
+        return get_statistics_aggregates()['seasons']
+    except Exception as e:
+        print(f"Error in get_available_seasons: {e}")
+        return []
+
 
 
 
@@ -68,29 +75,7 @@ def load_potm():
 def get_all_time_leaders():
     """Get top 10 all-time leaders in goals, assists, saves, and POTM"""
     try:
-        stats_df = data_cache.get('player_stats', load_player_stats)
-
-        # Filter for career totals
-        career_df = stats_df[stats_df['Season'] == 'Total'].copy()
-
-        # Convert to numeric
-        career_df['Goals'] = pd.to_numeric(career_df['Goals'], errors='coerce').fillna(0)
-        career_df['Assists'] = pd.to_numeric(career_df['Assists'], errors='coerce').fillna(0)
-        career_df['Saves'] = pd.to_numeric(career_df['Saves'], errors='coerce').fillna(0)
-        career_df['POTM'] = pd.to_numeric(career_df['POTM'], errors='coerce').fillna(0)
-
-        # Get top 10 for each category
-        top_goals = career_df.nlargest(10, 'Goals')[['Name', 'Goals', 'Team']].to_dict('records')
-        top_assists = career_df.nlargest(10, 'Assists')[['Name', 'Assists', 'Team']].to_dict('records')
-        top_saves = career_df.nlargest(10, 'Saves')[['Name', 'Saves', 'Team']].to_dict('records')
-        top_potm = career_df.nlargest(10, 'POTM')[['Name', 'POTM', 'Team']].to_dict('records')
-
-        return {
-            'goals': top_goals,
-            'assists': top_assists,
-            'saves': top_saves,
-            'potm': top_potm
-        }
+        return get_statistics_aggregates()['all_time_leaders']
     except Exception as e:
         print(f"Error in get_all_time_leaders: {e}")
         return {'goals': [], 'assists': [], 'saves': [], 'potm': []}
@@ -98,29 +83,7 @@ def get_all_time_leaders():
 def get_current_season_leaders(season='6'):
     """Get top 10 current season leaders"""
     try:
-        stats_df = data_cache.get('player_stats', load_player_stats)
-
-        # Filter by season
-        season_df = stats_df[stats_df['Season'] == str(season)].copy()
-
-        # Convert to numeric
-        season_df['Goals'] = pd.to_numeric(season_df['Goals'], errors='coerce').fillna(0)
-        season_df['Assists'] = pd.to_numeric(season_df['Assists'], errors='coerce').fillna(0)
-        season_df['Saves'] = pd.to_numeric(season_df['Saves'], errors='coerce').fillna(0)
-        season_df['POTM'] = pd.to_numeric(season_df['POTM'], errors='coerce').fillna(0)
-
-        # Get top 10 for each category
-        top_goals = season_df.nlargest(10, 'Goals')[['Name', 'Goals', 'Team']].to_dict('records')
-        top_assists = season_df.nlargest(10, 'Assists')[['Name', 'Assists', 'Team']].to_dict('records')
-        top_saves = season_df.nlargest(10, 'Saves')[['Name', 'Saves', 'Team']].to_dict('records')
-        top_potm = season_df.nlargest(10, 'POTM')[['Name', 'POTM', 'Team']].to_dict('records')
-
-        return {
-            'goals': top_goals,
-            'assists': top_assists,
-            'saves': top_saves,
-            'potm': top_potm
-        }
+        return get_statistics_aggregates()['season_leaders'].get(str(season), EMPTY_LEADERS)
     except Exception as e:
         print(f"Error in get_current_season_leaders: {e}")
         return {'goals': [], 'assists': [], 'saves': [], 'potm': []}
@@ -128,31 +91,7 @@ def get_current_season_leaders(season='6'):
 def get_team_performance_comparison(season='6'):
     """Compare all teams: win%, goals/game, defense, ratings"""
     try:
-        standings_df = data_cache.get('team_standings', load_team_standings)
-        ratings_df = data_cache.get('team_ratings', load_team_ratings)
-
-        # Filter by season
-        season_standings = standings_df[standings_df['Season'] == int(season)].copy()
-
-        if season_standings.empty:
-            return []
-
-        # Calculate metrics
-        season_standings['Win_Pct'] = (season_standings['W'] / season_standings['MP'] * 100).round(1)
-        season_standings['Avg_GF'] = (season_standings['GF'] / season_standings['MP']).round(2)
-        season_standings['Avg_GA'] = (season_standings['GA'] / season_standings['MP']).round(2)
-
-        # Merge with ratings
-        result = season_standings.merge(ratings_df, left_on='Team', right_on='Name', how='left')
-
-        # Select and rename columns
-        result = result[['Team', 'Win_Pct', 'Avg_GF', 'Avg_GA', 'Rating', 'W', 'D', 'L', 'PTS']].copy()
-        result = result.fillna({'Rating': 0})
-
-        # Sort by points descending
-        result = result.sort_values('PTS', ascending=False)
-
-        return result.to_dict('records')
+        return get_statistics_aggregates()['team_comparison'].get(int(season), [])
     except Exception as e:
         print(f"Error in get_team_performance_comparison: {e}")
         return []
@@ -161,39 +100,7 @@ def get_team_performance_comparison(season='6'):
 def get_rating_distribution():
     """Player/team rating histograms"""
     try:
-        player_ratings_df = data_cache.get('player_ratings', load_player_ratings)
-        team_ratings_df = data_cache.get('team_ratings', load_team_ratings)
-
-        # Define buckets
-        player_buckets = [_ for _ in range(50, 101, 5)]
-        player_labels = [f'{i}-{i+5}' for i in player_buckets[:-1]]
-
-        # Player rating distribution
-        player_ratings_df['OVR Rating'] = pd.to_numeric(player_ratings_df['OVR Rating'], errors='coerce')
-        player_ratings_df = player_ratings_df.dropna(subset=['OVR Rating'])
-        player_dist = pd.cut(player_ratings_df['OVR Rating'], bins=player_buckets, labels=player_labels, right=False)
-        player_counts = player_dist.value_counts().sort_index()
-
-        # Team rating distribution
-        team_ratings_df['Rating'] = pd.to_numeric(team_ratings_df['Rating'], errors='coerce')
-        team_ratings_df = team_ratings_df.dropna(subset=['Rating'])
-        n_bins = 7
-        ratings = team_ratings_df['Rating']
-
-        bins = linspace(ratings.min(), ratings.max(), n_bins + 1)
-        labels = [
-            f"{int(bins[i])}-{int(bins[i+1])}"
-            for i in range(len(bins) - 1)
-        ]
-
-        team_dist = pd.cut(ratings, bins=bins, labels=labels, include_lowest=True)
-        team_counts = team_dist.value_counts().sort_index()
-
-
-        return {
-            'player_ratings': [{'bucket': bucket, 'count': int(count)} for bucket, count in player_counts.items()],
-            'team_ratings': [{'bucket': bucket, 'count': int(count)} for bucket, count in team_counts.items()]
-        }
+        return get_statistics_aggregates()['rating_distribution']
     except Exception as e:
         print(f"Error in get_rating_distribution: {e}")
         return {'player_ratings': [], 'team_ratings': []}
@@ -202,11 +109,12 @@ def get_player_comparison_data(player1_name, player2_name):
     """Get comparison data for two players"""
     try:
         stats_df = data_cache.get('player_stats', load_player_stats)
+        career_df = data_cache.get('career_stats', load_career_stats)
         ratings_df = data_cache.get('player_ratings', load_player_ratings)
 
         # Get career stats for both players
-        player1_career = stats_df[(stats_df['Name'] == player1_name) & (stats_df['Season'] == 'Total')]
-        player2_career = stats_df[(stats_df['Name'] == player2_name) & (stats_df['Season'] == 'Total')]
+        player1_career = career_df[career_df['Name'] == player1_name]
+        player2_career = career_df[career_df['Name'] == player2_name]
 
         if player1_career.empty or player2_career.empty:
             return None
@@ -222,8 +130,8 @@ def get_player_comparison_data(player1_name, player2_name):
         player2_ovr = player2_rating.iloc[0]['OVR Rating'] if not player2_rating.empty else 0
 
         # Get season-by-season stats
-        player1_seasons = stats_df[(stats_df['Name'] == player1_name) & (stats_df['Season'] != 'Total')]
-        player2_seasons = stats_df[(stats_df['Name'] == player2_name) & (stats_df['Season'] != 'Total')]
+        player1_seasons = stats_df[stats_df['Name'] == player1_name]
+        player2_seasons = stats_df[stats_df['Name'] == player2_name]
 
         return {
             'player1': {
@@ -256,51 +164,11 @@ def get_player_comparison_data(player1_name, player2_name):
 def get_season_comparison_data(seasons):
     """Get comparison data across multiple seasons"""
     try:
-        matches_df = data_cache.get('match_results', load_match_results)
-        standings_df = data_cache.get('team_standings', load_team_standings)
-
-        comparison_data = []
-
-        for season in seasons:
-            season_matches = matches_df[matches_df['Season'] == season]
-            season_standings = standings_df[standings_df['Season'] == season]
-
-            if season_matches.empty:
-                continue
-
-            # Calculate stats
-            team1_goals = season_matches['Score Team 1'].apply(parse_score).sum()
-            team2_goals = season_matches['Score Team 2'].apply(parse_score).sum()
-            total_goals = int(team1_goals + team2_goals)
-            matches_count = len(season_matches)
-            avg_goals = round(total_goals / matches_count, 2) if matches_count > 0 else 0
-
-            # Count unique teams
-            teams_1 = set(season_matches['Team 1'].unique())
-            teams_2 = set(season_matches['Team 2'].unique())
-            unique_teams = len(teams_1.union(teams_2))
-
-            # Get champion (team with most points)
-            if not season_standings.empty:
-                champ_games = season_matches[season_matches["Group"] == "Playoff"]
-                champion_game = champ_games.nlargest(1, 'Match ID').iloc[0]#['Team']
-                if champion_game["Win Team 1"]:
-                    champion = champion_game["Team 1"]
-                else:
-                    champion = champion_game["Team 2"]   
-            else:
-                champion = 'N/A'
-
-            comparison_data.append({
-                'season': season,
-                'total_goals': total_goals,
-                'avg_goals': avg_goals,
-                'matches': matches_count,
-                'teams': unique_teams,
-                'champion': champion
-            })
-
-        return comparison_data
+        seasons = set(seasons)
+        return [
+            row for row in get_statistics_aggregates()['season_comparison']
+            if row['season'] in seasons
+        ]
     except Exception as e:
         print(f"Error in get_season_comparison_data: {e}")
         return []
@@ -314,22 +182,14 @@ def get_hall_of_fame_members():
     """
     try:
         awards_df = data_cache.get('awards', load_awards)
-        stats_df = data_cache.get('player_stats', load_player_stats)
+        career_df = data_cache.get('career_stats', load_career_stats)
         ratings_df = data_cache.get('player_ratings', load_player_ratings)
         potm_df = data_cache.get('players_potm', load_potm)
 
         # Get all award winners
         award_winners = set(awards_df['Name'].unique())
 
-        # Get career totals
-        career_df = stats_df[stats_df['Season'] == 'Total'].copy()
-        career_df['Goals'] = pd.to_numeric(career_df['Goals'], errors='coerce').fillna(0)
-        career_df['Assists'] = pd.to_numeric(career_df['Assists'], errors='coerce').fillna(0)
-        career_df['Saves'] = pd.to_numeric(career_df['Saves'], errors='coerce').fillna(0)
-        career_df['POTM'] = pd.to_numeric(career_df['POTM'], errors='coerce').fillna(0)
-        career_df['MP'] = pd.to_numeric(career_df['MP'], errors='coerce').fillna(0)
-
-        # Apply thresholds
+        # Apply thresholds to career totals
         threshold_achievers = career_df[
             (career_df['Goals'] > 30) |
             (career_df['Assists'] > 25) |
@@ -443,16 +303,6 @@ def get_hall_of_fame_members():
         return []
 
 # ===== SEASON ARCHIVES FUNCTIONS =====
-def parse_score(value):
-    if isinstance(value, int):
-        return value
-    if isinstance(value, str):
-        try:
-            return int(value.split('(')[0])
-        except ValueError:
-            return 0
-    return 0
-
 def build_playoff_bracket(playoff_matches, champion_team):
     """
     Build playoff bracket as sequential list of matches.
@@ -667,42 +517,55 @@ def get_season_archive_data(season):
         return None
 
 def get_all_seasons_summary():
-    """Get archive data for all seasons"""
-    archives = []
-    for season in range(1, 7):
-        archive_data = get_season_archive_data(season)
-        if archive_data:
-            archives.append(archive_data)
-    return archives
+    """Get archive data for all seasons that have reached the playoffs"""
+    try:
+        return get_archive_snapshot(
+            data_cache.get('team_standings', load_team_standings),
+            data_cache.get('awards', load_awards),
+            data_cache.get('match_results', load_match_results),
+            get_season_archive_data
+        )
+    except Exception as e:
+        print(f"Error in get_all_seasons_summary: {e}")
+        return []
+
+def get_hall_of_fame_summary():
+    """Hall of Fame members from the materialized snapshot"""
+    try:
+        source_frames = [
+            data_cache.get('awards', load_awards),
+            data_cache.get('career_stats', load_career_stats),
+            data_cache.get('player_ratings', load_player_ratings),
+            data_cache.get('players_potm', load_potm),
+        ]
+        return get_hall_of_fame_snapshot(source_frames, get_hall_of_fame_members)
+    except Exception as e:
+        print(f"Error in get_hall_of_fame_summary: {e}")
+        return []
 
 
 @router.get("/statistics", response_class=HTMLResponse)
-async def statistics_page(request: Request, season: int = 6, user = Depends(get_current_user)):
+async def statistics_page(request: Request, season: int = None, user = Depends(get_current_user)):
     """Statistics Dashboard page"""
+    all_seasons = get_available_seasons()
+    if season is None:
+        season = all_seasons[-1] if all_seasons else 6
 
     try:
-        # Get all data
-        all_time_leaders = get_all_time_leaders()
-        current_leaders = get_current_season_leaders(str(season))
-        team_comparison = get_team_performance_comparison(str(season))
-        rating_dist = get_rating_distribution()
-        season_comparison = get_season_comparison_data(list(range(1, 7)))
-
-        # Get all players for comparison dropdown
-        stats_df = data_cache.get('player_stats', load_player_stats)
-        all_players = stats_df[stats_df['Season'] == 'Total']['Name'].sort_values().unique().tolist()
+        # All aggregates are precomputed per data version; just select by season
+        aggregates = get_statistics_aggregates()
 
         return templates.TemplateResponse(request=request, name="statistics.html", context={
             "request": request,
             "user": user,
             "selected_season": season,
-            "all_seasons": list(range(1, 7)),
-            "all_time_leaders": all_time_leaders,
-            "current_leaders": current_leaders,
-            "team_comparison": team_comparison,
-            "rating_distribution": rating_dist,
-            "season_comparison": season_comparison,
-            "all_players": all_players,
+            "all_seasons": all_seasons,
+            "all_time_leaders": aggregates['all_time_leaders'],
+            "current_leaders": aggregates['season_leaders'].get(str(season), EMPTY_LEADERS),
+            "team_comparison": aggregates['team_comparison'].get(season, []),
+            "rating_distribution": aggregates['rating_distribution'],
+            "season_comparison": aggregates['season_comparison'],
+            "all_players": aggregates['all_players'],
         })
     except Exception as e:
         print(f"Error in statistics_page: {e}")
@@ -712,7 +575,7 @@ async def statistics_page(request: Request, season: int = 6, user = Depends(get_
             "request": request,
             "user": user,
             "selected_season": season,
-            "all_seasons": list(range(1, 7)),
+            "all_seasons": all_seasons,
             "all_time_leaders": {'goals': [], 'assists': [], 'saves': [], 'potm': []},
             "current_leaders": {'goals': [], 'assists': [], 'saves': [], 'potm': []},
             "team_comparison": [],
@@ -734,7 +597,7 @@ async def hall_of_fame_page(request: Request, user = Depends(get_current_user)):
         })
 
     try:
-        hof_members = get_hall_of_fame_members()
+        hof_members = get_hall_of_fame_summary()
 
         # Calculate summary stats
         total_inductees = len(hof_members)
@@ -781,7 +644,7 @@ async def archives_page(request: Request, user = Depends(get_current_user)):
             "request": request,
             "user": user,
             "archives": archives,
-            "seasons": list(range(1, 7))
+            "seasons": [archive['season'] for archive in archives]
         })
     except Exception as e:
         print(f"Error in archives_page: {e}")
@@ -791,5 +654,5 @@ async def archives_page(request: Request, user = Depends(get_current_user)):
             "request": request,
             "user": user,
             "archives": [],
-            "seasons": list(range(1, 7))
+            "seasons": []
         })
@@ -3,77 +3,48 @@ from fastapi.templating import Jinja2Templates
 from starlette.responses import HTMLResponse
 import pandas as pd
 from functions import get_potm_match
+from caching import DataCache
+from data_store import read_dataset, load_table
 import ast
-import time
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Data caching system
-class DataCache:
-    def __init__(self, ttl=300):  # 5 minutes TTL by default
-        self.cache = {}
-        self.timestamps = {}
-        self.ttl = ttl
-
-    def get(self, key, loader_func):
-        """Get data from cache or load it using loader_func"""
-        current_time = time.time()
-
-        # Check if cached and not expired
-        if key in self.cache and key in self.timestamps:
-            if current_time - self.timestamps[key] < self.ttl:
-                return self.cache[key]
-
-        # Load fresh data
-        data = loader_func()
-        self.cache[key] = data
-        self.timestamps[key] = current_time
-        return data
-
-    def invalidate(self, key=None):
-        """Invalidate cache for a specific key or all keys"""
-        if key:
-            self.cache.pop(key, None)
-            self.timestamps.pop(key, None)
-        else:
-            self.cache.clear()
-            self.timestamps.clear()
-
-# Initialize cache
-data_cache = DataCache(ttl=6000)
+data_cache = DataCache('teams', ttl=6000)
 
 # Cache loader functions
 def load_season_standings():
-    return pd.read_csv("data/season_standings.csv")
+    return read_dataset("data/season_standings.csv")
 
 def load_team_ratings():
-    return pd.read_csv('data/team_ratings.csv')
+    return read_dataset('data/team_ratings.csv')
 
 def load_match_results():
-    return pd.read_csv('data/Match_Results.csv')
+    return load_table('Match_Results')
 
 def load_team_match_stats():
-    return pd.read_csv('data/team_match_stats.csv')
+    return read_dataset('data/team_match_stats.csv')
 
 def load_season_player_stats():
-    data = pd.read_csv('data/season_player_stats.csv')
-    data = data[data["Season"] != "Total"]
-    return data
+    return load_table('season_player_stats')
 
 def load_ifl_awards():
-    return pd.read_csv('data/IFL_Awards.csv', encoding='utf-8-sig')
+    return read_dataset('data/IFL_Awards.csv')
 
 def load_player_match_stats():
-    return pd.read_csv('data/player_match_stats.csv')
+    return load_table('player_match_stats')
+
+def get_current_season():
+    """Latest season in the standings"""
+    return max(data_cache.get('season_standings', load_season_standings)['Season'].tolist())
 
-CURRENT_SEASON = max(data_cache.get('season_standings', load_season_standings)['Season'].tolist())
 seasons_played = None
 
 @router.get("/teams", response_class=HTMLResponse)
 async def teams_home(request: Request, session: int = None, session_token: str = Cookie(None)):
     # Get selected season (default to current)
-    selected_season = session if session else CURRENT_SEASON
+    selected_season = session if session else get_current_season()
 
     # Get all teams with stats for the selected season
     teams_with_stats = get_all_teams_with_stats(selected_season)
@@ -92,7 +63,7 @@ async def teams_home(request: Request, session: int = None, session_token: str =
         "other_season_teams": [],  # No other season teams when not searching
         "performance_metrics": performance_metrics,
         "awards_stats": awards_stats,
-        "current_season": CURRENT_SEASON,
+        "current_season": get_current_season(),
         "selected_season": selected_season,
         "all_seasons": all_seasons
     })
@@ -147,7 +118,7 @@ async def team_page(request: Request, team_name: str, match_details: str):
 @router.get("/team_search", response_class=HTMLResponse)
 async def search_teams(request: Request, query: str, session: int = None):
     # Get selected season (default to current)
-    selected_season = session if session else CURRENT_SEASON
+    selected_season = session if session else get_current_season()
 
     # Get all teams with stats for searching
     teams_with_stats = get_all_teams_with_stats(selected_season)
@@ -172,7 +143,7 @@ async def search_teams(request: Request, query: str, session: int = None):
         "other_season_teams": other_season_teams,
         "performance_metrics": performance_metrics,
         "awards_stats": awards_stats,
-        "current_season": CURRENT_SEASON,
+        "current_season": get_current_season(),
         "selected_season": selected_season,
         "all_seasons": all_seasons
     })
@@ -240,7 +211,7 @@ def get_players(team):
     data = data_cache.get('season_player_stats', load_season_player_stats)
     players_data = {}
     for season in seasons_played:
-        sub_data:pd.DataFrame = data[data['Season'] == str(season)]
+        sub_data:pd.DataFrame = data[data['Season'] == season]
         sub_data = sub_data[sub_data['Team'] == team]
         if sub_data.shape[0] > 0: players_data[season] = sub_data['Name'].tolist()
     return players_data
@@ -352,33 +323,21 @@ def get_detailed_player_stats(team, seasons):
     )
 
     # Group by player across all seasons
-    all_time_stats = team_players.groupby('Name').agg({
+    all_time_stats = team_players.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
         'POTM': 'sum',
-        'MP': 'sum'
-    }).reset_index()
-
-    # Parse Y-R cards
-    team_players['Yellow'] = team_players['Y-R'].apply(lambda x: int(str(x).split('-')[0]) if pd.notna(x) else 0)
-    team_players['Red'] = team_players['Y-R'].apply(lambda x: int(str(x).split('-')[1]) if pd.notna(x) and '-' in str(x) else 0)
-
-    cards_stats = team_players.groupby('Name').agg({
+        'MP': 'sum',
         'Yellow': 'sum',
         'Red': 'sum'
     }).reset_index()
 
-    all_time_stats = all_time_stats.merge(cards_stats, on='Name', how='left')
-
     all_time_stats = all_time_stats.sort_values('Goals', ascending=False)
 
     season_stats = {}
     for season in seasons:
-        season_data = team_players[team_players['Season'] == str(season)]
-        if season_data.empty:
-            season_data = team_players[team_players['Season'] == int(season)]
-            
+        season_data = team_players[team_players['Season'] == int(season)]
         if not season_data.empty:
             season_stats[season] = season_data.to_dict(orient='records')
 
@@ -475,14 +434,10 @@ def get_head_to_head_records(team, seasons):
 
 def get_league_leaders():
     """Get league-wide leaders in various categories"""
-    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats).copy()
-
-    # Parse Y-R cards
-    player_stats_df['Yellow'] = player_stats_df['Y-R'].apply(lambda x: int(str(x).split('-')[0]) if pd.notna(x) else 0)
-    player_stats_df['Red'] = player_stats_df['Y-R'].apply(lambda x: int(str(x).split('-')[1]) if pd.notna(x) and '-' in str(x) else 0)
+    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats)
 
     # Group by player across all teams and seasons
-    all_time_stats = player_stats_df.groupby('Name').agg({
+    all_time_stats = player_stats_df.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
@@ -494,9 +449,9 @@ def get_league_leaders():
     }).reset_index()
 
     # Get current season stats
-    current_season = CURRENT_SEASON
-    current_season_stats = player_stats_df[player_stats_df['Season'] == current_season].copy()
-    current_season_agg = current_season_stats.groupby('Name').agg({
+    current_season = get_current_season()
+    current_season_stats = player_stats_df[player_stats_df['Season'] == current_season]
+    current_season_agg = current_season_stats.groupby('Name', observed=True).agg({
         'Goals': 'sum',
         'Assists': 'sum',
         'Saves': 'sum',
@@ -521,7 +476,7 @@ def get_league_leaders():
 def get_performance_metrics(season=None):
     """Get team performance metrics"""
     if season is None:
-        season = CURRENT_SEASON
+        season = get_current_season()
 
     standings_df = data_cache.get('season_standings', load_season_standings).copy()
 
@@ -573,13 +528,10 @@ def get_performance_metrics(season=None):
 def get_awards_statistics(season=None):
     """Get awards statistics"""
     if season is None:
-        season = CURRENT_SEASON
+        season = get_current_season()
 
-    awards_df = data_cache.get('ifl_awards', load_ifl_awards).copy()
-    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats).copy()
-    awards_df['Season'] = awards_df['Season'].astype(str)
-    player_stats_df['Season'] = player_stats_df['Season'].astype(str)
-    player_stats_df = player_stats_df[player_stats_df['Season'] != "Total"]
+    awards_df = data_cache.get('ifl_awards', load_ifl_awards)
+    player_stats_df = data_cache.get('season_player_stats', load_season_player_stats)
 
     # All-time awards
     awards_with_teams = awards_df.merge(
@@ -588,17 +540,17 @@ def get_awards_statistics(season=None):
         how='left'
     )
 
-    all_time_team_awards = awards_with_teams.groupby('Team').size().reset_index(name='Total_Awards')
+    all_time_team_awards = awards_with_teams.groupby('Team', observed=True).size().reset_index(name='Total_Awards')
     all_time_team_awards = all_time_team_awards.sort_values('Total_Awards', ascending=False)
 
-    all_time_potm_by_team = player_stats_df.groupby('Team')['POTM'].sum().reset_index()
+    all_time_potm_by_team = player_stats_df.groupby('Team', observed=True)['POTM'].sum().reset_index()
     all_time_potm_by_team = all_time_potm_by_team.sort_values('POTM', ascending=False)
 
     all_time_awards_by_type = awards_df.groupby('Award').size().reset_index(name='Count')
 
     # Selected season awards
-    season_awards_df = awards_df[awards_df['Season'] == str(season)].copy()
-    season_player_stats_df = player_stats_df[player_stats_df['Season'] == str(season)].copy()
+    season_awards_df = awards_df[awards_df['Season'] == int(season)]
+    season_player_stats_df = player_stats_df[player_stats_df['Season'] == int(season)]
 
     season_awards_with_teams = season_awards_df.merge(
         season_player_stats_df[['Name', 'Team', 'Season']].drop_duplicates(),
@@ -606,10 +558,10 @@ def get_awards_statistics(season=None):
         how='left'
     )
 
-    season_team_awards = season_awards_with_teams.groupby('Team').size().reset_index(name='Total_Awards')
+    season_team_awards = season_awards_with_teams.groupby('Team', observed=True).size().reset_index(name='Total_Awards')
     season_team_awards = season_team_awards.sort_values('Total_Awards', ascending=False)
 
-    season_potm_by_team = season_player_stats_df.groupby('Team')['POTM'].sum().reset_index()
+    season_potm_by_team = season_player_stats_df.groupby('Team', observed=True)['POTM'].sum().reset_index()
     season_potm_by_team = season_potm_by_team.sort_values('POTM', ascending=False)
 
     season_awards_by_type = season_awards_df.groupby('Award').size().reset_index(name='Count')
@@ -638,7 +590,7 @@ def get_all_seasons():
 def get_all_teams_with_stats(season=None):
     """Get all teams with their season stats and ratings"""
     if season is None:
-        season = CURRENT_SEASON
+        season = get_current_season()
 
     # Get team ratings
     teams_df = data_cache.get('team_ratings', load_team_ratings)
@@ -0,0 +1,159 @@
+"""
+Precomputed aggregates for the statistics dashboard.
+
+Everything the dashboard shows (leaders, team comparison, rating
+distributions, season comparison) is computed once per data version for
+every season and for all time, so a request only has to select by season.
+"""
+
+import pandas as pd
+from numpy import linspace
+from data_store import split_career_stats
+from caching import DataCache
+
+TOP_N = 10
+LEADER_COLUMNS = {'goals': 'Goals', 'assists': 'Assists', 'saves': 'Saves', 'potm': 'POTM'}
+EMPTY_LEADERS = {'goals': [], 'assists': [], 'saves': [], 'potm': []}
+
+# Keyed by data version through DataCache; only a new version rebuilds them
+aggregates_cache = DataCache('season_aggregates', ttl=float('inf'))
+
+
+def parse_score(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.split('(')[0])
+        except ValueError:
+            return 0
+    return 0
+
+
+def derive_seasons(*frames) -> list:
+    """Sorted list of numeric seasons present in any of the given frames."""
+    seasons = set()
+    for df in frames:
+        if df is None or df.empty or 'Season' not in df.columns:
+            continue
+        values = pd.to_numeric(df['Season'], errors='coerce').dropna()
+        seasons.update(int(s) for s in values.unique())
+    return sorted(seasons)
+
+
+def _top_lists(df) -> dict:
+    if df.empty:
+        return {key: [] for key in LEADER_COLUMNS}
+    return {
+        key: df.nlargest(TOP_N, col)[['Name', col, 'Team']].to_dict('records')
+        for key, col in LEADER_COLUMNS.items()
+    }
+
+
+def _team_comparison(season_standings, ratings_df) -> list:
+    if season_standings.empty:
+        return []
+
+    season_standings = season_standings.copy()
+    season_standings['Win_Pct'] = (season_standings['W'] / season_standings['MP'] * 100).round(1)
+    season_standings['Avg_GF'] = (season_standings['GF'] / season_standings['MP']).round(2)
+    season_standings['Avg_GA'] = (season_standings['GA'] / season_standings['MP']).round(2)
+
+    result = season_standings.merge(ratings_df, left_on='Team', right_on='Name', how='left')
+    result = result[['Team', 'Win_Pct', 'Avg_GF', 'Avg_GA', 'Rating', 'W', 'D', 'L', 'PTS']].copy()
+    result = result.fillna({'Rating': 0})
+    result = result.sort_values('PTS', ascending=False)
+    return result.to_dict('records')
+
+
+def _rating_distribution(player_ratings_df, team_ratings_df) -> dict:
+    player_buckets = [_ for _ in range(50, 101, 5)]
+    player_labels = [f'{i}-{i+5}' for i in player_buckets[:-1]]
+
+    player_ratings = pd.to_numeric(player_ratings_df['OVR Rating'], errors='coerce').dropna()
+    player_dist = pd.cut(player_ratings, bins=player_buckets, labels=player_labels, right=False)
+    player_counts = player_dist.value_counts().sort_index()
+
+    ratings = pd.to_numeric(team_ratings_df['Rating'], errors='coerce').dropna()
+    n_bins = 7
+    bins = linspace(ratings.min(), ratings.max(), n_bins + 1)
+    labels = [f"{int(bins[i])}-{int(bins[i+1])}" for i in range(len(bins) - 1)]
+    team_dist = pd.cut(ratings, bins=bins, labels=labels, include_lowest=True)
+    team_counts = team_dist.value_counts().sort_index()
+
+    return {
+        'player_ratings': [{'bucket': bucket, 'count': int(count)} for bucket, count in player_counts.items()],
+        'team_ratings': [{'bucket': bucket, 'count': int(count)} for bucket, count in team_counts.items()]
+    }
+
+
+def _season_summary(season, season_matches, season_standings):
+    if season_matches.empty:
+        return None
+
+    total_goals = int(season_matches['Score Team 1'].apply(parse_score).sum()
+                      + season_matches['Score Team 2'].apply(parse_score).sum())
+    matches_count = len(season_matches)
+    avg_goals = round(total_goals / matches_count, 2) if matches_count > 0 else 0
+    unique_teams = len(set(season_matches['Team 1'].unique()).union(season_matches['Team 2'].unique()))
+
+    # Champion is the winner of the last playoff game; seasons still in progress have none yet
+    champion = 'N/A'
+    champ_games = season_matches[season_matches['Group'] == 'Playoff']
+    if not season_standings.empty and not champ_games.empty:
+        champion_game = champ_games.nlargest(1, 'Match ID').iloc[0]
+        champion = champion_game['Team 1'] if champion_game['Win Team 1'] else champion_game['Team 2']
+
+    return {
+        'season': season,
+        'total_goals': total_goals,
+        'avg_goals': avg_goals,
+        'matches': matches_count,
+        'teams': unique_teams,
+        'champion': champion
+    }
+
+
+def build_season_aggregates(player_stats, team_standings, team_ratings, player_ratings, match_results) -> dict:
+    """Compute every dashboard aggregate for all seasons in one pass over the data."""
+    seasons = derive_seasons(team_standings, match_results)
+    season_rows, career_rows = split_career_stats(player_stats)
+
+    season_leaders = {
+        str(season): _top_lists(group)
+        for season, group in season_rows.groupby('Season', sort=False)
+    }
+
+    standings_by_season = dict(tuple(team_standings.groupby('Season')))
+    matches_by_season = dict(tuple(match_results.groupby('Season')))
+    empty_standings = team_standings.iloc[0:0]
+    empty_matches = match_results.iloc[0:0]
+
+    team_comparison = {}
+    season_comparison = []
+    for season in seasons:
+        season_standings = standings_by_season.get(season, empty_standings)
+        team_comparison[season] = _team_comparison(season_standings, team_ratings)
+        summary = _season_summary(season, matches_by_season.get(season, empty_matches), season_standings)
+        if summary:
+            season_comparison.append(summary)
+
+    return {
+        'seasons': seasons,
+        'all_time_leaders': _top_lists(career_rows),
+        'season_leaders': season_leaders,
+        'team_comparison': team_comparison,
+        'rating_distribution': _rating_distribution(player_ratings, team_ratings),
+        'season_comparison': season_comparison,
+        'all_players': career_rows['Name'].sort_values().unique().tolist(),
+    }
+
+
+def get_season_aggregates(load_frames) -> dict:
+    """
+    Return the aggregates for the current data version, building them if needed.
+
+    load_frames is a callable returning the keyword arguments for
+    build_season_aggregates.
+    """
+    return aggregates_cache.get('aggregates', lambda: build_season_aggregates(**load_frames()))
@@ -0,0 +1,383 @@
+"""
+Season standings and player season stats, kept up to date match by match.
+
+season_standings.csv and season_player_stats.csv used to be regenerated
+offline. SeasonTables loads them once, applies each new match as a delta
+and writes them back:
+
+- standings (regular-season matches only): MP, W/D/L from the result's win
+  flags, GF/GA/GD, PTS (3 per win, 1 per draw) and L5, the last five
+  results in match order;
+- player season stats (every match, playoffs included): Goals, Assists,
+  Saves, POTM, Y-R, MP, the player's latest Team and Record (W-L-D), plus
+  the player's 'Total' row when the file has career rows. Only appearances
+  for the player's own team count (see is_appearance): rows for external
+  subs and rows with P '-' (listed but did not play) are left out.
+
+Applying a match touches only the two teams and the players in it. The
+Match ID of the last match applied is stored next to the tables
+(AGGREGATED_STATE_PATH), so update_season_tables() applies each match
+exactly once and catches up on anything appended to Match_Results.csv and
+player_match_stats.csv since.
+
+rebuild_standings() and rebuild_player_stats() compute the same tables from
+the match CSVs in one vectorized pass, to verify the deltas.
+season_table_differences() lists the rows where the files disagree with a
+rebuild. The shipped standings are the league's published history and do
+not all follow these rules (a few playoff matches counted for some teams),
+so they are only rewritten on request:
+
+    python season_tables.py --rebuild           # report rows that differ from a rebuild
+    python season_tables.py --rebuild --write   # rewrite both files from the match CSVs
+"""
+
+import ast
+import json
+import os
+import sys
+import threading
+import pandas as pd
+from data_store import DATA_DIR, read_dataset, replace_csv, bump_data_version, dataset_lock
+from season_aggregates import parse_score
+
+STANDINGS_PATH = os.path.join(DATA_DIR, 'season_standings.csv')
+PLAYER_STATS_PATH = os.path.join(DATA_DIR, 'season_player_stats.csv')
+RESULTS_PATH = os.path.join(DATA_DIR, 'Match_Results.csv')
+MATCH_STATS_PATH = os.path.join(DATA_DIR, 'player_match_stats.csv')
+# Match ID of the last match applied to the tables; not a dataset, and not
+# under .cache since losing it would mean applying matches twice
+AGGREGATED_STATE_PATH = os.path.join(DATA_DIR, 'season_tables_state.json')
+
+STANDINGS_COLUMNS = ['Team', 'Group', 'Season', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'PTS', 'L5']
+PLAYER_STATS_COLUMNS = ['Name', 'Season', 'Goals', 'Assists', 'Saves', 'POTM', 'Y-R', 'MP', 'Team', 'Record']
+PLAYOFF_GROUP = 'Playoff'
+FORM_LENGTH = 5
+WIN_POINTS = 3
+DRAW_POINTS = 1
+# Per-match column -> season column for player stats
+PLAYER_SUMS = {'G': 'Goals', 'A': 'Assists', 'S': 'Saves', 'POTM': 'POTM'}
+# Position recorded for a player listed in a match who did not play
+NOT_PLAYED_POSITION = '-'
+
+
+def is_appearance(stats):
+    """
+    Whether player_match_stats rows (a row dict or a DataFrame) count toward
+    season stats: the player played, for their own team.
+    """
+    if isinstance(stats, pd.DataFrame):
+        external = pd.to_numeric(stats['External Sub'], errors='coerce').fillna(0) != 0
+        return ~external & (stats['P'].astype(str).str.strip() != NOT_PLAYED_POSITION)
+    try:
+        external = int(stats.get('External Sub') or 0) != 0
+    except (TypeError, ValueError):
+        external = False
+    return not external and str(stats.get('P', '')).strip() != NOT_PLAYED_POSITION
+
+
+def match_outcomes(result: dict) -> dict:
+    """{team: 'W' | 'D' | 'L'} for both teams in a Match_Results row."""
+    win1, win2 = int(result['Win Team 1']), int(result['Win Team 2'])
+    return {
+        result['Team 1']: 'W' if win1 else 'L' if win2 else 'D',
+        result['Team 2']: 'W' if win2 else 'L' if win1 else 'D',
+    }
+
+
+def _add_pair(value, yellow: int, red: int) -> str:
+    """'a-b' plus (yellow, red), e.g. for Y-R."""
+    a, b = _split_pair(value)
+    return f"{a + yellow}-{b + red}"
+
+
+def _split_pair(value) -> tuple:
+    try:
+        a, b = str(value).split('-')[:2]
+        return int(a), int(b)
+    except (TypeError, ValueError):
+        return 0, 0
+
+
+def _add_record(value, outcome: str) -> str:
+    try:
+        wins, losses, draws = (int(part) for part in str(value).split('-'))
+    except (TypeError, ValueError):
+        wins = losses = draws = 0
+    wins += outcome == 'W'
+    losses += outcome == 'L'
+    draws += outcome == 'D'
+    return f"{wins}-{losses}-{draws}"
+
+
+def _season_key(value):
+    """Sort key placing numeric seasons in order and 'Total' rows last."""
+    try:
+        return (0, int(value))
+    except (TypeError, ValueError):
+        return (1, 0)
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    # Shared lock so a replace_csv() in another process is not read half-way
+    with dataset_lock(path, shared=True):
+        return read_dataset(path)
+
+
+class SeasonTables:
+    """In-memory standings and player season stats, indexed for per-match deltas."""
+
+    def __init__(self, standings: pd.DataFrame, player_stats: pd.DataFrame):
+        # (team, season) -> standings row; L5 held as a list
+        self.standings = {}
+        for row in standings.to_dict('records'):
+            row['L5'] = ast.literal_eval(row['L5']) if isinstance(row.get('L5'), str) else list(row.get('L5') or [])
+            self.standings[(row['Team'], int(row['Season']))] = row
+        # (name, season) -> player row; season is 'Total' for career rows
+        self.player_stats = {}
+        for row in player_stats.to_dict('records'):
+            season = row['Season']
+            key = (row['Name'], int(season) if _season_key(season)[0] == 0 else str(season))
+            self.player_stats[key] = row
+
+    @classmethod
+    def load(cls, standings_path: str = None, player_stats_path: str = None):
+        return cls(_read_table(standings_path or STANDINGS_PATH), _read_table(player_stats_path or PLAYER_STATS_PATH))
+
+    def apply_match(self, result: dict, player_rows: list):
+        """Add one match (a Match_Results row and its player_match_stats rows) to the tables."""
+        season = int(result['Season'])
+        outcomes = match_outcomes(result)
+
+        if result.get('Group') != PLAYOFF_GROUP:
+            goals = {
+                result['Team 1']: (parse_score(result['Score Team 1']), parse_score(result['Score Team 2'])),
+                result['Team 2']: (parse_score(result['Score Team 2']), parse_score(result['Score Team 1'])),
+            }
+            for team, outcome in outcomes.items():
+                row = self.standings.setdefault((team, season), {
+                    'Team': team, 'Group': result.get('Group', ''), 'Season': season,
+                    'MP': 0, 'W': 0, 'D': 0, 'L': 0, 'GF': 0, 'GA': 0, 'GD': 0, 'PTS': 0, 'L5': []
+                })
+                scored, conceded = goals[team]
+                row['MP'] += 1
+                row[outcome] += 1
+                row['GF'] += scored
+                row['GA'] += conceded
+                row['GD'] = row['GF'] - row['GA']
+                row['PTS'] = WIN_POINTS * row['W'] + DRAW_POINTS * row['D']
+                row['L5'] = (list(row['L5']) + [outcome])[-FORM_LENGTH:]
+
+        for stat in player_rows:
+            if not is_appearance(stat):
+                continue
+            name, team = stat['Name'], stat['My Team']
+            yellow, red = _split_pair(stat.get('Y-R'))
+            keys = [(name, season)]
+            if (name, 'Total') in self.player_stats:
+                keys.append((name, 'Total'))
+            for key in keys:
+                row = self.player_stats.setdefault(key, {
+                    'Name': name, 'Season': key[1], 'Goals': 0, 'Assists': 0, 'Saves': 0,
+                    'POTM': 0, 'Y-R': '0-0', 'MP': 0, 'Team': team, 'Record': '0-0-0'
+                })
+                for match_col, season_col in PLAYER_SUMS.items():
+                    row[season_col] = int(row[season_col]) + int(stat.get(match_col) or 0)
+                row['Y-R'] = _add_pair(row['Y-R'], yellow, red)
+                row['MP'] = int(row['MP']) + 1
+                row['Team'] = team
+                row['Record'] = _add_record(row['Record'], outcomes.get(team, 'D'))
+
+    def standings_frame(self) -> pd.DataFrame:
+        """Standings in file order: by season and group, then PTS, GD and GF descending."""
+        df = pd.DataFrame(list(self.standings.values()), columns=STANDINGS_COLUMNS)
+        df['L5'] = df['L5'].apply(lambda form: str(list(form)))
+        df = df.sort_values(['Season', 'Group', 'PTS', 'GD', 'GF'],
+                            ascending=[True, True, False, False, False], kind='stable')
+        return df.reset_index(drop=True)
+
+    def player_stats_frame(self) -> pd.DataFrame:
+        """Player season stats in file order: by season ('Total' last), then name."""
+        rows = sorted(self.player_stats.values(), key=lambda row: (_season_key(row['Season']), row['Name']))
+        return pd.DataFrame(rows, columns=PLAYER_STATS_COLUMNS)
+
+    def save(self, standings_path: str = None, player_stats_path: str = None):
+        replace_csv(standings_path or STANDINGS_PATH, self.standings_frame())
+        replace_csv(player_stats_path or PLAYER_STATS_PATH, self.player_stats_frame())
+
+
+# ===== FULL REBUILD =====
+
+def _team_rows(match_results: pd.DataFrame) -> pd.DataFrame:
+    """One row per team per match: Team, Season, Group, Match ID, GF, GA, Outcome."""
+    results = match_results.sort_values('Match ID', kind='stable')
+    win1 = results['Win Team 1'].astype(int) == 1
+    win2 = results['Win Team 2'].astype(int) == 1
+    goals1 = results['Score Team 1'].apply(parse_score)
+    goals2 = results['Score Team 2'].apply(parse_score)
+    sides = []
+    for team, gf, ga, won, lost in (('Team 1', goals1, goals2, win1, win2), ('Team 2', goals2, goals1, win2, win1)):
+        sides.append(pd.DataFrame({
+            'Team': results[team].astype(str), 'Season': results['Season'].astype(int),
+            'Group': results['Group'].astype(str), 'Match ID': results['Match ID'].astype(int),
+            'GF': gf, 'GA': ga,
+            'Outcome': ['W' if w else 'L' if l else 'D' for w, l in zip(won, lost)],
+        }))
+    return pd.concat(sides, ignore_index=True).sort_values('Match ID', kind='stable')
+
+
+def rebuild_standings(match_results: pd.DataFrame) -> pd.DataFrame:
+    """season_standings computed from Match_Results in one pass."""
+    rows = _team_rows(match_results)
+    rows = rows[rows['Group'] != PLAYOFF_GROUP]
+    by_team = rows.groupby(['Team', 'Season'], sort=False)
+    df = by_team.agg(Group=('Group', 'first'), MP=('Outcome', 'size'), GF=('GF', 'sum'), GA=('GA', 'sum'))
+    for outcome in ('W', 'D', 'L'):
+        df[outcome] = (rows['Outcome'] == outcome).groupby([rows['Team'], rows['Season']]).sum()
+    df['GD'] = df['GF'] - df['GA']
+    df['PTS'] = WIN_POINTS * df['W'] + DRAW_POINTS * df['D']
+    df['L5'] = by_team['Outcome'].agg(lambda form: str(list(form)[-FORM_LENGTH:]))
+    df = df.reset_index()[STANDINGS_COLUMNS]
+    df = df.sort_values(['Season', 'Group', 'PTS', 'GD', 'GF'],
+                        ascending=[True, True, False, False, False], kind='stable')
+    return df.reset_index(drop=True)
+
+
+def rebuild_player_stats(player_match_stats: pd.DataFrame, match_results: pd.DataFrame) -> pd.DataFrame:
+    """season_player_stats (without career rows) computed from the match CSVs in one pass."""
+    outcomes = _team_rows(match_results)[['Match ID', 'Team', 'Outcome']]
+    player_match_stats = player_match_stats[is_appearance(player_match_stats)]
+    stats = player_match_stats.sort_values('Match ID', kind='stable').merge(
+        outcomes, left_on=['Match ID', 'My Team'], right_on=['Match ID', 'Team'], how='left', sort=False
+    )
+    stats['Outcome'] = stats['Outcome'].fillna('D')
+    cards = stats['Y-R'].astype(str).str.split('-', expand=True)
+    stats['Yellow'] = pd.to_numeric(cards[0], errors='coerce').fillna(0).astype(int)
+    stats['Red'] = pd.to_numeric(cards[1], errors='coerce').fillna(0).astype(int)
+    for outcome in ('W', 'L', 'D'):
+        stats[outcome] = (stats['Outcome'] == outcome).astype(int)
+
+    by_player = stats.groupby(['Name', 'Season'], sort=False)
+    sums = by_player[list(PLAYER_SUMS) + ['Yellow', 'Red', 'W', 'L', 'D']].sum()
+    df = sums.rename(columns=PLAYER_SUMS)
+    df['MP'] = by_player.size()
+    df['Team'] = by_player['My Team'].last()
+    df['Y-R'] = df['Yellow'].astype(str) + '-' + df['Red'].astype(str)
+    df['Record'] = df['W'].astype(str) + '-' + df['L'].astype(str) + '-' + df['D'].astype(str)
+    df = df.reset_index()
+    df['Season'] = df['Season'].astype(int)
+    return df.sort_values(['Season', 'Name'], kind='stable').reset_index(drop=True)[PLAYER_STATS_COLUMNS]
+
+
+# ===== PERSISTENT STATE =====
+
+_tables_lock = threading.Lock()
+_tables = {'stamp': None, 'tables': None}
+
+
+def _stamp() -> tuple:
+    return tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in (STANDINGS_PATH, PLAYER_STATS_PATH))
+
+
+def _read_aggregated_through():
+    try:
+        with open(AGGREGATED_STATE_PATH, 'r', encoding='utf-8') as f:
+            return int(json.load(f)['match_id'])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_aggregated_through(match_id: int):
+    tmp_path = f"{AGGREGATED_STATE_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'match_id': int(match_id)}, f)
+    os.replace(tmp_path, AGGREGATED_STATE_PATH)
+
+
+def get_season_tables() -> SeasonTables:
+    """This process's SeasonTables, reloaded if the files were changed elsewhere."""
+    stamp = _stamp()
+    if _tables['tables'] is None or _tables['stamp'] != stamp:
+        _tables['tables'] = SeasonTables.load()
+        _tables['stamp'] = stamp
+    return _tables['tables']
+
+
+def update_season_tables(baseline: int) -> int:
+    """
+    Apply every match above the last one aggregated and save the tables.
+
+    baseline is the Match ID the existing tables are known to include; it
+    is recorded the first time, when no state exists yet. Callers append to
+    the match CSVs under the sync lock (see data_sync). Returns the number
+    of matches applied.
+    """
+    with _tables_lock:
+        aggregated = _read_aggregated_through()
+        if aggregated is None:
+            aggregated = baseline
+            _write_aggregated_through(aggregated)
+
+        results = read_dataset(RESULTS_PATH)
+        new_results = results[results['Match ID'] > aggregated].sort_values('Match ID', kind='stable')
+        if new_results.empty:
+            return 0
+        match_stats = read_dataset(MATCH_STATS_PATH)
+        match_stats = match_stats[match_stats['Match ID'] > aggregated]
+        rows_by_match = {match_id: rows.to_dict('records') for match_id, rows in match_stats.groupby('Match ID')}
+
+        tables = get_season_tables()
+        for result in new_results.to_dict('records'):
+            tables.apply_match(result, rows_by_match.get(result['Match ID'], []))
+        tables.save()
+        _tables['stamp'] = _stamp()
+        _write_aggregated_through(int(new_results['Match ID'].max()))
+        bump_data_version()
+        return len(new_results)
+
+
+def rebuild_season_tables() -> tuple:
+    """Replace both tables with a rebuild from the match CSVs and mark every match applied."""
+    with _tables_lock:
+        results = read_dataset(RESULTS_PATH)
+        standings = rebuild_standings(results)
+        player_stats = rebuild_player_stats(read_dataset(MATCH_STATS_PATH), results)
+        replace_csv(STANDINGS_PATH, standings)
+        replace_csv(PLAYER_STATS_PATH, player_stats)
+        _tables['tables'] = None
+        _write_aggregated_through(int(results['Match ID'].max()) if not results.empty else -1)
+        bump_data_version()
+        return len(standings), len(player_stats)
+
+
+def _differences(persisted: pd.DataFrame, rebuilt: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """Rows (persisted values, then *_rebuilt) where two tables keyed by keys disagree."""
+    merged = persisted.astype(str).merge(rebuilt.astype(str), on=keys, how='outer', suffixes=('', '_rebuilt'), indicator=True)
+    differs = merged['_merge'] != 'both'
+    for col in persisted.columns:
+        if col not in keys:
+            differs |= merged[col] != merged[f"{col}_rebuilt"]
+    return merged[differs].drop(columns='_merge').reset_index(drop=True)
+
+
+def season_table_differences() -> tuple:
+    """(standings rows, player season stat rows) where the files differ from a rebuild; nothing is written."""
+    results = read_dataset(RESULTS_PATH)
+    match_stats = read_dataset(MATCH_STATS_PATH)
+    standings = _read_table(STANDINGS_PATH)
+    player_stats = _read_table(PLAYER_STATS_PATH)
+    player_stats = player_stats[player_stats['Season'].astype(str) != 'Total']
+    return (_differences(standings, rebuild_standings(results), ['Team', 'Season']),
+            _differences(player_stats, rebuild_player_stats(match_stats, results), ['Name', 'Season']))
+
+
+if __name__ == "__main__":
+    if '--write' in sys.argv[1:]:
+        standings_rows, player_rows = rebuild_season_tables()
+        print(f"Rebuilt season_standings ({standings_rows} rows) and season_player_stats ({player_rows} rows)")
+        sys.exit(0)
+
+    standings_diff, player_stats_diff = season_table_differences()
+    for name, diff in (('season_standings', standings_diff), ('season_player_stats', player_stats_diff)):
+        print(f"{name}: {len(diff)} rows differ from a rebuild")
+        if not diff.empty:
+            print(diff.to_string(index=False))
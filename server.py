@@ -0,0 +1,167 @@
+"""
+Pre-forking server for multi-worker deployments.
+
+    python server.py        # WEB_CONCURRENCY workers on $PORT
+
+The master process imports the app, loads every dataset and runs the cache
+warmup once, then forks the workers, which inherit all of it copy-on-write
+instead of each loading its own copy. To keep those pages shared, the
+snapshot columns from data_store are memory-mapped NumPy arrays with no
+per-row Python objects (nothing to bump a reference count on when a worker
+reads them), and gc.freeze() stops the workers' garbage collector from
+writing to every object inherited from the master.
+
+Firebase is initialized per worker by the lifespan hook, after the fork.
+Workers share the master's listening socket; the master restarts workers
+that die and logs the memory of every process every RSS_REPORT_SECONDS.
+With WEB_CONCURRENCY=1, or where fork() is unavailable, this runs a single
+uvicorn process exactly like `python app.py`.
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+import uvicorn
+
+HOST = "0.0.0.0"
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+RSS_REPORT_SECONDS = int(os.getenv("RSS_REPORT_SECONDS", "300"))
+# Workers that exit sooner than this after starting are restarted with a delay
+MIN_WORKER_LIFETIME = 5
+
+
+def process_memory(pid='self') -> dict:
+    """
+    Memory of a process in MB: resident (rss_mb, split into anonymous and
+    file-backed) and proportional (pss_mb, shared pages divided between the
+    processes sharing them). Empty where /proc is unavailable.
+    """
+    fields = {'VmRSS': 'rss_mb', 'RssAnon': 'rss_anon_mb', 'RssFile': 'rss_file_mb', 'Pss': 'pss_mb'}
+    memory = {}
+    for name in ('status', 'smaps_rollup'):
+        try:
+            with open(f"/proc/{pid}/{name}", 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in fields:
+                        memory[fields[key]] = round(int(value.split()[0]) / 1024, 1)
+        except (OSError, ValueError, IndexError):
+            continue
+    return memory
+
+
+def _format_memory(memory: dict) -> str:
+    if not memory:
+        return "unavailable"
+    return ", ".join(f"{key[:-3]} {value} MB" for key, value in memory.items())
+
+
+def report_memory(workers):
+    """Log the memory of the master and each worker."""
+    print(f"Master {os.getpid()}: {_format_memory(process_memory())}")
+    for pid in sorted(workers):
+        print(f"Worker {pid}: {_format_memory(process_memory(pid))}")
+
+
+def preload():
+    """Import the app and warm every cache in the master."""
+    from app import app, preload_app
+    start = time.perf_counter()
+    preload_app(app)
+    # Everything allocated so far is inherited by the workers; keep the
+    # collector from touching it (and copying its pages) after the fork
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded in {time.perf_counter() - start:.1f}s, {_format_memory(process_memory())}")
+    return app
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket):
+    """Worker process body: serve on the inherited socket until told to stop."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    host, port = sock.getsockname()[:2]
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port))
+    print(f"Worker {os.getpid()} booted: {_format_memory(process_memory())}")
+    server.run(sockets=[sock])
+
+
+def serve(workers: int, host: str, port: int):
+    """Preload, fork the workers and supervise them until SIGTERM/SIGINT."""
+    app = preload()
+    sock = _listen(host, port)
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, sock)
+            except BaseException as e:
+                print(f"Error in worker {os.getpid()}: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Master {os.getpid()} serving on http://{host}:{port} with {workers} workers")
+
+    next_report = time.monotonic() + RSS_REPORT_SECONDS
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            started = children.pop(pid, time.monotonic())
+            if not stopping:
+                print(f"Worker {pid} exited with status {status}, restarting")
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(1)
+                spawn()
+            continue
+        if time.monotonic() >= next_report:
+            report_memory(children)
+            next_report += RSS_REPORT_SECONDS
+        time.sleep(0.5)
+
+    sock.close()
+    print("Master shutting down")
+
+
+def main():
+    port = int(os.environ.get("PORT", 8000))
+    if WEB_CONCURRENCY <= 1 or not hasattr(os, 'fork'):
+        from app import app
+        uvicorn.run(app, host=HOST, port=port)
+        return
+    serve(WEB_CONCURRENCY, HOST, port)
+
+
+if __name__ == "__main__":
+    main()
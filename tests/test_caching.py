@@ -0,0 +1,326 @@
+"""
+Unit tests for the in-process caches in caching.py, the page cache middleware
+and the deduplicated Firebase reads in firebase_reads.py
+"""
+
+import threading
+import time
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from caching import LRUCache, DataCache, cache_stats, estimate_size, memoize
+from middleware import PageCacheMiddleware, FirebaseReadScopeMiddleware
+import firebase_reads
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """Tests for the byte-bounded LRU cache."""
+
+    def test_get_and_set(self):
+        """Test stored values are returned and counted as hits."""
+        cache = LRUCache('test', max_bytes=100)
+        cache.set('a', b'12345')
+
+        assert cache.get('a') == b'12345'
+        assert cache.get('missing') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hit_ratio'] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted when over budget."""
+        cache = LRUCache('test', max_bytes=10)
+        cache.set('a', b'xxxx')
+        cache.set('b', b'xxxx')
+        cache.get('a')
+        cache.set('c', b'xxxx')
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.current_bytes == 8
+        assert cache.stats()['evictions'] == 1
+
+    def test_rejects_oversized_entries(self):
+        """Test an entry larger than the whole budget is not stored."""
+        cache = LRUCache('test', max_bytes=4)
+
+        assert cache.set('a', b'too large') is False
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        """Test invalidating one key and the whole cache."""
+        cache = LRUCache('test', max_bytes=100)
+        cache.set('a', b'1')
+        cache.set('b', b'22')
+        cache.invalidate('a')
+        assert cache.current_bytes == 2
+
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.current_bytes == 0
+
+
+@pytest.mark.unit
+@patch('caching.get_data_version', return_value='v1')
+class TestDataCache:
+    """Tests for the loader-backed dataset cache."""
+
+    def test_concurrent_cold_loads_run_once(self, mock_version):
+        """Test callers racing on a cold key share a single load."""
+        cache = DataCache('test', ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'data'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('k', loader))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == ['data'] * 5
+        assert len(calls) == 1
+        assert cache.stats()['keys']['k']['refreshes'] == 1
+
+    def test_expired_entry_served_stale_while_refreshing(self, mock_version):
+        """Test an expired entry is returned at once and reloaded in the background."""
+        cache = DataCache('test', ttl=0)
+        release = threading.Event()
+        values = iter(['old', 'new'])
+
+        def loader():
+            value = next(values)
+            if value == 'new':
+                release.wait(5)
+            return value
+
+        assert cache.get('k', loader) == 'old'
+        assert cache.get('k', loader) == 'old'
+        assert cache.get('k', loader) == 'old'
+        assert cache.stats()['refreshing'] == ['k']
+
+        release.set()
+        for _ in range(100):
+            if not cache.stats()['refreshing']:
+                break
+            time.sleep(0.01)
+        assert cache.get('k', loader) == 'new'
+
+    def test_data_version_change_reloads(self, mock_version):
+        """Test entries loaded from older data are never served."""
+        cache = DataCache('test', ttl=60)
+        cache.get('k', lambda: 'old')
+
+        mock_version.return_value = 'v2'
+        assert cache.get('k', lambda: 'new') == 'new'
+
+    def test_evicts_least_recently_used_past_budget(self, mock_version):
+        """Test entries are sized and the coldest ones evicted over the byte budget."""
+        frame = pd.DataFrame({'Goals': range(100)})
+        size = estimate_size(frame)
+        cache = DataCache('test-budget', ttl=60, max_bytes=2 * size)
+
+        cache.get('a', lambda: frame)
+        cache.get('b', lambda: frame.copy())
+        cache.get('a', lambda: frame)
+        cache.get('c', lambda: frame.copy())
+
+        stats = cache.stats()
+        assert stats['bytes'] == 2 * size
+        assert stats['evictions'] == 1
+        assert (stats['hits'], stats['misses']) == (1, 3)
+        assert cache.get('b', lambda: 'reloaded') == 'reloaded'
+
+    def test_failed_load_is_counted(self, mock_version):
+        """Test loader errors propagate on a cold key and are recorded."""
+        cache = DataCache('test', ttl=60)
+
+        def loader():
+            raise FileNotFoundError('missing.csv')
+
+        with pytest.raises(FileNotFoundError):
+            cache.get('k', loader)
+        assert cache.stats()['keys']['k']['errors'] == 1
+
+
+@pytest.mark.unit
+class TestPageCacheMiddleware:
+    """Tests for caching rendered pages for anonymous visitors."""
+
+    def _make_client(self, cache):
+        calls = []
+
+        async def players(request):
+            calls.append(request.url.query)
+            return HTMLResponse(f"<p>players {len(calls)}</p>")
+
+        async def api(request):
+            calls.append('api')
+            return JSONResponse({'n': len(calls)})
+
+        app = Starlette(routes=[Route('/players', players), Route('/api/players', api)])
+        app.add_middleware(PageCacheMiddleware, cache=cache)
+        return TestClient(app), calls
+
+    @patch('middleware.get_data_version', return_value='v1')
+    def test_anonymous_requests_are_cached(self, mock_version):
+        """Test a repeated anonymous request is served from cache."""
+        client, calls = self._make_client(LRUCache('pages', max_bytes=1024))
+
+        first = client.get('/players?sort=goals&page=1')
+        second = client.get('/players?page=1&sort=goals')
+
+        assert first.headers['X-Page-Cache'] == 'MISS'
+        assert second.headers['X-Page-Cache'] == 'HIT'
+        assert second.text == first.text
+        assert len(calls) == 1
+
+    @patch('middleware.get_data_version', return_value='v1')
+    def test_session_cookie_bypasses_cache(self, mock_version):
+        """Test logged-in visitors always get a freshly rendered page."""
+        client, calls = self._make_client(LRUCache('pages', max_bytes=1024))
+
+        client.cookies.set('session_token', 'abc')
+        client.get('/players')
+        response = client.get('/players')
+
+        assert 'X-Page-Cache' not in response.headers
+        assert len(calls) == 2
+
+    @patch('middleware.get_data_version')
+    def test_data_version_change_misses(self, mock_version):
+        """Test a new data version renders the page again."""
+        client, calls = self._make_client(LRUCache('pages', max_bytes=1024))
+
+        mock_version.return_value = 'v1'
+        client.get('/players')
+        mock_version.return_value = 'v2'
+        response = client.get('/players')
+
+        assert response.headers['X-Page-Cache'] == 'MISS'
+        assert len(calls) == 2
+
+    @patch('middleware.get_data_version', return_value='v1')
+    def test_other_paths_not_cached(self, mock_version):
+        """Test API routes are never cached."""
+        client, calls = self._make_client(LRUCache('pages', max_bytes=1024))
+
+        client.get('/api/players')
+        client.get('/api/players')
+
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestFirebaseReads:
+    """Tests for request-scoped and single-flight Firebase reads."""
+
+    @patch('firebase_reads.db')
+    def test_request_scope_reads_each_path_once(self, mock_db):
+        """Test repeated and nested reads in one request hit Firebase once."""
+        mock_db.reference.return_value.get.return_value = {'u1': {'points': 3}}
+
+        with firebase_reads.request_scope():
+            first = firebase_reads.read('PredictionStats')
+            first['u1']['points'] = 99
+            assert firebase_reads.read('/PredictionStats/') == {'u1': {'points': 3}}
+            assert firebase_reads.read('PredictionStats/u1/points') == 3
+            assert mock_db.reference.call_count == 1
+
+            firebase_reads.forget('PredictionStats/u1')
+            firebase_reads.read('PredictionStats/u1')
+            assert mock_db.reference.call_count == 2
+
+        firebase_reads.read('PredictionStats')
+        assert mock_db.reference.call_count == 3
+
+    @patch('firebase_reads.db')
+    def test_concurrent_reads_are_coalesced(self, mock_db):
+        """Test readers of a path already in flight share its result."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_get():
+            started.set()
+            release.wait(5)
+            return {'Week': 3}
+
+        mock_db.reference.return_value.get.side_effect = slow_get
+        results = []
+        readers = [threading.Thread(target=lambda: results.append(firebase_reads.read('Fantasy/current_week')))
+                   for _ in range(3)]
+        readers[0].start()
+        started.wait(5)
+        for reader in readers[1:]:
+            reader.start()
+        release.set()
+        for reader in readers:
+            reader.join(5)
+
+        assert results == [{'Week': 3}] * 3
+        assert mock_db.reference.return_value.get.call_count == 1
+
+    @patch('firebase_reads.db')
+    def test_middleware_scopes_reads_to_a_request(self, mock_db):
+        """Test each request gets its own memo."""
+        mock_db.reference.return_value.get.return_value = {'username': 'ann'}
+
+        def profile(request):
+            firebase_reads.read('Fantasy/Users/u1')
+            return JSONResponse(firebase_reads.read('Fantasy/Users/u1'))
+
+        app = Starlette(routes=[Route('/profile', profile)])
+        app.add_middleware(FirebaseReadScopeMiddleware)
+        client = TestClient(app)
+
+        assert client.get('/profile').json() == {'username': 'ann'}
+        client.get('/profile')
+        assert mock_db.reference.return_value.get.call_count == 2
+
+
+@pytest.mark.unit
+class TestCacheAccounting:
+    """Tests for cache sizing, the registry and memoize()."""
+
+    def test_dataframe_size_includes_strings(self):
+        """Test DataFrames are measured with their object column contents."""
+        frame = pd.DataFrame({'Name': ['x' * 1000] * 10})
+
+        assert estimate_size(frame) > 10 * 1000
+
+    def test_registry_reports_named_caches(self):
+        """Test every live cache appears in cache_stats()."""
+        cache = LRUCache('test-registry', max_bytes=100)
+        cache.set('a', b'1234')
+
+        stats = {c['name']: c for c in cache_stats()['caches']}
+        assert stats['test-registry']['bytes'] == 4
+        assert cache_stats()['total_bytes'] >= 4
+
+    @patch('caching.get_data_version', return_value='v1')
+    def test_memoize_keys_on_data_version(self, mock_version):
+        """Test memoized results are reused until the data version changes."""
+        calls = []
+
+        @memoize('test-memoize', max_bytes=1024)
+        def recent(k, season=None):
+            calls.append((k, season))
+            return [k, season]
+
+        assert recent(2, season=6) == [2, 6]
+        recent(2, season=6)
+        assert len(calls) == 1
+
+        mock_version.return_value = 'v2'
+        recent(2, season=6)
+        assert len(calls) == 2
+        assert recent.cache.stats()['entries'] == 2
@@ -0,0 +1,306 @@
+"""
+Unit tests for the dataset helpers in data_store.py
+"""
+
+import os
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import data_store
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the data store at an empty temporary data directory."""
+    monkeypatch.setattr(data_store, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(data_store, 'SNAPSHOT_DIR', str(tmp_path / '.cache' / 'columns'))
+    data_store._loaded_columns.clear()
+    data_store._loaded_manifests.clear()
+    yield tmp_path
+    data_store._loaded_columns.clear()
+    data_store._loaded_manifests.clear()
+
+
+def _write_csv(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.unit
+class TestDataVersion:
+    """Tests for the data version token."""
+
+    def test_version_changes_with_data(self, data_dir):
+        """Test editing a CSV or bumping produces a new version."""
+        path = data_dir / 'teams.csv'
+        _write_csv(path, "Team\nAAA\n")
+        first = data_store.get_data_version()
+        assert data_store.get_data_version() == first
+
+        _write_csv(path, "Team\nAAA\nBBB\n")
+        second = data_store.get_data_version()
+        assert second != first
+
+        data_store.bump_data_version()
+        assert data_store.get_data_version() != second
+
+
+@pytest.mark.unit
+class TestColumnarSnapshots:
+    """Tests for loading CSVs through columnar snapshots."""
+
+    def test_snapshot_matches_read_csv(self, data_dir):
+        """Test a snapshot load is identical to parsing the CSV."""
+        path = _write_csv(data_dir / 'stats.csv',
+                          "\ufeffName,Season,Goals,Rating,Y-R\n"
+                          "Ann,1,3,7.5,0-0\n"
+                          "Ben,Total,,8.0,\n")
+
+        expected = pd.read_csv(path, encoding='utf-8-sig')
+        data_store.read_dataset(path)  # builds the snapshot
+        data_store._loaded_columns.clear()
+        data_store._loaded_manifests.clear()
+
+        assert_frame_equal(data_store.read_dataset(path), expected)
+        assert os.path.exists(os.path.join(data_store.SNAPSHOT_DIR, 'stats.manifest.json'))
+
+    def test_snapshot_rebuilt_when_csv_changes(self, data_dir):
+        """Test a newer CSV replaces the snapshot."""
+        path = _write_csv(data_dir / 'teams.csv', "Team,PTS\nAAA,3\n")
+        assert len(data_store.read_dataset(path)) == 1
+
+        _write_csv(data_dir / 'teams.csv', "Team,PTS\nAAA,3\nBBB,6\n")
+        df = data_store.read_dataset(path)
+
+        assert df['Team'].tolist() == ['AAA', 'BBB']
+        assert df['PTS'].tolist() == [3, 6]
+
+    def test_default_frames_are_writable(self, data_dir):
+        """Test callers can modify the frame they get back."""
+        path = _write_csv(data_dir / 'teams.csv', "Team,PTS\nAAA,3\n")
+        df = data_store.read_dataset(path)
+        df.loc[0, 'PTS'] = 10
+
+        assert data_store.read_dataset(path).loc[0, 'PTS'] == 3
+
+    def test_usecols(self, data_dir):
+        """Test only the requested columns are returned."""
+        path = _write_csv(data_dir / 'teams.csv', "Team,PTS,GF\nAAA,3,5\n")
+
+        assert data_store.read_dataset(path, usecols=['Team', 'GF']).columns.tolist() == ['Team', 'GF']
+
+    def test_loaded_columns_hold_no_python_objects(self, data_dir):
+        """Test memoized columns are object-free so forked workers keep sharing them."""
+        path = _write_csv(data_dir / 'teams.csv', "Team,PTS\nAAA,3\n,6\n")
+        df = data_store.read_dataset(path)
+
+        assert df['Team'].tolist()[0] == 'AAA' and pd.isna(df['Team'].tolist()[1])
+        for loaded in data_store._loaded_columns.values():
+            arrays = loaded if isinstance(loaded, tuple) else (loaded,)
+            assert all(array.dtype != object for array in arrays)
+
+
+@pytest.mark.unit
+class TestTypedTables:
+    """Tests for the schema-driven table loader."""
+
+    def test_compact_dtypes_and_cards(self, data_dir):
+        """Test labels load as categoricals, Season as a small int and Y-R as Yellow/Red."""
+        _write_csv(data_dir / 'season_player_stats.csv',
+                   "Name,Season,Goals,Assists,Saves,POTM,Y-R,MP,Team,Record\n"
+                   "Ann,1,3,1,0,1,1-0,5,AAA,3-1-1\n"
+                   "Ben,1,1,2,10,0,0-1,5,BBB,1-2-2\n"
+                   "Ann,2,4,0,0,0,,4,CCC,2-1-1\n")
+        df = data_store.load_table('season_player_stats')
+
+        assert isinstance(df['Name'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['Team'].dtype, pd.CategoricalDtype)
+        assert df['Season'].dtype == data_store.SEASON_DTYPE
+        assert df['Goals'].dtype == data_store.COUNT_DTYPE
+        assert df['Yellow'].tolist() == [1, 0, 0]
+        assert df['Red'].tolist() == [0, 1, 0]
+        assert df[df['Season'] == 2]['Team'].tolist() == ['CCC']
+
+    def test_total_rows_become_career_table(self, data_dir):
+        """Test 'Total' rows are kept out of the season table and form the career table."""
+        _write_csv(data_dir / 'season_player_stats.csv',
+                   "Name,Season,Goals,Assists,Saves,POTM,Y-R,MP,Team,Record\n"
+                   "Ann,1,3,1,0,1,1-0,5,AAA,3-1-1\n"
+                   "Ann,Total,3,1,0,1,1-0,5,AAA,3-1-1\n")
+
+        assert data_store.load_table('season_player_stats')['Season'].tolist() == [1]
+        career = data_store.load_career_table()
+        assert career['Name'].tolist() == ['Ann']
+        assert 'Season' not in career.columns
+
+    def test_career_table_summed_from_seasons(self, data_dir):
+        """Test career rows are summed, cards included, keeping the latest team."""
+        _write_csv(data_dir / 'season_player_stats.csv',
+                   "Name,Season,Goals,Assists,Saves,POTM,Y-R,MP,Team,Record\n"
+                   "Ann,2,4,0,0,0,0-1,4,CCC,2-1-1\n"
+                   "Ann,1,3,1,0,1,1-0,5,AAA,3-1-1\n")
+        ann = data_store.load_career_table().iloc[0]
+
+        assert (ann['Goals'], ann['MP'], ann['Yellow'], ann['Red']) == (7, 9, 1, 1)
+        assert ann['Team'] == 'CCC'
+
+    def test_parse_cards_tolerates_bad_values(self):
+        """Test missing and malformed card values count as zero."""
+        yellow, red = data_store.parse_cards(pd.Series(['2-1', None, 'RC', '3']))
+
+        assert yellow.tolist() == [2, 0, 0, 3]
+        assert red.tolist() == [1, 0, 0, 0]
+
+
+@pytest.mark.unit
+class TestCsvWriters:
+    """Tests for appending to and replacing dataset CSVs."""
+
+    def test_append_rows_follows_header_and_line_endings(self, data_dir):
+        """Test appended rows use the header's column order and line ending, without a rewrite."""
+        path = _write_csv(data_dir / 'results.csv', "")
+        with open(path, 'wb') as f:
+            f.write(b"\xef\xbb\xbfName,Goals,Team\r\nAnn Able,1,AAA")
+
+        written = data_store.append_rows(path, [{'Team': 'BBB', 'Name': 'Bo Bell', 'Goals': 2},
+                                                {'Name': 'Cy, Jr', 'Goals': None}])
+
+        assert written == 2
+        with open(path, 'rb') as f:
+            assert f.read() == (b"\xef\xbb\xbfName,Goals,Team\r\nAnn Able,1,AAA\r\n"
+                                b"Bo Bell,2,BBB\r\n\"Cy, Jr\",,\r\n")
+        assert data_store.append_rows(path, []) == 0
+
+    def test_replace_csv_leaves_no_temporary_file(self, data_dir):
+        """Test a replaced CSV reads back whole and its temporary file is gone."""
+        path = _write_csv(data_dir / 'standings.csv', "Team,PTS\nAAA,3\n")
+        df = pd.DataFrame({'Team': ['AAA', 'BBB'], 'PTS': [6, 3]})
+
+        data_store.replace_csv(path, df)
+
+        assert_frame_equal(data_store.read_dataset(path), df)
+        assert sorted(os.listdir(data_dir)) == ['.cache', 'standings.csv']
+
+    def test_replace_csv_keeps_byte_order_mark(self, data_dir):
+        """Test replacing a CSV that starts with a BOM keeps the BOM and the file's line ending."""
+        path = _write_csv(data_dir / 'awards.csv', "")
+        with open(path, 'wb') as f:
+            f.write(b"\xef\xbb\xbfTeam,PTS\r\nAAA,3\r\n")
+        df = pd.DataFrame({'Team': ['AAA', 'BBB'], 'PTS': [6, 3]})
+
+        data_store.replace_csv(path, df)
+
+        with open(path, 'rb') as f:
+            assert f.read() == b"\xef\xbb\xbfTeam,PTS\r\nAAA,6\r\nBBB,3\r\n"
+        assert_frame_equal(data_store.read_dataset(path), df)
+
+
+class _FakeGameDays:
+    """game_day_stats stand-in: shallow key listing and order_by_key().start_at() queries."""
+
+    def __init__(self, matchdays):
+        self.matchdays = matchdays
+        self.queried = []
+
+    def reference(self, path):
+        from types import SimpleNamespace
+        key = path.split('/')[1] if '/' in path else None
+
+        def start_at(start):
+            self.queried.append(key)
+            entries = self.matchdays.get(key, {})
+            return SimpleNamespace(get=lambda: {k: v for k, v in entries.items() if int(k) >= int(start)})
+
+        return SimpleNamespace(
+            get=lambda shallow=False: {k: True for k in self.matchdays},
+            order_by_key=lambda: SimpleNamespace(start_at=start_at),
+        )
+
+
+def _submitted(match_id, season=2, **extra):
+    return {
+        'match_id': match_id, 'season': season, 'team1': 'AAA', 'team2': 'BBB',
+        'score1': 2, 'score2': 0, 'group': 'A', 'submitted_at': '2020-01-01T00:00:00',
+        'player_stats': [{'player': 'Ann Able', 'team': 'AAA', 'goals': 2, 'assists': 0, 'saves': 0,
+                          'yellow_cards': 1, 'red_cards': 0, 'is_potm': True}],
+        'external_subs': [{'player': 'Sam Sub', 'team': 'BBB', 'goals': 0, 'assists': 0, 'saves': 3,
+                           'yellow_cards': 0, 'red_cards': 1, 'is_potm': False, 'is_external': True}],
+        **extra,
+    }
+
+
+@pytest.mark.unit
+class TestMatchSync:
+    """Tests for appending submitted matches to the CSVs."""
+
+    @pytest.fixture
+    def synced_dir(self, data_dir, monkeypatch):
+        import data_sync
+        import season_tables
+        results = _write_csv(data_dir / 'Match_Results.csv',
+                             "Team 1,Team 2,Season,Group,Match ID,Score Team 1,Score Team 2,Time,"
+                             "Red Card Team 1,Red Card Team 2,Win Team 1,Win Team 2\n"
+                             "AAA,BBB,2,A,10,1,1,Final,0,0,0,0\n")
+        stats = _write_csv(data_dir / 'player_match_stats.csv',
+                           "Name,Season,Match ID,My Team,Start?,External Sub,P,Y-R,POTM,G,A,S,Opponent\n"
+                           "Ann Able,2,10,AAA,Y,0,F,0-0,0,1,0,0,BBB\n")
+        monkeypatch.setattr(data_sync, 'RESULTS_PATH', results)
+        monkeypatch.setattr(data_sync, 'PLAYER_STATS_PATH', stats)
+        monkeypatch.setattr(season_tables, 'RESULTS_PATH', results)
+        monkeypatch.setattr(season_tables, 'MATCH_STATS_PATH', stats)
+        monkeypatch.setattr(season_tables, 'STANDINGS_PATH', _write_csv(
+            data_dir / 'season_standings.csv',
+            "Team,Group,Season,MP,W,D,L,GF,GA,GD,PTS,L5\n"
+            "AAA,A,2,1,0,1,0,1,1,0,1,['D']\nBBB,A,2,1,0,1,0,1,1,0,1,['D']\n"))
+        monkeypatch.setattr(season_tables, 'PLAYER_STATS_PATH', _write_csv(
+            data_dir / 'season_player_stats.csv',
+            "Name,Season,Goals,Assists,Saves,POTM,Y-R,MP,Team,Record\nAnn Able,2,1,0,0,0,0-0,1,AAA,0-0-1\n"))
+        monkeypatch.setattr(season_tables, 'AGGREGATED_STATE_PATH', str(data_dir / 'season_tables_state.json'))
+        monkeypatch.setitem(season_tables._tables, 'tables', None)
+        return data_dir
+
+    def test_new_matches_appended_in_canonical_columns(self, synced_dir, monkeypatch):
+        """Test matches above the watermark are converted, appended once and bump the version."""
+        import data_sync
+        fake = _FakeGameDays({
+            'MD1_S1': {'3': _submitted(3, season=1)},
+            'MD4_S2': {'10': _submitted(10), '11': _submitted(11)},
+            'MD5_S2': {'12': _submitted(12)},
+        })
+        monkeypatch.setattr(data_sync, 'db', fake)
+        version = data_store.get_data_version()
+
+        report = data_sync.sync_new_matches()
+        again = data_sync.sync_new_matches()
+
+        results = pd.read_csv(synced_dir / 'Match_Results.csv')
+        stats = pd.read_csv(synced_dir / 'player_match_stats.csv')
+        assert (report['synced'], report['player_rows'], report['watermark']) == (2, 4, 12)
+        assert again['synced'] == 0
+        assert 'MD1_S1' not in fake.queried
+        assert list(results['Match ID']) == [10, 11, 12]
+        assert results.iloc[1][['Win Team 1', 'Red Card Team 2']].tolist() == [1, 1]
+        ann = stats[(stats['Match ID'] == 11) & (stats['Name'] == 'Ann Able')].iloc[0]
+        assert ann[['Y-R', 'POTM', 'G', 'Opponent']].tolist() == ['1-0', 1, 2, 'BBB']
+        assert ann[['P', 'Start?']].isna().all()
+        sam = stats[(stats['Match ID'] == 11) & (stats['Name'] == 'Sam Sub')].iloc[0]
+        assert sam[['External Sub', 'Y-R', 'S']].tolist() == [1, '0-1', 3]
+        assert data_store.get_data_version() != version
+        standings = pd.read_csv(synced_dir / 'season_standings.csv').set_index('Team')
+        assert report['aggregated'] == 2 and again['aggregated'] == 0
+        assert standings.loc['AAA', 'MP'] == 3
+
+    def test_recent_gap_stops_the_sync(self, synced_dir, monkeypatch):
+        """Test a missing ID holds back later matches until it is old enough to skip."""
+        import data_sync
+        from datetime import datetime
+        recent = datetime.now().isoformat()
+        monkeypatch.setattr(data_sync, 'db', _FakeGameDays({
+            'MD4_S2': {'11': _submitted(11), '13': _submitted(13, submitted_at=recent)},
+        }))
+
+        assert data_sync.sync_new_matches()['watermark'] == 11
+        assert list(pd.read_csv(synced_dir / 'Match_Results.csv')['Match ID']) == [10, 11]
+
+        monkeypatch.setattr(data_sync, 'SYNC_GAP_SECONDS', 0)
+        assert data_sync.sync_new_matches()['watermark'] == 13
@@ -0,0 +1,554 @@
+"""
+Unit tests for FantasyService player lookups and team validation
+"""
+
+import copy
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from types import SimpleNamespace
+from models.fantasy import FantasyService
+from firebase_replica import FirebaseReplica
+
+
+def _fantasy_data():
+    rows = [
+        ('Gia', 'Keeper', 'AAA', 'GK'), ('Hal', 'Keeper', 'BBB', 'GK'),
+        ('Dee', 'Back', 'CCC', 'D'), ('Dan', 'Back', 'DDD', 'D'),
+        ('Mia', 'Middle', 'EEE', 'M'), ('Fay', 'Forward', 'AAA', 'F'),
+        ('Fox', 'Forward', 'BBB', 'F'), ('Fin', 'Striker', 'CCC', 'F'),
+        ('Mary Ann', 'Lee', 'EEE', 'D'), ('Zadoc', None, 'DDD', 'F'),
+    ]
+    return pd.DataFrame({
+        'First Name': [r[0] for r in rows],
+        'Last Name': [r[1] for r in rows],
+        'Team': [r[2] for r in rows],
+        'Season': [7] * len(rows),
+        'Primary Position': [r[3] for r in rows],
+        'OVR Rating': ['70'] * (len(rows) - 1) + ['-'],
+        'Fantasy Cost': [10] * len(rows),
+    })
+
+
+@pytest.fixture
+def service():
+    with patch('models.fantasy.read_dataset', return_value=_fantasy_data()), \
+         patch('models.fantasy.settings_replica', FirebaseReplica('Fantasy/settings')), \
+         patch('firebase_replica.db') as mock_db:
+        mock_db.reference.return_value.get.return_value = {}
+        yield FantasyService(season=7)
+
+
+SQUAD = ['Gia Keeper', 'Hal Keeper', 'Dee Back', 'Dan Back',
+         'Mia Middle', 'Fay Forward', 'Fox Forward', 'Fin Striker']
+
+
+@pytest.mark.unit
+class TestPlayerCatalog:
+    """Tests for the name-indexed player catalog."""
+
+    def test_lookup_by_full_name(self, service):
+        """Test players are found by full name and unknown names are skipped."""
+        players = service.get_players_by_names(['Dee Back', 'Nobody Here', 'Zadoc'])
+
+        assert [p['Team'] for p in players] == ['CCC']
+        assert service.get_player_by_name('Mia', 'Middle')['Primary_Position'] == 'M'
+        assert service.get_player_by_name('Zadoc', 'nan') is None
+
+    def test_lookup_first_name_with_space(self, service):
+        """Test a player whose first name contains a space is still found by first and last name."""
+        assert service.get_player_by_name('Mary Ann', 'Lee')['Team'] == 'EEE'
+        assert service.get_player_by_name('Mary', 'Ann Lee') is None
+
+    def test_catalog_is_read_only(self, service):
+        """Test callers get copies and cannot modify the shared catalog."""
+        player = service.get_player_by_name('Gia', 'Keeper')
+        player['Team'] = 'ZZZ'
+
+        assert service.players_by_name['Gia Keeper']['Team'] == 'AAA'
+        with pytest.raises(TypeError):
+            service.players_by_name['Gia Keeper']['Team'] = 'ZZZ'
+
+    def test_validate_team_creation(self, service):
+        """Test squad rules are checked from the catalog."""
+        assert service.validate_team_creation(SQUAD, 100) == (True, "Team creation rules satisfied")
+        assert service.validate_team_creation(SQUAD, 50)[0] is False
+
+        unlisted = SQUAD[:4] + ['Zadoc'] + SQUAD[5:]
+        assert service.validate_team_creation(unlisted, 100) == (False, "Some selected players were not found")
+
+    def test_validate_weekly_team(self, service):
+        """Test starting team position counts."""
+        starting = ['Gia Keeper', 'Dee Back', 'Mia Middle', 'Fay Forward', 'Fox Forward']
+        assert service.validate_weekly_team(starting, SQUAD)[0] is True
+
+        two_keepers = ['Gia Keeper', 'Hal Keeper', 'Mia Middle', 'Fay Forward', 'Fin Striker']
+        assert service.validate_weekly_team(two_keepers, SQUAD) == (
+            False, "You need exactly 1 Goalkeeper in your starting team")
+
+
+@pytest.mark.unit
+class TestFirebaseReplica:
+    """Tests for the local copies of Firebase settings nodes."""
+
+    def test_polling_reads_once_per_interval(self):
+        """Test reads are served from memory until the copy is stale."""
+        replica = FirebaseReplica('Fantasy/current_week', poll_seconds=60)
+        with patch('firebase_replica.db') as mock_db:
+            mock_db.reference.return_value.get.return_value = {'Season': 7, 'Week': 3}
+
+            assert replica.get() == {'Season': 7, 'Week': 3}
+            assert replica.get()['Week'] == 3
+            assert mock_db.reference.return_value.get.call_count == 1
+
+            replica.invalidate()
+            replica.get()
+            assert mock_db.reference.return_value.get.call_count == 2
+
+    def test_stream_events_update_copy(self):
+        """Test put and patch events from listen() are applied without reads."""
+        replica = FirebaseReplica('Fantasy/settings')
+        with patch('firebase_replica.db') as mock_db:
+            assert replica.start() is True
+            on_event = mock_db.reference.return_value.listen.call_args[0][0]
+
+            on_event(SimpleNamespace(event_type='put', path='/', data={'team_lock': False}))
+            on_event(SimpleNamespace(event_type='patch', path='/', data={'min_different_teams_squad': 4}))
+            on_event(SimpleNamespace(event_type='put', path='/team_lock', data=True))
+
+            assert replica.get() == {'team_lock': True, 'min_different_teams_squad': 4}
+            mock_db.reference.return_value.get.assert_not_called()
+
+            replica.stop()
+            mock_db.reference.return_value.listen.return_value.close.assert_called_once()
+
+    def test_local_writes_are_visible_immediately(self):
+        """Test apply() updates the copy before the next poll."""
+        replica = FirebaseReplica('Fantasy/settings', poll_seconds=60)
+        with patch('firebase_replica.db') as mock_db:
+            mock_db.reference.return_value.get.return_value = {'team_lock': False}
+            replica.get()
+
+            replica.apply(True, 'team_lock')
+
+            assert replica.get() == {'team_lock': True}
+            assert mock_db.reference.return_value.get.call_count == 1
+
+
+def _points_data(path):
+    if path.endswith('player_match_stats.csv'):
+        return pd.DataFrame({
+            'Name': ['Fay Forward', 'Gia Keeper', 'Fay Forward', 'Fox Forward', 'Mia Middle'],
+            'Season': [7, 7, 7, 7, 7],
+            'Match ID': [0, 0, 1, 0, 1],
+            'My Team': ['AAA', 'AAA', 'AAA', 'BBB', 'AAA'],
+            # Mia's row was synced from the entry form, which records no start or position
+            'Start?': ['Y', 'Y', 'Y', '0', None],
+            'P': ['F', 'GK', 'F', '-', None],
+            'Y-R': ['0-0', '0-0', '0-0', '0-0', '0-0'],
+            'POTM': [0, 1, 0, 0, 0],
+            'G': [1, 0, 0, 0, 1], 'A': [0, 0, 0, 0, 0], 'S': [0, 4, 0, 0, 0],
+        })
+    if path.endswith('Match_Results.csv'):
+        return pd.DataFrame({
+            'Team 1': ['AAA', 'AAA'], 'Team 2': ['BBB', 'CCC'], 'Match ID': [0, 1],
+            'Score Team 1': ['2', '1'], 'Score Team 2': ['0', '1'],
+            'Win Team 1': [1, 0], 'Win Team 2': [0, 0],
+        })
+    if path.endswith('matchweeks.csv'):
+        return pd.DataFrame({'MW': [1], 'Start ID': [0], 'End ID': [1], 'Season': [7]})
+    return _fantasy_data()
+
+
+@pytest.mark.unit
+class TestPointsCalculator:
+    """Tests for the indexed, memoized fantasy points calculator."""
+
+    @pytest.fixture
+    def calculator(self):
+        from models.fantasy import FantasyPointsCalculator
+        with patch('models.fantasy.read_dataset', side_effect=_points_data):
+            yield FantasyPointsCalculator()
+
+    def test_matchweek_breakdown(self, calculator):
+        """Test per-player totals and per-match results for a matchweek."""
+        fay = calculator.matchweek_breakdown(7, 1)['Fay Forward']
+
+        # Goal, start, win and clean sheet, then a start in the draw
+        assert [m['total'] for m in fay['matches']] == [6, 1]
+        assert [m['match_id'] for m in fay['matches']] == [0, 1]
+        assert (fay['total'], fay['matches_played'], fay['team']) == (7, 2, 'AAA')
+        assert 'Fox Forward' not in calculator.matchweek_breakdown(7, 1)
+
+    def test_row_without_position_uses_primary_position_and_no_start(self, calculator):
+        """Test a synced row with blank P and Start? is scored at the primary position without a start bonus."""
+        mia = calculator.matchweek_breakdown(7, 1)['Mia Middle']
+
+        assert (mia['total'], mia['position'], mia['matches'][0]['start']) == (4, 'M', 0)
+
+    def test_matchweek_scored_once(self, calculator):
+        """Test repeated lookups share one computed breakdown."""
+        first = calculator.matchweek_breakdown(7, 1)
+
+        assert calculator.matchweek_breakdown(7, 1) is first
+        assert 'matches' not in calculator.bulk_compute_all_player_points(7, 1)['Fay Forward']
+
+    def test_user_points_use_captain_multiplier(self, calculator):
+        """Test a user's matchweek total doubles the captain's points."""
+        breakdown = calculator.calculate_user_matchweek_points(
+            ['Fay Forward', 'Gia Keeper', 'Dee Back'], 'Fay Forward', 7, 1
+        )
+
+        assert breakdown['players']['Fay Forward']['points'] == 14
+        assert breakdown['players']['Dee Back']['points'] == 0
+        assert breakdown['total'] == 14 + calculator.matchweek_breakdown(7, 1)['Gia Keeper']['total']
+
+    def test_preview_all_users_applies_snapshots_and_captains(self, calculator):
+        """Test the bulk preview scores snapshots over current teams and skips incomplete teams."""
+        team = ['Fay Forward', 'Gia Keeper', 'Dee Back', 'Dan Back', 'Mia Middle']
+        users = {
+            'u1': {'username': 'one', 'current_team': team, 'captain': 'Fay Forward'},
+            'u2': {'username': 'two', 'current_team': team, 'captain': 'Dee Back'},
+            'u3': {'username': 'three', 'current_team': team[:3]},
+        }
+        snapshots = {'u2': {'S7_MW1': {'team': team, 'captain': 'Gia Keeper'}}}
+        gia = calculator.matchweek_breakdown(7, 1)['Gia Keeper']['total']
+        mia = calculator.matchweek_breakdown(7, 1)['Mia Middle']['total']
+
+        preview = {r['user_id']: r for r in calculator.preview_all_users(7, 1, users, snapshots)}
+
+        assert set(preview) == {'u1', 'u2'}
+        assert preview['u1']['week_points'] == 14 + gia + mia
+        assert preview['u2']['week_points'] == 7 + 2 * gia + mia
+        assert preview['u2']['breakdown']['Gia Keeper'] == {'points': 2 * gia, 'is_captain': True}
+
+    def test_points_distribution(self):
+        """Test summary statistics of week points."""
+        from models.fantasy import points_distribution
+        stats = points_distribution([10, 20, 30, 40])
+
+        assert (stats['users'], stats['total'], stats['min'], stats['max']) == (4, 100, 10, 40)
+        assert stats['mean'] == 25 and stats['median'] == 25
+        assert points_distribution([])['users'] == 0
+
+    def test_shared_calculator_follows_data_version(self):
+        """Test the shared calculator is reused until the data version changes."""
+        import data_store
+        from models.fantasy import get_points_calculator, points_cache
+        points_cache.invalidate()
+        with patch('models.fantasy.read_dataset', side_effect=_points_data):
+            first = get_points_calculator()
+            assert get_points_calculator() is first
+
+            data_store.bump_data_version()
+            assert get_points_calculator() is not first
+        points_cache.invalidate()
+
+
+class _FakeFirebase:
+    """Minimal in-memory Realtime Database: get, set, update (multi-path, increments), transaction."""
+
+    def __init__(self, data=None, fail_update=None):
+        self.data = data or {}
+        # Called with each update's or transaction's paths; raise from it to simulate a failed write
+        self.fail_update = fail_update
+
+    def reference(self, path='/'):
+        return SimpleNamespace(
+            get=lambda shallow=False: self._get(path, shallow),
+            set=lambda value: self._write(path, value),
+            update=lambda values: self._update(path, values),
+            transaction=lambda update: self._transaction(path, update),
+        )
+
+    def _parts(self, path):
+        return [part for part in path.split('/') if part]
+
+    def _get(self, path, shallow=False):
+        node = self.data
+        for part in self._parts(path):
+            node = node.get(part) if isinstance(node, dict) else None
+        if shallow and isinstance(node, dict):
+            return {key: True for key in node}
+        return node
+
+    def _write(self, path, value):
+        parts = self._parts(path)
+        node = self.data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        if isinstance(value, dict) and '.sv' in value:
+            value = (node.get(parts[-1]) or 0) + value['.sv']['increment']
+        node[parts[-1]] = value
+
+    def _transaction(self, path, update):
+        if self.fail_update:
+            self.fail_update([path])
+        value = update(copy.deepcopy(self._get(path)))
+        self._write(path, value)
+        return value
+
+    def _update(self, path, values):
+        if self.fail_update:
+            self.fail_update(list(values))
+        for key, value in values.items():
+            self._write(f"{path}/{key}", value)
+
+
+@pytest.mark.unit
+class TestMatchweekProcessing:
+    """Tests for ledger-backed, chunked matchweek processing."""
+
+    TEAM = ['Fay Forward', 'Gia Keeper', 'Dee Back', 'Dan Back', 'Mia Middle']
+
+    @pytest.fixture
+    def calculator(self):
+        from models.fantasy import FantasyPointsCalculator
+        with patch('models.fantasy.read_dataset', side_effect=_points_data), \
+             patch('models.fantasy.PROCESS_CHUNK_SIZE', 1):
+            yield FantasyPointsCalculator()
+
+    def _users(self):
+        return {
+            f'u{i}': {'username': f'user{i}', 'current_team': self.TEAM, 'captain': 'Fay Forward',
+                      'total_points': 10, 'season_points': {'6': 10}}
+            for i in range(4)
+        }
+
+    def test_retry_after_partial_failure_counts_each_user_once(self, calculator):
+        """Test a failed chunk is retried on the next run and committed users are not re-added."""
+        def fail_u2(paths):
+            if any(path.startswith('Fantasy/Users/u2') for path in paths):
+                raise ConnectionError("write failed")
+
+        fake = _FakeFirebase({'Fantasy': {'Users': self._users()}}, fail_update=fail_u2)
+        with patch('models.fantasy.db', fake):
+            first = calculator.process_all_users_matchweek(7, 1)
+            week_points = first['user_results'][0]['week_points']
+
+            assert first['processed_count'] == 3
+            assert [e['user_id'] for e in first['errors']] == ['u2']
+            assert fake.data['Fantasy']['Users']['u2']['total_points'] == 10
+            assert fake.data['Fantasy']['ProcessingRuns']['S7_MW1']['status'] == 'failed'
+
+            fake.fail_update = None
+            second = calculator.process_all_users_matchweek(7, 1)
+            third = calculator.process_all_users_matchweek(7, 1)
+
+        assert (second['processed_count'], second['already_processed']) == (1, 3)
+        assert (third['processed_count'], third['already_processed']) == (0, 4)
+        for user in fake.data['Fantasy']['Users'].values():
+            assert user['total_points'] == 10 + week_points
+            assert user['season_points'] == {'6': 10, '7': week_points}
+        assert fake.data['Fantasy']['UserHistory']['u2']['S7_MW1']['points'] == week_points
+        assert fake.data['Fantasy']['ProcessingRuns']['S7_MW1']['status'] == 'complete'
+
+    def test_user_resaved_before_failed_commit_is_credited_once(self, calculator):
+        """Test a user claimed by a run whose commit failed, then re-saved, is credited once by the retry."""
+        def resave_then_fail(paths):
+            if any(path.startswith('Fantasy/Users/u2/') for path in paths):
+                # The user saves their team (FantasyUser.save_to_firebase replaces the node) before the write fails
+                fake.data['Fantasy']['Users']['u2'] = dict(self._users()['u2'], free_transfers=1)
+                raise ConnectionError("write failed")
+
+        fake = _FakeFirebase({'Fantasy': {'Users': self._users()}}, fail_update=resave_then_fail)
+        with patch('models.fantasy.db', fake):
+            first = calculator.process_all_users_matchweek(7, 1)
+            assert isinstance(fake.data['Fantasy']['ProcessingRuns']['S7_MW1']['users']['u2'], dict)
+
+            fake.fail_update = None
+            second = calculator.process_all_users_matchweek(7, 1)
+            third = calculator.process_all_users_matchweek(7, 1)
+
+        week_points = first['user_results'][0]['week_points']
+        assert [e['user_id'] for e in first['errors']] == ['u2']
+        assert (second['processed_count'], third['processed_count'], third['already_processed']) == (1, 0, 4)
+        assert fake.data['Fantasy']['Users']['u2']['total_points'] == 10 + week_points
+        assert fake.data['Fantasy']['ProcessingRuns']['S7_MW1']['users']['u2'] == week_points
+
+    def test_running_matchweek_is_refused_until_its_claim_is_stale(self, calculator):
+        """Test a run claimed by another worker is refused, and taken over once the claim is stale."""
+        import time
+        from models.fantasy import ProcessingRunActive, PROCESS_RUN_STALE_SECONDS
+        claim = {'token': 'other', 'claimed_at': time.time()}
+        fake = _FakeFirebase({'Fantasy': {'Users': self._users(),
+                                          'ProcessingRuns': {'S7_MW1': {'status': 'running', 'claim': claim}}}})
+        with patch('models.fantasy.db', fake):
+            with pytest.raises(ProcessingRunActive):
+                calculator.process_all_users_matchweek(7, 1)
+            assert all(user['total_points'] == 10 for user in fake.data['Fantasy']['Users'].values())
+
+            claim['claimed_at'] -= PROCESS_RUN_STALE_SECONDS + 1
+            result = calculator.process_all_users_matchweek(7, 1)
+
+        run = fake.data['Fantasy']['ProcessingRuns']['S7_MW1']
+        assert result['processed_count'] == 4
+        assert (run['status'], run['claim']) == ('complete', None)
+
+
+@pytest.mark.unit
+class TestLivePoints:
+    """Tests for provisional points recorded as matches are submitted."""
+
+    MATCH = {
+        'match_id': 1, 'season': 7, 'team1': 'AAA', 'team2': 'CCC', 'score1': 2, 'score2': 0,
+        'player_stats': [
+            {'player': 'Fay Forward', 'team': 'AAA', 'goals': 1, 'assists': 0,
+             'yellow_cards': 0, 'red_cards': 0, 'is_potm': True},
+            {'player': 'Dee Back', 'team': 'CCC', 'goals': 0, 'assists': 0,
+             'yellow_cards': 1, 'red_cards': 0, 'is_potm': False},
+        ],
+        'external_subs': [],
+    }
+
+    def test_submitted_match_updates_players_and_owners_once(self):
+        """Test a match adds its players' points and owners' totals, and only once."""
+        from models.fantasy import FantasyPointsCalculator, LivePoints
+        team = ['Fay Forward', 'Gia Keeper', 'Dee Back', 'Dan Back', 'Mia Middle']
+        fake = _FakeFirebase({'Fantasy': {'Users': {
+            'u1': {'current_team': team, 'captain': 'Fay Forward'},
+            'u2': {'current_team': team, 'captain': 'Dee Back'},
+            'u3': {'current_team': team[:3], 'captain': 'Fay Forward'},
+        }}})
+        with patch('models.fantasy.read_dataset', side_effect=_points_data), \
+             patch('models.fantasy.db', fake), patch('firebase_reads.db', fake):
+            calculator = FantasyPointsCalculator()
+            live = LivePoints()
+            recorded = live.record_match(self.MATCH, calculator)
+            assert live.record_match(self.MATCH, calculator) is None
+
+            players = live.player_points(7, 1)
+            # Goal, POTM, win and clean sheet for a forward; a yellow for the losing defender
+            assert players['Fay Forward']['total'] == 3 + 3 + 1 + 1
+            assert players['Dee Back']['total'] == -2
+            assert players['Fay Forward']['matches_played'] == 1
+            assert (recorded['matchweek'], recorded['users']) == (1, 2)
+            assert live.user_points(7, 1, 'u1') == 2 * 8 - 2
+            assert live.user_points(7, 1, 'u2') == 8 - 4
+            assert live.user_points(7, 1, 'u3') is None
+
+    def test_match_submitted_twice_at_once_is_counted_once(self):
+        """Test a second submission arriving while the first is being written finds the match claimed."""
+        from models.fantasy import FantasyPointsCalculator, LivePoints
+        team = ['Fay Forward', 'Gia Keeper', 'Dee Back', 'Dan Back', 'Mia Middle']
+        fake = _FakeFirebase({'Fantasy': {'Users': {'u1': {'current_team': team, 'captain': 'Fay Forward'}}}})
+        concurrent = []
+
+        def resubmit(paths):
+            if len(paths) > 1 and not concurrent:
+                concurrent.append(live.record_match(self.MATCH, calculator))
+
+        with patch('models.fantasy.read_dataset', side_effect=_points_data), \
+             patch('models.fantasy.db', fake), patch('firebase_reads.db', fake):
+            calculator = FantasyPointsCalculator()
+            live = LivePoints()
+            fake.fail_update = resubmit
+            assert live.record_match(self.MATCH, calculator) is not None
+
+            assert concurrent == [None]
+            assert live.player_points(7, 1)['Fay Forward']['matches_played'] == 1
+            assert live.user_points(7, 1, 'u1') == 2 * 8 - 2
+
+    def test_firebase_keys_are_safe_and_distinct(self):
+        """Test every forbidden key character is encoded without two names sharing a key."""
+        from models.fantasy import firebase_key
+        names = ['J.R. Smith', 'J_R_ Smith', 'A$B#C[1]/2', 'Half%2E']
+
+        keys = [firebase_key(name) for name in names]
+
+        assert len(set(keys)) == len(names)
+        assert not any(char in key for key in keys for char in '.$#[]/')
+        assert firebase_key('Fay Forward') == 'Fay Forward'
+
+
+def _prediction(pred_id, user_id, match_id, home, away):
+    return {'user_id': user_id, 'username': user_id.upper(), 'match_id': match_id, 'home_team': 'AAA',
+            'away_team': 'BBB', 'predicted_home_score': home, 'predicted_away_score': away,
+            'predicted_at': f'2026-01-0{pred_id[-1]}', 'points_earned': 0, 'is_processed': False}
+
+
+@pytest.mark.unit
+class TestPredictionScoring:
+    """Tests for storing match predictions and scoring them in batches."""
+
+    def test_batch_scores_and_updates_leaderboard_once(self):
+        """Test points, index copies and leaderboard totals are written in one update, and only once."""
+        from models.fantasy import MatchPrediction
+        predictions = {
+            'p1': _prediction('p1', 'u1', '10', 2, 1),
+            'p2': _prediction('p2', 'u2', '10', 1, 0),
+            'p3': _prediction('p3', 'u1', '11', 0, 3),
+            'p4': _prediction('p4', 'u2', '12', 1, 1),
+        }
+        fake = _FakeFirebase({
+            'MatchPredictions': {
+                '10': {key: predictions[key] for key in ('p1', 'p2')},
+                '11': {'p3': predictions['p3']},
+                '12': {'p4': predictions['p4']},
+            },
+            'PredictionStats': {'u1': {'username': 'U1', 'total_points': 4, 'total_predictions': 2}},
+        })
+        updates = []
+        fake.fail_update = updates.append
+        completed = [{'match_id': '10', 'home_score': 2, 'away_score': 1},
+                     {'match_id': '11', 'home_score': 1, 'away_score': 1},
+                     {'match_id': '99', 'home_score': 0, 'away_score': 0}]
+
+        with patch('models.fantasy.db', fake):
+            result = MatchPrediction.process_completed_matches(completed)
+            again = MatchPrediction.process_completed_matches(completed)
+
+        assert (result['matches'], result['processed_count'], result['total_points_awarded']) == (2, 3, 11)
+        assert again['processed_count'] == 0 and len(updates) == 1
+        assert fake.data['Predictions']['p1']['points_earned'] == 8
+        assert fake.data['UserPredictions']['u2']['10']['points_earned'] == 3
+        assert fake.data['MatchPredictions']['11']['p3']['is_processed'] is True
+        assert fake.data['MatchPredictions']['12']['p4']['is_processed'] is False
+        assert fake.data['PredictionStats']['u1'] == {
+            'username': 'U1', 'total_points': 12, 'total_predictions': 4, 'correct_results': 1, 'exact_scores': 1}
+        assert fake.data['PredictionStats']['u2']['total_points'] == 3
+
+    def test_batch_scores_unindexed_legacy_predictions_until_backfill(self):
+        """Test legacy predictions are scored before the backfill, and matches without predictions stay unprocessed."""
+        from models.fantasy import MatchPrediction
+        fake = _FakeFirebase({
+            'Predictions': {'old1': _prediction('p1', 'u1', '10', 2, 1), 'new': _prediction('p2', 'u2', '10', 0, 1)},
+            'MatchPredictions': {'10': {'new': _prediction('p2', 'u2', '10', 0, 1)}},
+        })
+        completed = [{'match_id': '10', 'home_score': 2, 'away_score': 1},
+                     {'match_id': '11', 'home_score': 0, 'away_score': 0}]
+
+        with patch('models.fantasy.db', fake), patch('firebase_replica.db', fake), \
+             patch('models.fantasy.settings_replica', FirebaseReplica('Fantasy/settings', poll_seconds=0)):
+            result = MatchPrediction.process_completed_matches(completed)
+
+        assert (result['matches'], result['processed_count'], result['total_points_awarded']) == (1, 2, 8)
+        assert fake.data['MatchPredictions']['10']['old1']['points_earned'] == 8
+        assert fake.data['PredictionStats']['u1']['total_points'] == 8
+        assert set(fake.data['PredictionsProcessed']) == {'10'}
+
+    def test_save_and_backfill_write_indexes_then_stop_scans(self):
+        """Test saves are one update, and a backfill indexes legacy records and turns off full scans."""
+        from models.fantasy import MatchPrediction, backfill_prediction_indexes
+        fake = _FakeFirebase({'Predictions': {
+            'old1': _prediction('p1', 'u1', '10', 2, 1),
+            'old2': _prediction('p2', 'u1', '11', 0, 0),
+        }})
+        updates = []
+        fake.fail_update = updates.append
+        with patch('models.fantasy.db', fake), patch('firebase_replica.db', fake), \
+             patch('models.fantasy.settings_replica', FirebaseReplica('Fantasy/settings', poll_seconds=0)):
+            # Before the backfill, legacy records are still found by scanning
+            assert MatchPrediction.get_user_prediction_for_match('u1', '11').prediction_id == 'old2'
+
+            MatchPrediction.from_record('new', _prediction('p3', 'u2', '10', 1, 1)).save_to_firebase()
+            assert len(updates) == 1 and fake.data['UserPredictions']['u2']['10']['prediction_id'] == 'new'
+
+            result = backfill_prediction_indexes()
+            assert result == {'predictions': 3, 'index_entries': 6}
+            assert [p.prediction_id for p in MatchPrediction.get_user_predictions('u1')] == ['old2', 'old1']
+            assert {p.prediction_id for p in MatchPrediction.get_match_predictions('10')} == {'old1', 'new'}
+
+            del fake.data['UserPredictions']['u1']
+            assert MatchPrediction.get_user_predictions('u1') == []
+            assert fake.data['Fantasy']['settings']['predictions_indexed'] is True
@@ -0,0 +1,147 @@
+"""
+Unit tests for the background job runner in jobs.py
+"""
+
+import threading
+import pytest
+import jobs
+from jobs import JobRunner, JobConflict, FirebaseJobLock
+
+
+class _FakeLockDb:
+    """Just enough of firebase_admin.db for lock transactions."""
+
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def reference(self, path):
+        db = self
+
+        class _Ref:
+            def transaction(self, update):
+                with db._lock:
+                    db.data[path] = update(db.data.get(path))
+                    return db.data[path]
+
+        return _Ref()
+
+
+@pytest.mark.unit
+class TestJobRunner:
+    """Tests for queued admin jobs and their progress reports."""
+
+    def test_job_reports_progress_counts_and_errors(self):
+        """Test a job's progress, named counts, errors and message are recorded."""
+        runner = JobRunner()
+
+        def work(job, users):
+            job.start(len(users))
+            for user in users:
+                if user == 'bad':
+                    job.error("missing team", user)
+                    job.advance()
+                else:
+                    job.advance(reset=1)
+            return f"Reset {len(users) - 1} users"
+
+        job = runner.submit('reset', work, ['a', 'b', 'bad'], description="Reset users")
+        assert runner.wait(job.id, timeout=5)
+
+        status = job.to_dict()
+        assert status['status'] == 'succeeded'
+        assert status['done'] == status['total'] == 3
+        assert status['percent'] == 100.0
+        assert status['counts'] == {'reset': 2}
+        assert status['errors'] == [{'item': 'bad', 'error': 'missing team'}]
+        assert status['message'] == "Reset 2 users"
+
+    def test_one_active_job_per_kind(self):
+        """Test a second job of a running kind is refused while other kinds still run."""
+        runner = JobRunner()
+        release = threading.Event()
+        first = runner.submit('snapshot', lambda job: release.wait(5))
+
+        with pytest.raises(JobConflict) as conflict:
+            runner.submit('snapshot', lambda job: None)
+        assert conflict.value.job is first
+
+        other = runner.submit('reset', lambda job: "done")
+        assert runner.wait(other.id, timeout=5)
+        assert other.status == 'succeeded'
+
+        release.set()
+        assert runner.wait(first.id, timeout=5)
+        again = runner.submit('snapshot', lambda job: None)
+        assert runner.wait(again.id, timeout=5)
+
+    def test_failed_job_records_error_and_publishes(self):
+        """Test an exception fails the job and every state change is published."""
+        published = []
+        runner = JobRunner(publish=lambda job: published.append(job.status))
+
+        def broken(job):
+            raise ValueError("Firebase unavailable")
+
+        job = runner.submit('process', broken)
+        assert runner.wait(job.id, timeout=5)
+
+        assert job.status == 'failed'
+        assert job.message == "Firebase unavailable"
+        assert published[0] == 'queued'
+        assert published[-1] == 'failed'
+        assert runner.get(job.id) is job
+
+    def test_one_active_job_per_kind_across_processes(self, monkeypatch):
+        """Test runners in different worker processes share the per-kind lock, which is freed on failure."""
+        fake = _FakeLockDb()
+        monkeypatch.setattr(jobs, 'db', fake)
+        worker1, worker2 = JobRunner(lock=FirebaseJobLock()), JobRunner(lock=FirebaseJobLock())
+        release = threading.Event()
+
+        def broken(job):
+            release.wait(5)
+            raise ValueError("Firebase unavailable")
+
+        first = worker1.submit('process', broken)
+        with pytest.raises(JobConflict) as conflict:
+            worker2.submit('process', lambda job: None)
+        assert conflict.value.job.id == first.id
+        assert fake.data['AdminJobs/active/process']['id'] == first.id
+
+        release.set()
+        assert worker1.wait(first.id, timeout=5) and first.status == 'failed'
+        assert fake.data['AdminJobs/active/process'] is None
+        again = worker2.submit('process', lambda job: "done")
+        assert worker2.wait(again.id, timeout=5) and again.status == 'succeeded'
+
+    def test_slow_lock_does_not_block_status_reads(self):
+        """Test a submit waiting on the cross-process lock leaves get() and recent() free."""
+        slow, acquiring, release = threading.Event(), threading.Event(), threading.Event()
+
+        class _SlowLock:
+            def acquire(self, job):
+                if slow.is_set():
+                    acquiring.set()
+                    release.wait(5)
+                return None
+
+            def release(self, job):
+                pass
+
+        runner = JobRunner(lock=_SlowLock())
+        done = runner.submit('reset', lambda job: "done")
+        assert runner.wait(done.id, timeout=5)
+        slow.set()
+        submitter = threading.Thread(target=lambda: runner.submit('reset', lambda job: "again"))
+        submitter.start()
+        assert acquiring.wait(5)
+
+        reader = threading.Thread(target=lambda: (runner.get(done.id), runner.recent()))
+        reader.start()
+        reader.join(1)
+        assert not reader.is_alive()
+
+        release.set()
+        submitter.join(5)
+        assert len(runner.recent()) == 2
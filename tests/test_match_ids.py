@@ -0,0 +1,64 @@
+"""
+Unit tests for match ID allocation in match_ids.py
+"""
+
+import threading
+import pytest
+import match_ids
+from match_ids import MatchIdAllocator, InMemoryMatchIdAllocator
+
+
+class _FakeCounterDb:
+    """Just enough of firebase_admin.db for a counter transaction."""
+
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def reference(self, path):
+        db = self
+
+        class _Ref:
+            def transaction(self, update):
+                with db._lock:
+                    db.data[path] = update(db.data.get(path))
+                    return db.data[path]
+
+        return _Ref()
+
+
+@pytest.mark.unit
+class TestMatchIdAllocator:
+    """Tests for handing out match IDs from a counter."""
+
+    def test_counter_seeded_once_then_incremented(self, monkeypatch):
+        """Test the first allocation seeds from existing matches and later ones only increment."""
+        fake = _FakeCounterDb()
+        monkeypatch.setattr(match_ids, 'db', fake)
+        seeds = []
+        allocator = MatchIdAllocator(seed=lambda: seeds.append(1) or 120)
+
+        assert allocator.allocate() == 121
+        assert allocator.allocate(3) == 122
+        assert allocator.allocate() == 125
+        assert len(seeds) == 1
+        assert fake.data[match_ids.MATCH_ID_COUNTER_PATH] == 125
+
+    def test_concurrent_allocations_are_distinct(self):
+        """Test IDs allocated from many threads never repeat."""
+        allocator = InMemoryMatchIdAllocator(last_id=10)
+        allocated = []
+
+        def submit():
+            for _ in range(50):
+                allocated.append(allocator.allocate())
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(allocated) == list(range(11, 411))
+        with pytest.raises(ValueError):
+            allocator.allocate(0)
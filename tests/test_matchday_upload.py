@@ -0,0 +1,62 @@
+"""
+Unit tests for whole-matchday uploads in matchday_upload.py
+"""
+
+import pytest
+from matchday_upload import parse_matchday, validate_matchday, build_match_entry
+
+MATCHDAY_CSV = (
+    "Match,Team 1,Team 2,Score 1,Score 2,Group,Name,Team,Goals,Assists,Saves,Yellow,Red,POTM,External\n"
+    "1,AAA,BBB,2,1,A,Ann Able,AAA,2,0,0,0,0,Y,\n"
+    "1,AAA,BBB,2,1,A,Bo Bell,BBB,1,0,4,1,0,,\n"
+    "1,AAA,BBB,2,1,A,Sam Sub,BBB,0,0,0,0,1,,Y\n"
+    "2,CCC,DDD,0,0,B,,,,,,,,,\n"
+)
+TEAMS = ['AAA', 'BBB', 'CCC', 'DDD']
+ROSTERS = {'AAA': ['Ann Able'], 'BBB': ['Bo Bell'], 'CCC': [], 'DDD': []}
+
+
+@pytest.mark.unit
+class TestMatchdayUpload:
+    """Tests for parsing and validating a matchday upload."""
+
+    def test_csv_upload_becomes_match_entries(self):
+        """Test CSV rows are grouped into matches with POTM and external subs, then into entries."""
+        matches = parse_matchday('md4.csv', MATCHDAY_CSV.encode('utf-8-sig'))
+
+        assert [(m['team1'], m['team2']) for m in matches] == [('AAA', 'BBB'), ('CCC', 'DDD')]
+        assert validate_matchday(matches, TEAMS, ROSTERS) == []
+        entry = build_match_entry(matches[0], 101, 4, 3, 'admin@example.com')
+        assert (entry['match_id'], entry['score1'], entry['potm']) == (101, 2, 'Ann Able')
+        assert [p['player'] for p in entry['player_stats']] == ['Ann Able', 'Bo Bell']
+        assert entry['external_subs'][0]['is_external'] and entry['external_subs'][0]['red_cards'] == 1
+        assert build_match_entry(matches[1], 102, 4, 3, 'admin@example.com')['player_stats'] == []
+
+    def test_csv_rows_without_match_label_are_rejected(self):
+        """Test rows with a blank Match label are refused rather than grouped into one match."""
+        unlabelled = MATCHDAY_CSV + " ,EEE,FFF,1,0,B,,,,,,,,,\n"
+
+        with pytest.raises(ValueError, match="row\\(s\\) 6"):
+            parse_matchday('md4.csv', unlabelled.encode('utf-8'))
+
+    def test_validation_reports_every_problem(self):
+        """Test all invalid matches and player rows are reported, not just the first."""
+        matches = [
+            {'team1': 'AAA', 'team2': 'ZZZ', 'score1': 1, 'score2': 'x', 'group': 'A',
+             'player_stats': [{'name': 'Ann Able', 'team': 'CCC'},
+                              {'name': 'Nobody', 'team': 'AAA', 'goals': -1},
+                              {'name': 'New Player', 'team': 'AAA', 'is_manual': True}]},
+            {'team1': 'CCC', 'team2': 'CCC', 'score1': 0, 'score2': 0},
+        ]
+
+        errors = validate_matchday(matches, TEAMS, ROSTERS)
+
+        assert "Match 1: score2 must be a whole number" in errors
+        assert "Match 1: unknown team ZZZ" in errors
+        assert "Match 1: Ann Able is not on a team in this match" in errors
+        assert "Match 1: Nobody is not on the AAA roster" in errors
+        assert "Match 1: Nobody has an invalid stat" in errors
+        assert "Match 2: missing group" in errors
+        assert "Match 2: a team cannot play itself" in errors
+        assert not any('New Player' in error for error in errors)
+        assert validate_matchday([], TEAMS, ROSTERS) == ["No matches in upload"]
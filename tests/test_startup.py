@@ -0,0 +1,102 @@
+"""
+Startup tests: importing the application must stay cheap and must not read data
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous budget for a cold interpreter; data loading used to push well past it
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "10"))
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+
+import pandas as pd
+import data_store
+
+def fail(*args, **kwargs):
+    raise AssertionError("data was loaded at import time")
+
+pd.read_csv = fail
+data_store.read_dataset = fail
+
+import app
+print(time.perf_counter() - start)
+"""
+
+
+def _run_import():
+    env = {k: v for k, v in os.environ.items() if k != "FIREBASE_CONFIG"}
+    return subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+@pytest.mark.unit
+class TestImportTime:
+    """Tests for import-free application startup."""
+
+    def test_app_imports_without_loading_data_or_firebase(self):
+        """Test importing app.py reads no CSVs and needs no Firebase credentials."""
+        result = _run_import()
+
+        assert result.returncode == 0, result.stderr
+
+    def test_import_within_budget(self):
+        """Test importing app.py stays within the import-time budget."""
+        result = _run_import()
+        assert result.returncode == 0, result.stderr
+
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        assert elapsed < IMPORT_BUDGET_SECONDS
+
+
+@pytest.mark.unit
+class TestWarmup:
+    """Tests for the startup warmup runner."""
+
+    def test_phases_run_in_order_and_are_timed(self):
+        """Test each phase finishes before the next and failures are reported."""
+        from warmup import run_warmup
+        calls = []
+
+        def failing():
+            raise ValueError("missing file")
+
+        report = run_warmup([
+            {'a': lambda: calls.append('a'), 'b': lambda: calls.append('b')},
+            {'c': lambda: calls.append('c'), 'broken': failing},
+        ])
+
+        assert sorted(calls[:2]) == ['a', 'b']
+        assert calls[2] == 'c'
+        assert report['ok'] is False
+        assert report['tasks']['broken']['error'] == 'missing file'
+        assert set(report['tasks']) == {'a', 'b', 'c', 'broken'}
+        assert report['duration_ms'] >= 0
+
+
+@pytest.mark.unit
+class TestProcessMemory:
+    """Tests for the per-worker memory report."""
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="requires /proc")
+    def test_reports_resident_memory(self):
+        """Test the current process reports a positive RSS in MB."""
+        from server import process_memory
+        memory = process_memory()
+
+        assert memory['rss_mb'] > 0
+        assert memory['rss_anon_mb'] <= memory['rss_mb']
+
+    def test_unknown_process_reports_nothing(self):
+        """Test a missing process yields an empty report instead of an error."""
+        from server import process_memory
+
+        assert process_memory('no-such-pid') == {}
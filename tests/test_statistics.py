@@ -0,0 +1,142 @@
+"""
+Unit tests for the statistics aggregates (season_aggregates.py) and archive snapshots (archive_snapshots.py)
+"""
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from season_aggregates import build_season_aggregates, derive_seasons, split_career_stats
+
+
+def _frames():
+    player_stats = pd.DataFrame({
+        'Name': ['Ann', 'Ben', 'Ann', 'Ben'],
+        'Season': [1, 1, 2, 2],
+        'Goals': [3, 1, 4, 0],
+        'Assists': [1, 2, 0, 1],
+        'Saves': [0, 10, 0, 12],
+        'POTM': [1, 0, 0, 1],
+        'MP': [5, 5, 4, 4],
+        'Team': ['AAA', 'BBB', 'CCC', 'BBB']
+    })
+    team_standings = pd.DataFrame({
+        'Team': ['AAA', 'BBB', 'CCC', 'BBB'],
+        'Season': [1, 1, 2, 2],
+        'MP': [2, 2, 1, 1], 'W': [2, 0, 1, 0], 'D': [0, 0, 0, 0], 'L': [0, 2, 0, 1],
+        'GF': [5, 1, 3, 1], 'GA': [1, 5, 1, 3], 'PTS': [6, 0, 3, 0]
+    })
+    match_results = pd.DataFrame({
+        'Team 1': ['AAA', 'AAA', 'CCC'],
+        'Team 2': ['BBB', 'BBB', 'BBB'],
+        'Season': [1, 1, 2],
+        'Group': ['A', 'Playoff', 'A'],
+        'Match ID': [1, 2, 3],
+        'Score Team 1': ['3', '2(4)', '3'],
+        'Score Team 2': ['1', '2(3)', '1'],
+        'Win Team 1': [1, 1, 1]
+    })
+    team_ratings = pd.DataFrame({'Name': ['AAA', 'BBB', 'CCC'], 'Rating': [80, 70, 75]})
+    player_ratings = pd.DataFrame({'Name': ['Ann', 'Ben'], 'OVR Rating': [72, 88]})
+    return {
+        'player_stats': player_stats,
+        'team_standings': team_standings,
+        'team_ratings': team_ratings,
+        'player_ratings': player_ratings,
+        'match_results': match_results,
+    }
+
+
+@pytest.mark.unit
+class TestSeasonAggregates:
+    """Tests for the precomputed dashboard aggregates."""
+
+    def test_seasons_derived_from_data(self):
+        """Test the season list comes from the data, not a fixed range."""
+        frames = _frames()
+        assert derive_seasons(frames['team_standings'], frames['match_results']) == [1, 2]
+
+    def test_career_totals_summed_without_total_rows(self):
+        """Test career rows are summed per player when no 'Total' rows exist."""
+        _, career = split_career_stats(_frames()['player_stats'])
+        ann = career[career['Name'] == 'Ann'].iloc[0]
+
+        assert ann['Goals'] == 7
+        assert ann['Team'] == 'CCC'
+
+    def test_leaders_by_season(self):
+        """Test season and all-time leaders are precomputed."""
+        aggregates = build_season_aggregates(**_frames())
+
+        assert aggregates['all_time_leaders']['goals'][0]['Name'] == 'Ann'
+        assert aggregates['season_leaders']['2']['saves'][0]['Name'] == 'Ben'
+        assert aggregates['team_comparison'][1][0]['Team'] == 'AAA'
+
+    def test_in_progress_season_has_no_champion(self):
+        """Test a season without playoff games is still summarized."""
+        comparison = build_season_aggregates(**_frames())['season_comparison']
+
+        assert [row['champion'] for row in comparison] == ['AAA', 'N/A']
+        assert comparison[0]['total_goals'] == 8
+
+    def test_aggregates_built_once_per_data_version_in_shared_cache(self):
+        """Test aggregates are cached per data version and reported in cache_stats."""
+        from caching import cache_stats
+        from season_aggregates import get_season_aggregates, aggregates_cache
+        loads = []
+        aggregates_cache.invalidate()
+
+        def load_frames():
+            loads.append(1)
+            return _frames()
+
+        with patch('caching.get_data_version', return_value='v1'):
+            first = get_season_aggregates(load_frames)
+            assert get_season_aggregates(load_frames) is first
+        with patch('caching.get_data_version', return_value='v2'):
+            get_season_aggregates(load_frames)
+
+        assert len(loads) == 2
+        assert 'season_aggregates' in [cache['name'] for cache in cache_stats()['caches']]
+        aggregates_cache.invalidate()
+
+
+@pytest.mark.unit
+class TestArchiveSnapshots:
+    """Tests for the persisted archive snapshots."""
+
+    @pytest.fixture(autouse=True)
+    def snapshot_dir(self, tmp_path, monkeypatch):
+        import archive_snapshots
+        monkeypatch.setattr(archive_snapshots, 'SNAPSHOT_DIR', str(tmp_path))
+        archive_snapshots.invalidate()
+        yield
+        archive_snapshots.invalidate()
+
+    def test_only_changed_season_is_rebuilt(self):
+        """Test a cold rebuild reuses persisted seasons whose rows did not change."""
+        import archive_snapshots
+        frames = _frames()
+        frames['match_results'].loc[2, 'Group'] = 'Playoff'
+        awards = pd.DataFrame({'Name': ['Ann'], 'Season': [1], 'Award': ['Golden Boot']})
+        built = []
+
+        def build_season(season):
+            built.append(season)
+            return {'season': season}
+
+        with patch('caching.get_data_version', return_value='v1'):
+            archives = archive_snapshots.get_archive_snapshot(
+                frames['team_standings'], awards, frames['match_results'], build_season)
+        assert [a['season'] for a in archives] == [1, 2]
+        assert built == [1, 2]
+
+        # New result in season 2 on a cold worker
+        archive_snapshots.invalidate()
+        frames['match_results'].loc[2, 'Score Team 1'] = '4'
+        with patch('caching.get_data_version', return_value='v2'):
+            archive_snapshots.get_archive_snapshot(
+                frames['team_standings'], awards, frames['match_results'], build_season)
+            archive_snapshots.get_archive_snapshot(
+                frames['team_standings'], awards, frames['match_results'], build_season)
+        assert built == [1, 2, 2]
+        assert archive_snapshots.snapshot_cache.stats()['entries'] == 1
@@ -0,0 +1,46 @@
+"""
+Startup warmup for data-backed caches.
+
+Nothing reads data at import time; the lifespan hook runs the warmup instead.
+Tasks are grouped in phases: tasks within a phase are independent and run
+concurrently, and each phase starts once the previous one has finished
+(e.g. raw datasets first, then the aggregates built from them). Every task
+is timed so slow boots can be diagnosed from /health.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+WARMUP_WORKERS = 4
+
+
+def _timed(func):
+    start = time.perf_counter()
+    try:
+        func()
+        return {'ms': round((time.perf_counter() - start) * 1000, 1), 'ok': True}
+    except Exception as e:
+        print(f"Warmup task failed: {e}")
+        return {'ms': round((time.perf_counter() - start) * 1000, 1), 'ok': False, 'error': str(e)}
+
+
+def run_warmup(phases: list, max_workers: int = WARMUP_WORKERS) -> dict:
+    """
+    Run warmup phases in order, each phase's tasks concurrently.
+
+    phases is a list of {name: callable} dicts. Returns a report with the
+    total duration and per-task timings; failures are recorded, not raised,
+    since every cache can still be filled lazily on first request.
+    """
+    start = time.perf_counter()
+    report = {'tasks': {}}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warmup') as executor:
+        for phase in phases:
+            futures = {name: executor.submit(_timed, func) for name, func in phase.items()}
+            for name, future in futures.items():
+                report['tasks'][name] = future.result()
+
+    report['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    report['ok'] = all(task['ok'] for task in report['tasks'].values())
+    return report